@@ -65,6 +65,7 @@ def login_page():
                 st.session_state["username"] = login_id
                 st.session_state["role"] = db.get_user_role(login_id)  # 권한 가져오기
                 st.session_state["usd_rate"] = st_algo.get_exchange_rate()
+                st_algo.run_favorite_alerts_async(ingest=True) # [신규] 관심종목 새 봉 수집 + 신호 알림 평가
                 
                 welcome_msg = f"{login_id}님 환영합니다!"
                 if st.session_state["role"] == 'admin':
@@ -134,7 +135,7 @@ def main_app():
         else:
             st.caption("일반 사용자")
             
-        st.caption(f"💵 USD/KRW: {st.session_state['usd_rate']:.1f}원")
+        st.caption(f"💵 USD/KRW: {st_algo.get_usd_krw():.1f}원")
         
         if st.button("로그아웃"):
             st.session_state["logged_in"] = False
@@ -151,6 +152,17 @@ def main_app():
     st.title("📈 Global Quant Scanner V29.4") # 버전업
     st.caption("System: Favorites Portfolio Management Added")
 
+    # [신규] 관심종목 신호 알림 (확인 전까지 로그인 후 상단에 표시)
+    alerts = db.get_alerts(user, unseen_only=True)
+    if not alerts.empty:
+        with st.expander(f"🔔 관심종목 새 신호 {len(alerts)}건", expanded=True):
+            st.dataframe(alerts[["bar_date", "name", "code", "strategy_name", "score", "price"]].rename(columns={
+                "bar_date": "날짜", "name": "종목명", "code": "코드", "strategy_name": "전략", "score": "점수", "price": "종가"}),
+                hide_index=True, use_container_width=True)
+            if st.button("✅ 확인", key="btn_alerts_seen"):
+                db.mark_alerts_seen(user)
+                st.rerun()
+
     # 탭 구성: 관리자일 경우 '관리자' 탭 추가
     tabs_list = ["📊 전략 스캐너", "💖 관심종목", "🔬 전략 연구소", "📘 가이드"]
     if role == 'admin':
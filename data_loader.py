@@ -1,83 +1,160 @@
-import streamlit as st
 import FinanceDataReader as fdr
 import pandas as pd
+import threading
+from datetime import datetime, timedelta
+import database as db
+from search_index import StockSearchIndex
 
-@st.cache_data(ttl=3600)
-def get_master_data(market_code):
+# [신규] 종목 마스터는 DB 스냅샷 + 프로세스 메모리 캐시로 관리
+# - 하루(거래일) 1회만 백그라운드에서 재수집
+# - 재수집 실패 시 마지막 정상 스냅샷을 계속 사용
+_listing_cache = {}        # market -> (snapshot_date, DataFrame)
+_refreshing = {}          # [수정] 갱신 중인 시장 -> 완료 Event (최초 동기 수집이 진행 중인 수집을 기다릴 수 있게)
+_FIRST_FETCH_WAIT = 60     # 다른 요청의 수집 완료를 기다리는 최대 시간(초)
+_last_attempt = {}         # market -> 마지막 갱신 시도 시각 (실패 시 재시도 간격 제한)
+_RETRY_INTERVAL = timedelta(minutes=10)
+_listing_lock = threading.Lock()
+
+def _download_master_data(market_code):
+    """원천(FDR)에서 종목 리스트 수집 + 필터링 (실패 시 예외 발생)"""
+    df = pd.DataFrame()
+    # [수정] 한국 시장: 전 종목 수집 후 스팩/우선주 제거
+    if market_code in ["KOSPI", "KOSDAQ"]:
+        df_krx = fdr.StockListing('KRX') # 전체 데이터
+        if 'Code' not in df_krx.columns and 'Symbol' in df_krx.columns:
+            df_krx = df_krx.rename(columns={'Symbol': 'Code'})
+        
+        # 시장 구분
+        if market_code == "KOSPI":
+            df = df_krx[df_krx['Market'] == 'KOSPI']
+        elif market_code == "KOSDAQ":
+            df = df_krx[df_krx['Market'].isin(['KOSDAQ', 'KOSDAQ GLOBAL'])]
+        
+        # [필터링 핵심] 스팩(SPAC), 우선주, 리츠 제외
+        # 1. 스팩 제거
+        df = df[~df['Name'].str.contains('스팩', case=False)]
+        df = df[~df['Name'].str.contains('제[0-9]+호', regex=True)] # 제N호 등
+        # 2. 우선주 제거 (종목명이 '우'로 끝나거나 '우B' 등 포함)
+        df = df[~df['Name'].str.endswith('우')]
+        df = df[~df['Name'].str.endswith('우B')]
+        df = df[~df['Name'].str.contains('리츠')] # 리츠도 제외 (보통 기술적 분석이 다름)
+        
+        df = df[['Code', 'Name']].copy()
+        df['Market'] = market_code
+        
+    # 미국 시장
+    elif market_code in ["S&P500", "NASDAQ", "NYSE", "NASDAQ_100"]:
+        sym = market_code
+        if market_code == "NASDAQ_100": sym = "NASDAQ"
+        df = fdr.StockListing(sym)
+        if market_code == "NASDAQ_100": df = df.head(100)
+        df = df[['Symbol', 'Name']].rename(columns={'Symbol': 'Code'})
+        df['Market'] = market_code
+        
+    return df.reset_index(drop=True)
+
+def _last_trading_day():
+    """오늘 기준 가장 최근 평일(주말 제외) 날짜 문자열"""
+    d = datetime.now().date()
+    while d.weekday() >= 5: d -= timedelta(days=1)
+    return d.strftime("%Y-%m-%d")
+
+def _refresh_master_data(market_code):
+    """원천 재수집 후 DB/메모리 스냅샷 교체. 실패하면 기존 스냅샷 유지"""
     try:
-        df = pd.DataFrame()
-        # [수정] 한국 시장: 전 종목 수집 후 스팩/우선주 제거
-        if market_code in ["KOSPI", "KOSDAQ"]:
-            df_krx = fdr.StockListing('KRX') # 전체 데이터
-            if 'Code' not in df_krx.columns and 'Symbol' in df_krx.columns:
-                df_krx = df_krx.rename(columns={'Symbol': 'Code'})
-            
-            # 시장 구분
-            if market_code == "KOSPI":
-                df = df_krx[df_krx['Market'] == 'KOSPI']
-            elif market_code == "KOSDAQ":
-                df = df_krx[df_krx['Market'].isin(['KOSDAQ', 'KOSDAQ GLOBAL'])]
-            
-            # [필터링 핵심] 스팩(SPAC), 우선주, 리츠 제외
-            # 1. 스팩 제거
-            df = df[~df['Name'].str.contains('스팩', case=False)]
-            df = df[~df['Name'].str.contains('제[0-9]+호', regex=True)] # 제N호 등
-            # 2. 우선주 제거 (종목명이 '우'로 끝나거나 '우B' 등 포함)
-            df = df[~df['Name'].str.endswith('우')]
-            df = df[~df['Name'].str.endswith('우B')]
-            df = df[~df['Name'].str.contains('리츠')] # 리츠도 제외 (보통 기술적 분석이 다름)
-            
-            df = df[['Code', 'Name']]
-            df['Market'] = market_code
-            
-        # 미국 시장
-        elif market_code in ["S&P500", "NASDAQ", "NYSE", "NASDAQ_100"]:
-            sym = market_code
-            if market_code == "NASDAQ_100": sym = "NASDAQ"
-            df = fdr.StockListing(sym)
-            if market_code == "NASDAQ_100": df = df.head(100)
-            df = df[['Symbol', 'Name']].rename(columns={'Symbol': 'Code'})
-            df['Market'] = market_code
-            
-        return df
-    except:
-        return pd.DataFrame(columns=['Code', 'Name', 'Market'])
+        df = _download_master_data(market_code)
+        if df is not None and not df.empty:
+            snap_date = _last_trading_day()
+            db.save_master_listing(market_code, df, snap_date)
+            with _listing_lock:
+                _listing_cache[market_code] = (snap_date, df)
+            return df
+    except Exception as e:
+        print(f"Listing Refresh Error ({market_code}): {e}")
+    finally:
+        with _listing_lock:
+            done = _refreshing.pop(market_code, None)
+        if done: done.set()
+    return None
+
+def _refresh_in_background(market_code):
+    with _listing_lock:
+        if market_code in _refreshing: return
+        last = _last_attempt.get(market_code)
+        if last and datetime.now() - last < _RETRY_INTERVAL: return
+        _refreshing[market_code] = threading.Event()
+        _last_attempt[market_code] = datetime.now()
+    t = threading.Thread(target=_refresh_master_data, args=(market_code,))
+    t.daemon = True; t.start()
+
+def get_master_data(market_code):
+    """종목 마스터 조회 (메모리 → DB 스냅샷 → 원천 수집 순)"""
+    empty = pd.DataFrame(columns=['Code', 'Name', 'Market'])
+    today_snap = _last_trading_day()
+
+    with _listing_lock:
+        cached = _listing_cache.get(market_code)
+
+    if cached is None:
+        try:
+            df, snap_date = db.load_master_listing(market_code)
+        except Exception:
+            df, snap_date = None, None
+        if df is not None:
+            cached = (snap_date, df)
+            with _listing_lock:
+                _listing_cache[market_code] = cached
+
+    # 스냅샷이 아예 없으면 동기 수집 (최초 1회)
+    # [수정] 진행 중 여부 확인과 등록을 한 번의 잠금 안에서 처리 - 이미 수집 중이면 중복 수집 없이 완료를 기다림
+    if cached is None:
+        with _listing_lock:
+            pending = _refreshing.get(market_code)
+            if pending is None: _refreshing[market_code] = threading.Event()
+        if pending is not None:
+            pending.wait(_FIRST_FETCH_WAIT)
+            with _listing_lock:
+                cached = _listing_cache.get(market_code)
+            return cached[1] if cached is not None else empty
+        df = _refresh_master_data(market_code)
+        return df if df is not None else empty
+
+    snap_date, df = cached
+    if snap_date < today_snap:
+        _refresh_in_background(market_code)
+    return df
+
+# [신규] 검색 인덱스: 4개 시장 스냅샷이 바뀔 때만 재빌드
+SEARCH_MARKETS = ["KOSPI", "KOSDAQ", "NASDAQ", "S&P500"]
+_search_index = None
+_search_sources = ()
+
+def get_search_index():
+    global _search_index, _search_sources
+    frames = tuple(get_master_data(m) for m in SEARCH_MARKETS)
+    with _listing_lock:
+        stale = _search_index is None or len(frames) != len(_search_sources) or \
+                any(a is not b for a, b in zip(frames, _search_sources))
+        if stale:
+            _search_index = StockSearchIndex(frames)
+            _search_sources = frames
+        return _search_index
+
+def search_candidates(keyword, k=10):
+    """한글/영어/티커/초성 통합 검색 후보 (점수 순 상위 k개)"""
+    return get_search_index().search(keyword, k=k)
 
 def search_code_by_name(keyword):
-    """한글/영어/티커 통합 검색 (전체 데이터 기반)"""
+    """한글/영어/티커 통합 검색 (인덱스 기반)"""
     keyword = str(keyword).strip().upper()
     
     if keyword.isdigit() and len(keyword) == 6: return keyword
     
-    # 한국 시장 (통합 검색)
-    df_kr_kospi = get_master_data("KOSPI")
-    df_kr_kosdaq = get_master_data("KOSDAQ")
-    df_kr = pd.concat([df_kr_kospi, df_kr_kosdaq])
-    
-    # 정확히 일치 우선
-    exact = df_kr[df_kr['Name'] == keyword]
-    if not exact.empty: return exact.iloc[0]['Code']
-    
-    # 포함 검색
-    contains = df_kr[df_kr['Name'].str.contains(keyword, case=False)]
-    if not contains.empty: return contains.iloc[0]['Code']
-    
-    # 미국 시장
-    for mkt in ["NASDAQ", "S&P500"]:
-        df_us = get_master_data(mkt)
-        res = df_us[df_us['Code'] == keyword]
-        if not res.empty: return res.iloc[0]['Code']
-        res_name = df_us[df_us['Name'].str.contains(keyword, case=False)]
-        if not res_name.empty: return res_name.iloc[0]['Code']
-            
-    return None
+    hits = search_candidates(keyword, k=1)
+    return hits[0]['code'] if hits else None
 
 def get_stock_name(code):
     try:
-        # 데이터가 많으므로 효율적으로 검색
-        for mkt in ["KOSPI", "KOSDAQ", "NASDAQ", "S&P500"]:
-            df = get_master_data(mkt)
-            row = df[df['Code'] == str(code)]
-            if not row.empty: return row.iloc[0]['Name']
-        return code
+        hit = get_search_index().lookup_code(str(code))
+        return hit['name'] if hit else code
     except: return code
\ No newline at end of file
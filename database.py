@@ -1,5 +1,6 @@
 import sqlite3
 import hashlib
+import json
 import os
 import pandas as pd
 from datetime import datetime
@@ -42,12 +43,114 @@ def init_db():
                        entry_price REAL,
                        market TEXT,
                        UNIQUE(scan_date, strategy_name, code))''')
+    # [수정] 기간 수익률을 마지막으로 확인했을 때의 종목 마지막 봉 날짜 (봉이 없었으면 '')
+    try: c_user.execute("ALTER TABLE scan_history ADD COLUMN checked_bar TEXT")
+    except sqlite3.OperationalError: pass
                   
     c_user.execute('''CREATE TABLE IF NOT EXISTS strategy_stats 
                       (strategy_name TEXT PRIMARY KEY,
                        win_rate REAL,
                        total_count INTEGER,
                        last_updated TEXT)''')
+
+    # [신규] 파라미터 스윕 결과 (조합별 1행, params 는 JSON 문자열)
+    c_user.execute('''CREATE TABLE IF NOT EXISTS sweep_results
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       sweep_id TEXT,
+                       strategy_name TEXT,
+                       params TEXT,
+                       trades INTEGER,
+                       win_rate REAL,
+                       expectancy REAL,
+                       profit_factor REAL,
+                       max_drawdown REAL,
+                       exposure REAL,
+                       created_at TEXT)''')
+    c_user.execute('CREATE INDEX IF NOT EXISTS idx_sweep_id ON sweep_results (sweep_id)')
+
+    # [신규] 워크포워드 결과 (구간별 1행: 학습 구간에서 고른 파라미터 + 검증 구간 성과)
+    c_user.execute('''CREATE TABLE IF NOT EXISTS walkforward_results
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       run_id TEXT,
+                       strategy_name TEXT,
+                       window_no INTEGER,
+                       train_start TEXT,
+                       train_end TEXT,
+                       test_start TEXT,
+                       test_end TEXT,
+                       params TEXT,
+                       train_trades INTEGER,
+                       train_expectancy REAL,
+                       test_trades INTEGER,
+                       test_win_rate REAL,
+                       test_expectancy REAL,
+                       test_profit_factor REAL,
+                       test_max_drawdown REAL,
+                       created_at TEXT)''')
+    c_user.execute('CREATE INDEX IF NOT EXISTS idx_walkforward_run ON walkforward_results (run_id)')
+
+    # [신규] 스캔 행별 기간 수익률 (집계 반영 여부 기록 겸용) + 전략/시장/기간/월별 누적 집계
+    c_user.execute('''CREATE TABLE IF NOT EXISTS scan_outcomes
+                      (scan_id INTEGER,
+                       horizon INTEGER,
+                       ret REAL,
+                       PRIMARY KEY (scan_id, horizon))''')
+    c_user.execute('''CREATE TABLE IF NOT EXISTS strategy_stats_agg
+                      (strategy_name TEXT,
+                       market TEXT,
+                       horizon INTEGER,
+                       month TEXT,
+                       wins INTEGER,
+                       total INTEGER,
+                       sum_ret REAL,
+                       last_updated TEXT,
+                       PRIMARY KEY (strategy_name, market, horizon, month))''')
+
+    # [신규] 이벤트 스터디 결과 캐시 (전략 + 파라미터 + 기간 + 주가 데이터 버전 단위)
+    c_user.execute('''CREATE TABLE IF NOT EXISTS event_study_cache
+                      (cache_key TEXT PRIMARY KEY,
+                       strategy_name TEXT,
+                       data_version INTEGER,
+                       result TEXT,
+                       created_at TEXT)''')
+
+    # [신규] 전략별 포착 점수 분포 (랭킹 정규화용 분위수, 전략 + 파라미터 + 주가 데이터 버전 단위)
+    c_user.execute('''CREATE TABLE IF NOT EXISTS score_dist_cache
+                      (cache_key TEXT PRIMARY KEY,
+                       strategy_name TEXT,
+                       data_version INTEGER,
+                       quantiles TEXT,
+                       created_at TEXT)''')
+
+    # [신규] 과거 스캔 재생(replay) 진행 상황: 종목별로 재생을 마친 마지막 날짜
+    c_user.execute('''CREATE TABLE IF NOT EXISTS replay_progress
+                      (code TEXT PRIMARY KEY,
+                       last_date TEXT,
+                       updated_at TEXT)''')
+
+    # [신규] 관심종목 신호 알림 (사용자별) + 종목별 알림 평가를 마친 마지막 봉 날짜
+    c_user.execute('''CREATE TABLE IF NOT EXISTS signal_alerts
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       username TEXT,
+                       code TEXT,
+                       name TEXT,
+                       strategy_name TEXT,
+                       bar_date TEXT,
+                       score REAL,
+                       price REAL,
+                       created_at TEXT,
+                       seen INTEGER DEFAULT 0,
+                       UNIQUE(username, code, strategy_name, bar_date))''')
+    c_user.execute("CREATE INDEX IF NOT EXISTS idx_alerts_user ON signal_alerts (username, seen)")
+    c_user.execute('''CREATE TABLE IF NOT EXISTS alert_progress
+                      (code TEXT PRIMARY KEY,
+                       last_date TEXT,
+                       updated_at TEXT)''')
+    # [신규] 사용자별 알림 받을 전략 (JSON 이름 리스트, 행이 없으면 기본 전략)
+    c_user.execute('''CREATE TABLE IF NOT EXISTS alert_settings
+                      (username TEXT PRIMARY KEY,
+                       strategies TEXT,
+                       updated_at TEXT)''')
     conn_user.commit()
     conn_user.close()
 
@@ -66,6 +169,102 @@ def init_db():
                         PRIMARY KEY (code, date))''')
     
     c_price.execute('CREATE INDEX IF NOT EXISTS idx_stock_code ON stock_prices (code)')
+
+    # [신규] 종목별 다운로드 완료 구간 (같은 구간 중복 다운로드 방지) + 확인된 야후 심볼
+    c_price.execute('''CREATE TABLE IF NOT EXISTS price_coverage
+                       (code TEXT PRIMARY KEY,
+                        symbol TEXT,
+                        start_date TEXT,
+                        end_date TEXT)''')
+
+    # [신규] 종목 마스터 스냅샷 (필터 적용 후 저장, 시장별 기준일 관리)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS master_listings
+                       (market TEXT,
+                        code TEXT,
+                        name TEXT,
+                        PRIMARY KEY (market, code))''')
+
+    c_price.execute('''CREATE TABLE IF NOT EXISTS listing_meta
+                       (market TEXT PRIMARY KEY,
+                        snapshot_date TEXT,
+                        row_count INTEGER,
+                        last_updated TEXT)''')
+
+    # [신규] 재무 정보 캐시 (항목별 갱신 시각 → 항목별 TTL 판정)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS fundamentals
+                       (code TEXT,
+                        field TEXT,
+                        value TEXT,
+                        updated_at TEXT,
+                        PRIMARY KEY (code, field))''')
+
+    # [신규] 환율 일별 시계열 (예: USDKRW=X)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS fx_rates
+                       (pair TEXT,
+                        date TEXT,
+                        rate REAL,
+                        PRIMARY KEY (pair, date))''')
+
+    # [신규] 주가 데이터 버전 (stock_prices 에 행이 추가될 때마다 증가 → 파생 계산 캐시 무효화 기준)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS price_meta
+                       (key TEXT PRIMARY KEY,
+                        value INTEGER)''')
+
+    # [신규] 실적 발표일 (앵커 VWAP 의 earnings 앵커용)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS earnings_dates
+                       (code TEXT,
+                        date TEXT,
+                        updated_at TEXT,
+                        PRIMARY KEY (code, date))''')
+
+    # [신규] 시장 지수 일별 종가 (상대강도 RS 기준선: ^KS11, ^KQ11, SPY)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS index_prices
+                       (symbol TEXT,
+                        date TEXT,
+                        close REAL,
+                        PRIMARY KEY (symbol, date))''')
+
+    # [신규] 날짜별 횡단면 수익률 순위 (저장 종목 전체 중 3/6/12개월 수익률 백분위, 0~100)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS xsection_ranks
+                       (code TEXT,
+                        date TEXT,
+                        r3m REAL,
+                        r6m REAL,
+                        r12m REAL,
+                        PRIMARY KEY (code, date))''')
+
+    # [신규] 횡단면 순위 계산 당시 종목별 주가 구간 (바뀐 종목이 있는 날짜만 다시 계산)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS xsection_progress
+                       (code TEXT PRIMARY KEY,
+                        first_date TEXT,
+                        last_date TEXT,
+                        rows INTEGER)''')
+
+    # [신규] 전략 신호 테이블 (포착된 봉만 저장: 진입 신호 여부 + 스캐너 점수)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS strategy_signals
+                       (strategy_name TEXT,
+                        code TEXT,
+                        date TEXT,
+                        entry INTEGER,
+                        score REAL,
+                        PRIMARY KEY (strategy_name, code, date))''')
+    c_price.execute('CREATE INDEX IF NOT EXISTS idx_signals_date ON strategy_signals (strategy_name, date)')
+
+    # [신규] (전략, 종목)별 신호 계산 완료일 + 계산 당시 파라미터 서명 (서명이 바뀌면 다시 계산)
+    # [수정] 계산 당시 첫 봉 날짜 / 봉 수도 기록 (과거 봉이 보충되면 그 조합을 처음부터 다시 계산)
+    c_price.execute('''CREATE TABLE IF NOT EXISTS signal_progress
+                       (strategy_name TEXT,
+                        code TEXT,
+                        signature TEXT,
+                        last_date TEXT,
+                        first_date TEXT,
+                        bar_count INTEGER,
+                        PRIMARY KEY (strategy_name, code))''')
+    # 마이그레이션 (기존 행은 첫 봉 정보가 없어 다음 적재 때 전부 다시 계산)
+    try: c_price.execute("ALTER TABLE signal_progress ADD COLUMN first_date TEXT")
+    except sqlite3.OperationalError: pass
+    try: c_price.execute("ALTER TABLE signal_progress ADD COLUMN bar_count INTEGER")
+    except sqlite3.OperationalError: pass
     conn_price.commit()
     conn_price.close()
 
@@ -145,6 +344,8 @@ def delete_user(target_username):
     c = conn.cursor()
     c.execute("DELETE FROM users WHERE username = ?", (target_username,))
     c.execute("DELETE FROM favorites WHERE username = ?", (target_username,))
+    c.execute("DELETE FROM signal_alerts WHERE username = ?", (target_username,))
+    c.execute("DELETE FROM alert_settings WHERE username = ?", (target_username,))
     conn.commit()
     conn.close()
 
@@ -210,6 +411,114 @@ def get_scan_history_dates():
     conn.close()
     return res
 
+def save_scan_results_bulk(rows, progress=None):
+    """rows: [(scan_date, strategy_name, code, name, entry_price, market), ...] 일괄 저장 (중복 무시)
+    progress: {code: last_date} 재생 진행 상황을 같은 트랜잭션으로 기록. 실제 추가된 행 수 반환"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    before = conn.total_changes
+    c.executemany('''INSERT OR IGNORE INTO scan_history
+                     (scan_date, strategy_name, code, name, entry_price, market)
+                     VALUES (?, ?, ?, ?, ?, ?)''', rows)
+    inserted = conn.total_changes - before
+    if progress:
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        c.executemany('''INSERT OR REPLACE INTO replay_progress (code, last_date, updated_at) VALUES (?, ?, ?)''',
+                      [(code, d, now_str) for code, d in progress.items()])
+    conn.commit()
+    conn.close()
+    return inserted
+
+def get_replay_progress():
+    """{code: 재생 완료된 마지막 날짜}"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("SELECT code, last_date FROM replay_progress")
+    res = dict(c.fetchall())
+    conn.close()
+    return res
+
+# --- 관심종목 신호 알림 ---
+def get_favorite_followers():
+    """{code: [(username, name), ...]} 전 사용자 관심종목을 종목 단위로 묶음"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("SELECT code, username, name FROM favorites")
+    res = {}
+    for code, username, name in c.fetchall():
+        res.setdefault(str(code), []).append((username, name))
+    conn.close()
+    return res
+
+def get_alert_strategies(username=None):
+    """{username: [알림 받을 전략 이름, ...]} (username 지정 시 그 사용자 리스트, 설정이 없으면 None)"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    if username is None:
+        c.execute("SELECT username, strategies FROM alert_settings")
+        res = {u: json.loads(s) for u, s in c.fetchall()}
+    else:
+        c.execute("SELECT strategies FROM alert_settings WHERE username = ?", (username,))
+        row = c.fetchone()
+        res = json.loads(row[0]) if row else None
+    conn.close()
+    return res
+
+def save_alert_strategies(username, names):
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("INSERT OR REPLACE INTO alert_settings (username, strategies, updated_at) VALUES (?, ?, ?)",
+              (username, json.dumps(list(names), ensure_ascii=False), now_str))
+    conn.commit()
+    conn.close()
+
+def get_alert_progress():
+    """{code: 알림 평가를 마친 마지막 봉 날짜}"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("SELECT code, last_date FROM alert_progress")
+    res = dict(c.fetchall())
+    conn.close()
+    return res
+
+def save_alerts(rows, progress=None):
+    """rows: [(username, code, name, strategy_name, bar_date, score, price), ...] 저장 (같은 알림은 무시)
+    progress: {code: last_date} 평가 진행 상황을 같은 트랜잭션으로 기록. 실제 추가된 행 리스트 반환"""
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_user_conn()
+    c = conn.cursor()
+    inserted = []
+    for row in rows:
+        c.execute('''INSERT OR IGNORE INTO signal_alerts
+                     (username, code, name, strategy_name, bar_date, score, price, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', (*row, now_str))
+        if c.rowcount == 1: inserted.append(row)
+    if progress:
+        c.executemany('''INSERT OR REPLACE INTO alert_progress (code, last_date, updated_at) VALUES (?, ?, ?)''',
+                      [(code, d, now_str) for code, d in progress.items()])
+    conn.commit()
+    conn.close()
+    return inserted
+
+def get_alerts(username, unseen_only=False, limit=100):
+    """사용자 알림 최신순 DataFrame"""
+    conn = get_user_conn()
+    query = '''SELECT id, code, name, strategy_name, bar_date, score, price, created_at, seen
+               FROM signal_alerts WHERE username = ?'''
+    if unseen_only: query += " AND seen = 0"
+    query += " ORDER BY bar_date DESC, id DESC LIMIT ?"
+    df = pd.read_sql(query, conn, params=(username, limit))
+    conn.close()
+    return df
+
+def mark_alerts_seen(username):
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("UPDATE signal_alerts SET seen = 1 WHERE username = ? AND seen = 0", (username,))
+    conn.commit()
+    conn.close()
+
 def get_history_by_date(target_date):
     conn = get_user_conn()
     c = conn.cursor()
@@ -218,20 +527,81 @@ def get_history_by_date(target_date):
     conn.close()
     return res
 
-def update_strategy_stats(stats_dict):
+def load_scan_history(scan_date=None, start_date=None):
+    """scan_history DataFrame (scan_date 지정 시 그날만, start_date 지정 시 그 이후)"""
+    conn = get_user_conn()
+    query = "SELECT scan_date, strategy_name, code, name, entry_price, market FROM scan_history"
+    if scan_date:
+        df = pd.read_sql(query + " WHERE scan_date = ?", conn, params=(scan_date,))
+    elif start_date:
+        df = pd.read_sql(query + " WHERE scan_date >= ?", conn, params=(start_date,))
+    else:
+        df = pd.read_sql(query, conn)
+    conn.close()
+    return df
+
+def load_pending_outcomes(horizons, last_dates=None):
+    """아직 모든 기간(horizons)의 결과가 집계되지 않은 scan_history 행. done 컬럼 = 이미 집계된 기간 집합
+    last_dates: {code: 마지막 저장 봉 날짜} - 주면 마지막 확인(checked_bar) 이후 새 봉이 없는 행은 제외"""
+    conn = get_user_conn()
+    df = pd.read_sql(f'''SELECT s.id, s.scan_date, s.strategy_name, s.code, s.name, s.entry_price, s.market,
+                               s.checked_bar, GROUP_CONCAT(o.horizon) AS done
+                        FROM scan_history s LEFT JOIN scan_outcomes o
+                             ON o.scan_id = s.id AND o.horizon IN ({','.join('?' * len(horizons))})
+                        GROUP BY s.id HAVING COUNT(o.horizon) < ?''', conn, params=(*horizons, len(horizons)))
+    conn.close()
+    if last_dates is not None:
+        last = df['code'].astype(str).map(last_dates).fillna('')
+        df = df[df['checked_bar'].isna() | (last > df['checked_bar'].fillna(''))].reset_index(drop=True)
+    df['done'] = [set(int(h) for h in d.split(',')) if isinstance(d, str) else set() for d in df['done']]
+    return df
+
+def mark_outcomes_checked(rows):
+    """rows: [(확인한 마지막 봉 날짜, scan_id), ...] - 새 봉이 저장될 때까지 load_pending_outcomes 에서 제외"""
+    if not rows: return
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.executemany("UPDATE scan_history SET checked_bar = ? WHERE id = ?", rows)
+    conn.commit()
+    conn.close()
+
+def apply_scan_outcomes(outcomes, rollup_horizon):
+    """[수정] 전역 승률을 누적 집계로 갱신 (한 날짜 표본으로 덮어쓰지 않음)
+    outcomes: [(scan_id, horizon, ret, strategy_name, market, month), ...] - 새로 확정된 결과만
+    1) scan_outcomes 기록  2) strategy_stats_agg 에 증분 합산  3) rollup_horizon 기준 strategy_stats 요약 갱신
+    [수정] 집계에는 이번에 실제로 추가된 행만 더함 (이미 기록된 결과가 다시 와도 승률이 부풀지 않음). 추가된 행 수 반환"""
+    if not outcomes: return 0
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     conn = get_user_conn()
     c = conn.cursor()
-    today = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    for strat, data in stats_dict.items():
-        win_rate = (data['win'] / data['total']) * 100 if data['total'] > 0 else 0
-        c.execute('''INSERT OR REPLACE INTO strategy_stats 
-                     (strategy_name, win_rate, total_count, last_updated)
-                     VALUES (?, ?, ?, ?)''', 
-                  (strat, win_rate, data['total'], today))
+    delta = {}
+    for scan_id, h, ret, strat, market, month in outcomes:
+        c.execute("INSERT OR IGNORE INTO scan_outcomes (scan_id, horizon, ret) VALUES (?, ?, ?)", (scan_id, h, ret))
+        if c.rowcount != 1: continue
+        d = delta.setdefault((strat, market, h, month), [0, 0, 0.0])
+        d[0] += int(ret > 0); d[1] += 1; d[2] += ret
+    if not delta:
+        conn.commit()
+        conn.close()
+        return 0
+
+    c.executemany('''INSERT INTO strategy_stats_agg (strategy_name, market, horizon, month, wins, total, sum_ret, last_updated)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                     ON CONFLICT(strategy_name, market, horizon, month) DO UPDATE SET
+                        wins = wins + excluded.wins, total = total + excluded.total,
+                        sum_ret = sum_ret + excluded.sum_ret, last_updated = excluded.last_updated''',
+                  [(*k, *v, now_str) for k, v in delta.items()])
+    strats = sorted({k[0] for k in delta})
+    c.execute(f'''INSERT OR REPLACE INTO strategy_stats (strategy_name, win_rate, total_count, last_updated)
+                  SELECT strategy_name, SUM(wins) * 100.0 / SUM(total), SUM(total), ?
+                  FROM strategy_stats_agg WHERE horizon = ? AND strategy_name IN ({','.join('?' * len(strats))})
+                  GROUP BY strategy_name''', (now_str, rollup_horizon, *strats))
     conn.commit()
     conn.close()
+    return sum(d[1] for d in delta.values())
 
 def get_strategy_stats():
+    """{전략명: 전역 승률} - 누적 집계 요약 테이블에서 바로 조회 (전략 수만큼의 행)"""
     conn = get_user_conn()
     c = conn.cursor()
     c.execute("SELECT strategy_name, win_rate FROM strategy_stats")
@@ -239,6 +609,143 @@ def get_strategy_stats():
     conn.close()
     return res
 
+def get_strategy_stats_breakdown(strategy_name=None, market=None, horizon=None):
+    """누적 집계 (전략, 시장, 기간, 월) DataFrame - wins/total/sum_ret 원본 + win_rate/avg_ret"""
+    conn = get_user_conn()
+    query = "SELECT strategy_name, market, horizon, month, wins, total, sum_ret FROM strategy_stats_agg"
+    conds, params = [], []
+    for col, val in (("strategy_name", strategy_name), ("market", market), ("horizon", horizon)):
+        if val is not None:
+            conds.append(f"{col} = ?"); params.append(val)
+    if conds: query += " WHERE " + " AND ".join(conds)
+    df = pd.read_sql(query + " ORDER BY strategy_name, market, horizon, month", conn, params=params)
+    conn.close()
+    df['win_rate'] = df['wins'] / df['total'] * 100
+    df['avg_ret'] = df['sum_ret'] / df['total']
+    return df
+
+# --- 이벤트 스터디 캐시 ---
+def load_event_study(cache_key):
+    """캐시된 결과 (JSON 문자열) 또는 None"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("SELECT result FROM event_study_cache WHERE cache_key = ?", (cache_key,))
+    res = c.fetchone()
+    conn.close()
+    return res[0] if res else None
+
+def save_event_study(cache_key, strategy_name, data_version, result_json):
+    """결과 저장 + 같은 전략의 이전 데이터 버전 캐시 정리"""
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("DELETE FROM event_study_cache WHERE strategy_name = ? AND data_version < ?", (strategy_name, data_version))
+    c.execute('''INSERT OR REPLACE INTO event_study_cache (cache_key, strategy_name, data_version, result, created_at)
+                 VALUES (?, ?, ?, ?, ?)''', (cache_key, strategy_name, data_version, result_json, now_str))
+    conn.commit()
+    conn.close()
+
+# --- 랭킹용 점수 분포 캐시 ---
+def load_score_distribution(cache_key):
+    """캐시된 분위수 (JSON 문자열) 또는 None"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("SELECT quantiles FROM score_dist_cache WHERE cache_key = ?", (cache_key,))
+    res = c.fetchone()
+    conn.close()
+    return res[0] if res else None
+
+def save_score_distribution(cache_key, strategy_name, data_version, quantiles_json):
+    """분위수 저장 + 같은 전략의 이전 데이터 버전 캐시 정리"""
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.execute("DELETE FROM score_dist_cache WHERE strategy_name = ? AND data_version < ?", (strategy_name, data_version))
+    c.execute('''INSERT OR REPLACE INTO score_dist_cache (cache_key, strategy_name, data_version, quantiles, created_at)
+                 VALUES (?, ?, ?, ?, ?)''', (cache_key, strategy_name, data_version, quantiles_json, now_str))
+    conn.commit()
+    conn.close()
+
+# --- 파라미터 스윕 결과 ---
+def save_sweep_results(sweep_id, strategy_name, rows):
+    """rows: [{'params': dict, 'trades', 'win_rate', 'expectancy', 'profit_factor', 'max_drawdown', 'exposure'}, ...]"""
+    if not rows: return
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.executemany('''INSERT INTO sweep_results
+                     (sweep_id, strategy_name, params, trades, win_rate, expectancy, profit_factor, max_drawdown, exposure, created_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                  [(sweep_id, strategy_name, json.dumps(r['params'], sort_keys=True), r['trades'], r['win_rate'],
+                    r['expectancy'], r['profit_factor'], r['max_drawdown'], r['exposure'], now_str) for r in rows])
+    conn.commit()
+    conn.close()
+
+def get_sweep_ids(strategy_name=None):
+    """(sweep_id, strategy_name, 조합 수, 생성시각) 최신순"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    query = "SELECT sweep_id, strategy_name, count(*), max(created_at) FROM sweep_results"
+    params = ()
+    if strategy_name:
+        query += " WHERE strategy_name = ?"; params = (strategy_name,)
+    c.execute(query + " GROUP BY sweep_id, strategy_name ORDER BY max(created_at) DESC", params)
+    res = c.fetchall()
+    conn.close()
+    return res
+
+def load_sweep_results(sweep_id):
+    """스윕 결과 DataFrame (params JSON 을 파라미터별 컬럼으로 펼침)"""
+    conn = get_user_conn()
+    df = pd.read_sql('''SELECT strategy_name, params, trades, win_rate, expectancy, profit_factor, max_drawdown, exposure
+                        FROM sweep_results WHERE sweep_id = ? ORDER BY id ASC''', conn, params=(sweep_id,))
+    conn.close()
+    if df.empty: return df
+    params = pd.DataFrame([json.loads(p) for p in df['params']], index=df.index)
+    return pd.concat([params, df.drop(columns='params')], axis=1)
+
+# --- 워크포워드 결과 ---
+WALKFORWARD_METRICS = ['train_trades', 'train_expectancy', 'test_trades', 'test_win_rate',
+                       'test_expectancy', 'test_profit_factor', 'test_max_drawdown']
+
+def save_walkforward_results(run_id, strategy_name, rows):
+    """rows: [{'window_no', 'train_start', 'train_end', 'test_start', 'test_end', 'params': dict, + WALKFORWARD_METRICS}, ...]"""
+    if not rows: return
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_user_conn()
+    c = conn.cursor()
+    c.executemany(f'''INSERT INTO walkforward_results
+                      (run_id, strategy_name, window_no, train_start, train_end, test_start, test_end, params,
+                       {', '.join(WALKFORWARD_METRICS)}, created_at)
+                      VALUES ({', '.join(['?'] * (len(WALKFORWARD_METRICS) + 9))})''',
+                  [(run_id, strategy_name, r['window_no'], r['train_start'], r['train_end'], r['test_start'], r['test_end'],
+                    json.dumps(r['params'], sort_keys=True), *[r[k] for k in WALKFORWARD_METRICS], now_str) for r in rows])
+    conn.commit()
+    conn.close()
+
+def get_walkforward_runs(strategy_name=None):
+    """(run_id, strategy_name, 구간 수, 생성시각) 최신순"""
+    conn = get_user_conn()
+    c = conn.cursor()
+    query = "SELECT run_id, strategy_name, count(*), max(created_at) FROM walkforward_results"
+    params = ()
+    if strategy_name:
+        query += " WHERE strategy_name = ?"; params = (strategy_name,)
+    c.execute(query + " GROUP BY run_id, strategy_name ORDER BY max(created_at) DESC", params)
+    res = c.fetchall()
+    conn.close()
+    return res
+
+def load_walkforward_results(run_id):
+    """워크포워드 구간별 결과 DataFrame (params 는 dict 로 복원)"""
+    conn = get_user_conn()
+    df = pd.read_sql(f'''SELECT strategy_name, window_no, train_start, train_end, test_start, test_end, params,
+                         {', '.join(WALKFORWARD_METRICS)}
+                         FROM walkforward_results WHERE run_id = ? ORDER BY window_no ASC''', conn, params=(run_id,))
+    conn.close()
+    if not df.empty: df['params'] = [json.loads(p) for p in df['params']]
+    return df
+
 # =========================================================
 # [Part 2] 주가 데이터 캐싱 관련 함수 (stock_data.db 사용)
 # =========================================================
@@ -274,17 +781,36 @@ def save_daily_price(df, code):
             float(row.get('Volume', 0))
         ))
     
+    before = conn.total_changes
     c.executemany('''INSERT OR IGNORE INTO stock_prices 
                      (code, date, open, high, low, close, volume) 
                      VALUES (?, ?, ?, ?, ?, ?, ?)''', data_to_insert)
+    if conn.total_changes > before: _bump_price_version(c)
     conn.commit()
     conn.close()
 
-def load_daily_price(code):
-    """주가 데이터 로드"""
+def _bump_price_version(c):
+    c.execute('''INSERT INTO price_meta (key, value) VALUES ('version', 1)
+                 ON CONFLICT(key) DO UPDATE SET value = value + 1''')
+
+def get_price_data_version():
+    """stock_prices 데이터 버전 (행이 추가될 때마다 증가)"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT value FROM price_meta WHERE key = 'version'")
+    res = c.fetchone()
+    conn.close()
+    return res[0] if res else 0
+
+def load_daily_price(code, start_date=None):
+    """주가 데이터 로드 (start_date 지정 시 해당 날짜 이후만)"""
     conn = get_price_conn() # 주가 DB 연결
-    query = "SELECT date, open, high, low, close, volume FROM stock_prices WHERE code = ? ORDER BY date ASC"
-    df = pd.read_sql(query, conn, params=(code,))
+    if start_date:
+        query = "SELECT date, open, high, low, close, volume FROM stock_prices WHERE code = ? AND date >= ? ORDER BY date ASC"
+        df = pd.read_sql(query, conn, params=(code, start_date))
+    else:
+        query = "SELECT date, open, high, low, close, volume FROM stock_prices WHERE code = ? ORDER BY date ASC"
+        df = pd.read_sql(query, conn, params=(code,))
     conn.close()
     
     if df.empty: return None
@@ -293,4 +819,368 @@ def load_daily_price(code):
     df['Date'] = pd.to_datetime(df['Date'])
     df.set_index('Date', inplace=True)
     
-    return df
\ No newline at end of file
+    return df
+
+def count_daily_price(code, before_date):
+    """before_date 이전에 저장된 봉 수 (주봉/월봉 증분 갱신 시 과거 구간 보충 여부 확인용)"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM stock_prices WHERE code = ? AND date < ?", (code, before_date))
+    res = c.fetchone()[0]
+    conn.close()
+    return res
+
+def get_stored_codes():
+    """주가가 저장된 전체 종목 코드"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT DISTINCT code FROM stock_prices")
+    res = [row[0] for row in c.fetchall()]
+    conn.close()
+    return res
+
+def get_last_price_dates():
+    """{code: 마지막 저장 봉 날짜}"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT code, max(date) FROM stock_prices GROUP BY code")
+    res = dict(c.fetchall())
+    conn.close()
+    return res
+
+def load_price_panel(codes=None, start_date=None):
+    """여러 종목 주가를 한 번의 쿼리로 로드 (code, Date, Open, High, Low, Close, Volume 롱 포맷)"""
+    conn = get_price_conn()
+    query = "SELECT code, date, open, high, low, close, volume FROM stock_prices"
+    conds, params = [], []
+    if codes is not None:
+        codes = [str(c) for c in codes]
+        if not codes:
+            conn.close()
+            return pd.DataFrame(columns=['code', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        conds.append(f"code IN ({','.join('?' * len(codes))})")
+        params.extend(codes)
+    if start_date:
+        conds.append("date >= ?")
+        params.append(start_date)
+    if conds: query += " WHERE " + " AND ".join(conds)
+    query += " ORDER BY code ASC, date ASC"
+    df = pd.read_sql(query, conn, params=params)
+    conn.close()
+
+    df.columns = ['code', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+def save_earnings_dates(code, dates):
+    """실적 발표일 목록 저장 (이미 있으면 갱신 시각만 바꿈). 저장한 날짜 수 반환"""
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.executemany("INSERT OR REPLACE INTO earnings_dates (code, date, updated_at) VALUES (?, ?, ?)",
+                  [(str(code), d, now_str) for d in dates])
+    conn.commit()
+    conn.close()
+    return len(dates)
+
+def get_earnings_dates(codes=None):
+    """{code: [발표일, ...]} (날짜 오름차순)"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    if codes is None:
+        c.execute("SELECT code, date FROM earnings_dates ORDER BY code, date")
+    else:
+        codes = [str(x) for x in codes]
+        if not codes:
+            conn.close(); return {}
+        c.execute(f"SELECT code, date FROM earnings_dates WHERE code IN ({','.join('?' * len(codes))}) ORDER BY code, date", codes)
+    res = {}
+    for code, d in c.fetchall(): res.setdefault(code, []).append(d)
+    conn.close()
+    return res
+
+def get_price_fingerprints():
+    """{code: (첫 봉 날짜, 마지막 봉 날짜, 봉 수)} (횡단면 순위 증분 갱신용)"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT code, min(date), max(date), COUNT(*) FROM stock_prices GROUP BY code")
+    res = {row[0]: tuple(row[1:]) for row in c.fetchall()}
+    conn.close()
+    return res
+
+def get_xsection_progress():
+    """{code: (첫 봉 날짜, 마지막 봉 날짜, 봉 수)} - 마지막 순위 계산에 반영된 종목별 구간"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT code, first_date, last_date, rows FROM xsection_progress")
+    res = {row[0]: tuple(row[1:]) for row in c.fetchall()}
+    conn.close()
+    return res
+
+def load_close_prices(start_date=None):
+    """전 종목 종가 (code, date, close 롱 포맷, 종목 · 날짜 오름차순)"""
+    conn = get_price_conn()
+    query = "SELECT code, date, close FROM stock_prices"
+    params = []
+    if start_date:
+        query += " WHERE date >= ?"; params.append(start_date)
+    query += " ORDER BY code ASC, date ASC"
+    df = pd.read_sql(query, conn, params=params)
+    conn.close()
+    return df
+
+def save_xsection_ranks(rows, progress):
+    """rows: [(code, date, r3m, r6m, r12m), ...] 와 progress: [(code, first, last, rows), ...] 를 같은 트랜잭션으로 기록"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.executemany("INSERT OR REPLACE INTO xsection_ranks (code, date, r3m, r6m, r12m) VALUES (?, ?, ?, ?, ?)", rows)
+    c.executemany("INSERT OR REPLACE INTO xsection_progress (code, first_date, last_date, rows) VALUES (?, ?, ?, ?)", progress)
+    conn.commit()
+    conn.close()
+
+def load_xsection_ranks(codes, start_date=None):
+    """종목들의 날짜별 횡단면 순위 → DataFrame (code, date, r3m, r6m, r12m)"""
+    codes = [str(x) for x in codes]
+    if not codes: return pd.DataFrame(columns=['code', 'date', 'r3m', 'r6m', 'r12m'])
+    conn = get_price_conn()
+    query = f"SELECT code, date, r3m, r6m, r12m FROM xsection_ranks WHERE code IN ({','.join('?' * len(codes))})"
+    params = list(codes)
+    if start_date:
+        query += " AND date >= ?"; params.append(start_date)
+    query += " ORDER BY code ASC, date ASC"
+    df = pd.read_sql(query, conn, params=params)
+    conn.close()
+    return df
+
+def get_price_coverage(code):
+    """다운로드 완료 구간 {'symbol', 'start_date', 'end_date'} 반환
+    (기록이 없으면 저장된 주가의 최소/최대 날짜로 대체, 그마저 없으면 None)"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT symbol, start_date, end_date FROM price_coverage WHERE code = ?", (code,))
+    row = c.fetchone()
+    if not row:
+        c.execute("SELECT min(date), max(date) FROM stock_prices WHERE code = ?", (code,))
+        mm = c.fetchone()
+        row = (None, mm[0], mm[1]) if mm and mm[0] else None
+    conn.close()
+    if not row: return None
+    return {'symbol': row[0], 'start_date': row[1], 'end_date': row[2]}
+
+def update_price_coverage(code, symbol=None, start_date=None, end_date=None):
+    """다운로드 구간 확장 기록 (시작일은 더 과거로, 종료일은 더 최근으로만 갱신)"""
+    cov = get_price_coverage(code) or {'symbol': None, 'start_date': None, 'end_date': None}
+    new_symbol = symbol or cov['symbol']
+    new_start = min(d for d in [cov['start_date'], start_date] if d) if (cov['start_date'] or start_date) else None
+    new_end = max(d for d in [cov['end_date'], end_date] if d) if (cov['end_date'] or end_date) else None
+
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute('''INSERT OR REPLACE INTO price_coverage (code, symbol, start_date, end_date)
+                 VALUES (?, ?, ?, ?)''', (code, new_symbol, new_start, new_end))
+    conn.commit()
+    conn.close()
+
+# =========================================================
+# [Part 3] 종목 마스터 스냅샷 (stock_data.db 사용)
+# =========================================================
+
+def save_master_listing(market, df, snapshot_date):
+    """필터링이 끝난 종목 리스트를 시장 단위로 통째 교체 저장"""
+    if df is None or df.empty: return False
+
+    rows = [(market, str(code), str(name)) for code, name in zip(df['Code'], df['Name'])]
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = get_price_conn()
+    c = conn.cursor()
+    try:
+        # 삭제 + 삽입을 하나의 트랜잭션으로 처리 (중간 실패 시 기존 스냅샷 유지)
+        c.execute("DELETE FROM master_listings WHERE market = ?", (market,))
+        c.executemany("INSERT OR REPLACE INTO master_listings (market, code, name) VALUES (?, ?, ?)", rows)
+        c.execute('''INSERT OR REPLACE INTO listing_meta
+                     (market, snapshot_date, row_count, last_updated)
+                     VALUES (?, ?, ?, ?)''', (market, snapshot_date, len(rows), now_str))
+        conn.commit()
+        return True
+    except sqlite3.Error:
+        conn.rollback()
+        return False
+    finally: conn.close()
+
+def load_master_listing(market):
+    """저장된 스냅샷 로드. (DataFrame, 기준일) 반환, 없으면 (None, None)"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT snapshot_date FROM listing_meta WHERE market = ?", (market,))
+    meta = c.fetchone()
+    if not meta:
+        conn.close()
+        return None, None
+
+    df = pd.read_sql("SELECT code, name, market FROM master_listings WHERE market = ? ORDER BY rowid ASC",
+                     conn, params=(market,))
+    conn.close()
+    if df.empty: return None, None
+
+    df.columns = ['Code', 'Name', 'Market']
+    return df, meta[0]
+
+def get_listing_names():
+    """전 시장 스냅샷의 {code: (name, market)}"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT code, name, market FROM master_listings")
+    res = {row[0]: (row[1], row[2]) for row in c.fetchall()}
+    conn.close()
+    return res
+
+
+# =========================================================
+# [신규] 전략 신호 테이블 (stock_data.db 사용)
+# =========================================================
+
+def save_signals(rows, progress, reset=None):
+    """rows: [(strategy_name, code, date, entry, score), ...]
+    progress: [(strategy_name, code, signature, last_date, first_date, bar_count), ...] 를 같은 트랜잭션으로 기록
+    reset: [(strategy_name, code), ...] 서명 / 과거 구간이 바뀐 조합은 기존 행을 먼저 삭제. 추가된 행 수 반환"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    if reset:
+        c.executemany("DELETE FROM strategy_signals WHERE strategy_name = ? AND code = ?", reset)
+    before = conn.total_changes
+    c.executemany('''INSERT OR REPLACE INTO strategy_signals (strategy_name, code, date, entry, score)
+                     VALUES (?, ?, ?, ?, ?)''', rows)
+    inserted = conn.total_changes - before
+    c.executemany('''INSERT OR REPLACE INTO signal_progress (strategy_name, code, signature, last_date, first_date, bar_count)
+                     VALUES (?, ?, ?, ?, ?, ?)''', progress)
+    conn.commit()
+    conn.close()
+    return inserted
+
+def get_signal_progress(strategy_name=None, codes=None):
+    """{(strategy_name, code): (signature, last_date, first_date, bar_count)}"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    query = "SELECT strategy_name, code, signature, last_date, first_date, bar_count FROM signal_progress"
+    conds, params = [], []
+    if strategy_name:
+        conds.append("strategy_name = ?"); params.append(strategy_name)
+    if codes is not None:
+        codes = [str(x) for x in codes]
+        conds.append(f"code IN ({','.join('?' * len(codes))})"); params.extend(codes)
+    if conds: query += " WHERE " + " AND ".join(conds)
+    c.execute(query, params)
+    res = {(r[0], r[1]): tuple(r[2:]) for r in c.fetchall()}
+    conn.close()
+    return res
+
+def load_signals(strategy_name=None, market=None, start_date=None, end_date=None, codes=None, entries_only=False):
+    """신호 테이블 조회 (예: TH 전략의 지난달 KOSDAQ 신호) → DataFrame (strategy_name, code, date, entry, score)"""
+    conn = get_price_conn()
+    query = "SELECT strategy_name, code, date, entry, score FROM strategy_signals"
+    conds, params = [], []
+    if strategy_name:
+        conds.append("strategy_name = ?"); params.append(strategy_name)
+    if start_date:
+        conds.append("date >= ?"); params.append(start_date)
+    if end_date:
+        conds.append("date <= ?"); params.append(end_date)
+    if codes is not None:
+        codes = [str(x) for x in codes]
+        if not codes:
+            conn.close()
+            return pd.DataFrame(columns=['strategy_name', 'code', 'date', 'entry', 'score'])
+        conds.append(f"code IN ({','.join('?' * len(codes))})"); params.extend(codes)
+    if market:
+        conds.append("code IN (SELECT code FROM master_listings WHERE market = ?)"); params.append(market)
+    if entries_only: conds.append("entry = 1")
+    if conds: query += " WHERE " + " AND ".join(conds)
+    query += " ORDER BY date ASC, code ASC"
+    df = pd.read_sql(query, conn, params=params)
+    conn.close()
+    return df
+
+
+# =========================================================
+# [Part 4] 재무 정보 캐시 (stock_data.db 사용)
+# =========================================================
+
+def save_fundamentals(code, fields):
+    """{항목명: 표시값} 저장 (항목별 갱신 시각 기록)"""
+    if not fields: return
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.executemany('''INSERT OR REPLACE INTO fundamentals (code, field, value, updated_at)
+                     VALUES (?, ?, ?, ?)''',
+                  [(str(code), k, str(v), now_str) for k, v in fields.items()])
+    conn.commit()
+    conn.close()
+
+def load_fundamentals(code):
+    """{항목명: (표시값, 갱신시각 문자열)} 반환"""
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT field, value, updated_at FROM fundamentals WHERE code = ?", (str(code),))
+    res = {row[0]: (row[1], row[2]) for row in c.fetchall()}
+    conn.close()
+    return res
+
+
+# =========================================================
+# [Part 5] 환율 시계열 (stock_data.db 사용)
+# =========================================================
+
+def get_last_fx_date(pair):
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT max(date) FROM fx_rates WHERE pair = ?", (pair,))
+    res = c.fetchone()
+    conn.close()
+    return res[0] if res else None
+
+def save_fx_rates(pair, series):
+    """날짜 인덱스 Series(종가) 저장"""
+    if series is None or series.empty: return
+    rows = [(pair, d.strftime("%Y-%m-%d"), float(v)) for d, v in series.items() if pd.notna(v) and v > 0]
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.executemany("INSERT OR REPLACE INTO fx_rates (pair, date, rate) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+def load_fx_rates(pair):
+    """날짜 오름차순 Series 반환 (없으면 None)"""
+    conn = get_price_conn()
+    df = pd.read_sql("SELECT date, rate FROM fx_rates WHERE pair = ? ORDER BY date ASC", conn, params=(pair,))
+    conn.close()
+    if df.empty: return None
+    return pd.Series(df['rate'].values, index=pd.to_datetime(df['date']))
+
+# [신규] 시장 지수 종가 (상대강도 기준선)
+def get_last_index_date(symbol):
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.execute("SELECT max(date) FROM index_prices WHERE symbol = ?", (symbol,))
+    res = c.fetchone()
+    conn.close()
+    return res[0] if res else None
+
+def save_index_prices(symbol, series):
+    """날짜 인덱스 Series(종가) 저장"""
+    if series is None or series.empty: return
+    rows = [(symbol, d.strftime("%Y-%m-%d"), float(v)) for d, v in series.items() if pd.notna(v) and v > 0]
+    conn = get_price_conn()
+    c = conn.cursor()
+    c.executemany("INSERT OR REPLACE INTO index_prices (symbol, date, close) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+def load_index_prices(symbol):
+    """날짜 오름차순 Series 반환 (없으면 None)"""
+    conn = get_price_conn()
+    df = pd.read_sql("SELECT date, close FROM index_prices WHERE symbol = ? ORDER BY date ASC", conn, params=(symbol,))
+    conn.close()
+    if df.empty: return None
+    return pd.Series(df['close'].values, index=pd.to_datetime(df['date']))
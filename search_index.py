@@ -0,0 +1,231 @@
+import time
+import bisect
+from collections import defaultdict
+
+# -----------------------------------------------------------------------------
+# [신규] 종목 검색 인덱스 (코드/이름 정확 일치, 접두어, 초성, 오타 허용)
+# - 종목 마스터 스냅샷 1회당 한 번만 빌드하여 메모리에 유지
+# - 검색 시 전체 종목 선형 스캔 없이 dict / bisect / n-gram 역색인만 사용
+# -----------------------------------------------------------------------------
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+        "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+CHO_SET = set(CHO)
+
+# 매칭 단계별 기본 점수 (높을수록 우선)
+SCORE_CODE_EXACT = 1000
+SCORE_NAME_EXACT = 900
+SCORE_CODE_PREFIX = 800
+SCORE_NAME_PREFIX = 700
+SCORE_CHOSUNG_PREFIX = 600
+SCORE_CHOSUNG_CONTAINS = 500
+SCORE_NAME_CONTAINS = 400
+SCORE_FUZZY = 300
+FUZZY_MIN_SIMILARITY = 0.5
+
+def normalize(text):
+    return str(text).strip().upper().replace(" ", "")
+
+def to_chosung(text):
+    """한글 음절을 초성으로 변환 (그 외 문자는 그대로)"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172: out.append(CHO[code // 588])
+        else: out.append(ch)
+    return "".join(out)
+
+def to_jamo(text):
+    """한글 음절을 초/중/종성 자모열로 분해 (오타 허용 비교용)"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(CHO[code // 588])
+            out.append(JUNG[(code % 588) // 28])
+            out.append(JONG[code % 28])
+        else: out.append(ch)
+    return "".join(out)
+
+def is_chosung_query(text):
+    return bool(text) and all(ch in CHO_SET for ch in text)
+
+def _bigrams(text):
+    if len(text) < 2: return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+class StockSearchIndex:
+    def __init__(self, frames):
+        """frames: ['Code', 'Name', 'Market'] 컬럼을 가진 DataFrame 목록 (앞쪽 시장이 동점 시 우선)"""
+        self.codes, self.names, self.markets = [], [], []
+        self.by_code = {}
+        self.by_name = {}
+        seen = set()
+
+        for df in frames:
+            if df is None or df.empty: continue
+            for code, name, market in zip(df['Code'], df['Name'], df['Market']):
+                code = str(code); name = str(name)
+                if code in seen: continue
+                seen.add(code)
+                self.codes.append(code); self.names.append(name); self.markets.append(market)
+
+        norm_names = [normalize(n) for n in self.names]
+        self.chosung = [to_chosung(n) for n in norm_names]
+        self.jamo = [to_jamo(n) for n in norm_names]
+        self.norm_names = norm_names
+
+        for i, (code, name) in enumerate(zip(self.codes, norm_names)):
+            self.by_code.setdefault(code.upper(), i)
+            self.by_name.setdefault(name, i)
+
+        # 접두어 검색용 정렬 리스트 (bisect)
+        self._code_sorted = sorted((c.upper(), i) for i, c in enumerate(self.codes))
+        self._name_sorted = sorted((n, i) for i, n in enumerate(norm_names))
+        self._cho_sorted = sorted((c, i) for i, c in enumerate(self.chosung))
+
+        # 부분일치/오타 검색용 bigram 역색인
+        self._name_grams = self._build_postings(norm_names)
+        self._cho_grams = self._build_postings(self.chosung)
+        self._jamo_grams = self._build_postings(self.jamo)
+        self._jamo_gram_cnt = [len(_bigrams(j)) for j in self.jamo]
+
+    def __len__(self):
+        return len(self.codes)
+
+    @staticmethod
+    def _build_postings(keys):
+        postings = defaultdict(list)
+        for i, key in enumerate(keys):
+            for g in _bigrams(key): postings[g].append(i)
+        return dict(postings)
+
+    @staticmethod
+    def _prefix(sorted_list, prefix, limit):
+        res = []
+        pos = bisect.bisect_left(sorted_list, (prefix, -1))
+        while pos < len(sorted_list) and len(res) < limit:
+            key, i = sorted_list[pos]
+            if not key.startswith(prefix): break
+            res.append((key, i))
+            pos += 1
+        return res
+
+    @staticmethod
+    def _contains(postings, keys, query, limit):
+        """bigram 교집합으로 후보를 좁힌 뒤 실제 포함 여부 확인"""
+        grams = _bigrams(query)
+        lists = sorted((postings.get(g, []) for g in grams), key=len)
+        if not lists or not lists[0]: return []
+        cand = set(lists[0])
+        for lst in lists[1:]:
+            cand.intersection_update(lst)
+            if not cand: return []
+        return [i for i in sorted(cand) if query in keys[i]][:limit]
+
+    def _fuzzy(self, query, limit):
+        """자모 bigram Dice 유사도 기반 오타 허용 후보"""
+        q_grams = _bigrams(to_jamo(query))
+        if not q_grams: return []
+        counts = defaultdict(int)
+        for g in q_grams:
+            for i in self._jamo_grams.get(g, ()): counts[i] += 1
+        res = []
+        for i, hit in counts.items():
+            sim = 2.0 * hit / (len(q_grams) + self._jamo_gram_cnt[i])
+            if sim >= FUZZY_MIN_SIMILARITY: res.append((sim, i))
+        res.sort(key=lambda x: (-x[0], x[1]))
+        return res[:limit]
+
+    def lookup_code(self, code):
+        i = self.by_code.get(normalize(code))
+        return None if i is None else self._item(i, SCORE_CODE_EXACT)
+
+    def lookup_name(self, name):
+        i = self.by_name.get(normalize(name))
+        return None if i is None else self._item(i, SCORE_NAME_EXACT)
+
+    def _item(self, i, score):
+        return {"code": self.codes[i], "name": self.names[i], "market": self.markets[i], "score": score}
+
+    def search(self, keyword, k=10):
+        """상위 k개 후보를 점수 순으로 반환 [{code, name, market, score}, ...]"""
+        q = normalize(keyword)
+        if not q or not self.codes: return []
+
+        best = {}
+        def put(i, score):
+            if score > best.get(i, -1): best[i] = score
+
+        if q in self.by_code: put(self.by_code[q], SCORE_CODE_EXACT)
+        if q in self.by_name: put(self.by_name[q], SCORE_NAME_EXACT)
+
+        # 짧은 이름/코드일수록 검색어에 가까우므로 길이 차이만큼 감점
+        for key, i in self._prefix(self._code_sorted, q, k):
+            put(i, SCORE_CODE_PREFIX - (len(key) - len(q)))
+        for key, i in self._prefix(self._name_sorted, q, k * 3):
+            put(i, SCORE_NAME_PREFIX - (len(key) - len(q)))
+
+        if is_chosung_query(q):
+            for key, i in self._prefix(self._cho_sorted, q, k * 3):
+                put(i, SCORE_CHOSUNG_PREFIX - (len(key) - len(q)))
+            if len(best) < k:
+                for i in self._contains(self._cho_grams, self.chosung, q, k * 3):
+                    put(i, SCORE_CHOSUNG_CONTAINS - (len(self.chosung[i]) - len(q)))
+        elif len(best) < k and len(q) >= 2:
+            for i in self._contains(self._name_grams, self.norm_names, q, k * 3):
+                put(i, SCORE_NAME_CONTAINS - (len(self.norm_names[i]) - len(q)))
+
+        if len(best) < k and len(q) >= 2 and not is_chosung_query(q):
+            for sim, i in self._fuzzy(q, k * 3):
+                put(i, SCORE_FUZZY * sim)
+
+        ranked = sorted(best.items(), key=lambda x: (-x[1], x[0]))[:k]
+        return [self._item(i, round(score, 1)) for i, score in ranked]
+
+# -----------------------------------------------------------------------------
+# 벤치마크: 기존 선형 스캔(str.contains) vs 인덱스 검색
+# -----------------------------------------------------------------------------
+def _linear_search(frames, keyword):
+    """기존 data_loader.search_code_by_name 방식 재현"""
+    import pandas as pd
+    keyword = str(keyword).strip().upper()
+    df_kr = pd.concat(frames[:2])
+    exact = df_kr[df_kr['Name'] == keyword]
+    if not exact.empty: return exact.iloc[0]['Code']
+    contains = df_kr[df_kr['Name'].str.contains(keyword, case=False, regex=False)]
+    if not contains.empty: return contains.iloc[0]['Code']
+    for df_us in frames[2:]:
+        res = df_us[df_us['Code'] == keyword]
+        if not res.empty: return res.iloc[0]['Code']
+        res_name = df_us[df_us['Name'].str.contains(keyword, case=False, regex=False)]
+        if not res_name.empty: return res_name.iloc[0]['Code']
+    return None
+
+def benchmark(frames, queries, repeat=20):
+    """frames: [KOSPI, KOSDAQ, NASDAQ, S&P500] 순서의 종목 마스터"""
+    t0 = time.perf_counter()
+    index = StockSearchIndex(frames)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries: _linear_search(frames, q)
+    linear_ms = (time.perf_counter() - t0) * 1000 / (repeat * len(queries))
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for q in queries: index.search(q, k=10)
+    index_ms = (time.perf_counter() - t0) * 1000 / (repeat * len(queries))
+
+    return {"entries": len(index), "build_ms": build_ms, "linear_ms": linear_ms,
+            "index_ms": index_ms, "speedup": linear_ms / index_ms if index_ms > 0 else float('inf')}
+
+if __name__ == "__main__":
+    import data_loader as dl
+    frames = [dl.get_master_data(m) for m in ["KOSPI", "KOSDAQ", "NASDAQ", "S&P500"]]
+    queries = ["삼성전자", "005930", "현대", "ㅅㅅㅈㅈ", "삼선전자", "NVDA", "APPLE", "카카오", "ㅋㅋㅇ", "셀트리온"]
+    res = benchmark(frames, queries)
+    print(f"entries={res['entries']} build={res['build_ms']:.1f}ms "
+          f"linear={res['linear_ms']:.3f}ms/query index={res['index_ms']:.4f}ms/query (x{res['speedup']:.0f})")
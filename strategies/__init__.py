@@ -1,2 +1,24 @@
-from .common import get_exchange_rate, format_price, fetch_data, calculate_indicators
-from .scanner import analyze_single_stock, analyze_strategy_deep_dive, get_all_strategies_status
\ No newline at end of file
+from .common import get_exchange_rate, get_usd_krw, format_price, fetch_data, calculate_indicators
+from .common import SCAN_HISTORY_DAYS, FULL_HISTORY_DAYS, ensure_history, backfill_history_async
+from .common import get_cached_financial_summary, prefetch_fundamentals, get_fundamentals_cache_stats
+from .scanner import analyze_single_stock, analyze_strategy_deep_dive, get_all_strategies_status
+from .library import ACTIVE_STRATEGIES, DEFAULT_STRATEGIES, OPT_IN_STRATEGIES, StrategyRule
+from .signals import get_signal_cache_stats, clear_signal_cache
+from .rules import RULES_FILE, RULE_ERRORS, compile_condition, compile_expr, load_rule_definitions
+from .backtest import run_trade_backtest, backtest_universe, summarize_trades
+from .optimizer import SWEEP_GRIDS, grid_params, random_params, run_sweep
+from .optimizer import WF_TRAIN_MONTHS, WF_TEST_MONTHS, run_walk_forward, summarize_walk_forward
+from .portfolio import DEFAULT_CAPITAL, DEFAULT_MAX_POSITIONS, DEFAULT_RISK_PCT, run_portfolio_backtest
+from .replay import replay_scan_history
+from .backcheck import HORIZONS as BACKCHECK_HORIZONS, backcheck_history
+from .backcheck import STATS_HORIZON, refresh_strategy_stats, refresh_strategy_stats_async
+from .event_study import EVENT_HORIZON, run_event_study
+from .bootstrap import N_BOOT, bootstrap_groups, strategy_ci_table
+from .ensemble import ENSEMBLE_HOLD, MIN_TEST_SIGNALS, evaluate_ensembles
+from .signal_store import materialize_signals, materialize_signals_async
+from .ranking import RANK_TOP_K, ScoreRanker, TopK, get_score_ranker, score_distributions
+from .alerts import ALERT_SINKS, AlertSink, LogSink, register_alert_sink, run_favorite_alerts, run_favorite_alerts_async
+from .timeframes import TIMEFRAMES, timeframe_column
+from .vwap import VWAP_PREFIX, anchored_vwap, anchor_index, add_vwap_columns, vwap_column, refresh_earnings_async
+from .rolling import ROLL_WINDOW, rolling_column, rolling_quantile, rolling_rank
+from .relative import RS_BENCHMARKS, XRANK_HORIZONS, cross_rank, relative_column, rs_line, update_benchmarks, update_cross_ranks, refresh_cross_ranks_async
\ No newline at end of file
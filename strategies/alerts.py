@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+import database as db
+from .common import ensure_history
+from .library import ACTIVE_STRATEGIES, DEFAULT_STRATEGIES
+from .panel import load_panel
+from .backtest import _scores_2d, MIN_BARS
+
+# -----------------------------------------------------------------------------
+# [신규] 관심종목 신호 알림 엔진
+# - 전 사용자 관심종목을 종목 단위로 묶어 종목마다 한 번만 평가 (팔로워가 많아도 계산은 1회)
+# - 종목별 평가 완료일(alert_progress) 이후 새로 저장된 봉만 검사 (처음 보는 종목은 마지막 봉만)
+# - 포착 = 스캐너와 같은 strategy.score() > 0 (신호 테이블이 덮고 있으면 테이블에서 읽음)
+# - 알림은 팔로워마다 signal_alerts 에 저장 (로그인 시 표시) + 등록된 전달 통로(sink)로 발송
+# - [수정] 기본은 기본 스캔과 같은 DEFAULT_STRATEGIES, 사용자별로 알림 받을 전략을 고를 수 있음 (alert_settings)
+#   호출 측이 strategies 를 주면 전 사용자에게 그 전략만 평가
+# -----------------------------------------------------------------------------
+ALERT_LOG_FILE = os.path.join(db.DB_DIR, "alerts.log")
+_ALERT_FIELDS = ('username', 'code', 'name', 'strategy_name', 'bar_date', 'score', 'price')
+
+class AlertSink:
+    """알림 전달 통로 (틀). send(alerts) 는 새로 저장된 알림 dict 리스트를 받음 (기본은 아무것도 안 함)"""
+    def send(self, alerts):
+        pass
+
+class LogSink(AlertSink):
+    """로컬 파일에 알림 한 건당 JSON 한 줄 추가 (테스트 / 발송 기록용)"""
+    def __init__(self, path=ALERT_LOG_FILE):
+        self.path = path
+
+    def send(self, alerts):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for a in alerts: f.write(json.dumps(a, ensure_ascii=False) + "\n")
+
+# 등록된 전달 통로 (메신저 / 메일 등은 AlertSink 를 상속해 register_alert_sink 로 추가)
+ALERT_SINKS = [LogSink()]
+
+def register_alert_sink(sink):
+    if sink not in ALERT_SINKS: ALERT_SINKS.append(sink)
+
+_alert_lock = threading.Lock()
+
+def run_favorite_alerts(strategies=None, ingest=False, chunk_size=500):
+    """관심종목 새 봉 평가 → 알림 저장 · 발송. {'alerts', 'codes', 'skipped', 'elapsed'} 반환
+    strategies: 전 사용자 공통 평가 전략 (None 이면 사용자별 설정, 설정이 없는 사용자는 DEFAULT_STRATEGIES)
+    ingest=True 면 관심종목 주가를 먼저 최신으로 수집. 다른 평가가 진행 중이면 None"""
+    if not _alert_lock.acquire(blocking=False): return None
+    try:
+        t0 = time.perf_counter()
+        followers = db.get_favorite_followers()
+        strategies, wanted = _alert_plan(strategies, followers)
+        if ingest:
+            for code in followers:
+                try: ensure_history(code)
+                except Exception as e: print(f"Alert Ingest Error ({code}): {e}")
+
+        last_bar = db.get_last_price_dates()
+        done = db.get_alert_progress()
+        pending = sorted(c for c in followers if c in last_bar and done.get(c, "") < last_bar[c])
+
+        alerts = 0
+        for i in range(0, len(pending), chunk_size):
+            chunk = pending[i:i + chunk_size]
+            panel = load_panel(chunk, None, min_bars=MIN_BARS)
+            rows = _panel_alerts(panel, strategies, followers, done, wanted) if panel is not None else []
+            inserted = db.save_alerts(rows, {c: last_bar[c] for c in chunk})
+            _deliver(inserted)
+            alerts += len(inserted)
+
+        return {"alerts": alerts, "codes": len(pending), "skipped": len(followers) - len(pending),
+                "elapsed": time.perf_counter() - t0}
+    finally:
+        _alert_lock.release()
+
+def _alert_plan(strategies, followers):
+    """(평가할 전략 리스트, {username: 알림 받을 전략 이름 집합} 또는 공통이면 None)"""
+    if strategies: return strategies, None
+    chosen = db.get_alert_strategies()
+    default = [s.name for s in DEFAULT_STRATEGIES]
+    wanted = {u: set(chosen.get(u, default)) for fs in followers.values() for u, _ in fs}
+    names = set().union(*wanted.values()) if wanted else set()
+    return [s for s in ACTIVE_STRATEGIES if s.name in names], wanted
+
+def _panel_alerts(panel, strategies, followers, done, wanted=None):
+    """패널 한 묶음의 새 봉 포착을 팔로워별 알림 행으로 (wanted 가 있으면 사용자가 고른 전략만)"""
+    dates = panel.dates
+    date_str = np.datetime_as_string(dates, unit='D')
+    new_bar = np.zeros(dates.shape, dtype=bool)
+    for j, code in enumerate(panel.codes):
+        if code in done: new_bar[:, j] = ~np.isnat(dates[:, j]) & (date_str[:, j] > done[code])
+        else: new_bar[-1, j] = True # 오른쪽 정렬 → 마지막 행이 종목별 마지막 봉
+    new_bar &= panel['Close'].notna().cumsum().to_numpy() >= MIN_BARS
+    close = panel['Close'].to_numpy()
+
+    rows = []
+    for strat in strategies:
+        score = _scores_2d(strat, panel)
+        for t, j in zip(*np.nonzero((score > 0) & new_bar)):
+            code = panel.codes[j]
+            for username, name in followers[code]:
+                if wanted is not None and strat.name not in wanted[username]: continue
+                rows.append((username, code, name or code, strat.name, date_str[t, j],
+                             float(score[t, j]), float(close[t, j])))
+    return rows
+
+def _deliver(rows):
+    if not rows: return
+    alerts = [dict(zip(_ALERT_FIELDS, r)) for r in rows]
+    for sink in ALERT_SINKS:
+        try: sink.send(alerts)
+        except Exception as e: print(f"Alert Sink Error ({type(sink).__name__}): {e}")
+
+def run_favorite_alerts_async(ingest=False, strategies=None):
+    threading.Thread(target=run_favorite_alerts, kwargs={'ingest': ingest, 'strategies': strategies}, daemon=True).start()
@@ -0,0 +1,125 @@
+import threading
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+import database as db
+
+# -----------------------------------------------------------------------------
+# [신규] 기간별 사후 검증 (Back-check) - 로컬 주가 저장소 기준
+# - scan_history 각 행의 포착일 봉을 기준으로 1/5/10/20 거래일 후 수익률,
+#   MAE(최대 역행폭: 최저가 기준) / MFE(최대 순행폭: 고가 기준) 계산
+# - 전 행을 종목+날짜 정렬 키에 대한 searchsorted 한 번으로 주가와 결합 (행 단위 루프/요청 없음)
+# - 포착일 이후 저장된 봉이 하나도 없는 행만 NeedsLive=True (화면에서 실시간 시세로 보완)
+# -----------------------------------------------------------------------------
+HORIZONS = (1, 5, 10, 20)
+EXCURSION_BARS = 20 # MAE/MFE 관찰 구간 (거래일)
+
+_DAY_SPAN = 1_000_000 # 종목 번호 * _DAY_SPAN + 일수 → 종목 내 날짜순 정렬 키
+
+def horizon_returns(picks, prices, horizons=HORIZONS, excursion_bars=EXCURSION_BARS):
+    """picks: scan_history DataFrame, prices: load_price_panel 롱 포맷 (code, Date 순 정렬)
+    → picks + R{h} (%), MAE/MFE (%), Bars(포착 후 저장 봉 수), LastClose, NeedsLive"""
+    out = picks.reset_index(drop=True).copy()
+    n = len(out)
+    if n == 0: return out
+
+    if prices is None or prices.empty:
+        p_code = np.array([], dtype=np.int64); key = p_code; close = high = low = np.array([])
+        cats = pd.Index([])
+    else:
+        cats = pd.Index(pd.unique(prices['code']))
+        p_code = cats.get_indexer(prices['code'])
+        p_day = prices['Date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+        key = p_code * _DAY_SPAN + p_day
+        close = prices['Close'].to_numpy(dtype=float)
+        high = prices['High'].to_numpy(dtype=float)
+        low = prices['Low'].to_numpy(dtype=float)
+
+    k_code = cats.get_indexer(out['code'].astype(str))
+    k_day = pd.to_datetime(out['scan_date']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+    has_code = k_code >= 0
+
+    # 포착일 이하 마지막 봉 (같은 종목 안에서만 유효)
+    base = np.searchsorted(key, np.where(has_code, k_code * _DAY_SPAN + k_day, -1), side='right') - 1
+    base_ok = has_code & (base >= 0)
+    base_ok[base_ok] &= p_code[base[base_ok]] == k_code[base_ok]
+    # 종목 마지막 봉 다음 위치 (forward 봉 범위 상한)
+    group_end = np.searchsorted(p_code, k_code, side='right') if len(p_code) else np.zeros(n, dtype=int)
+    # 포착일 봉이 없고 이후 봉만 있는 경우(신규 상장 등)는 base = 첫 봉 직전
+    first = np.searchsorted(p_code, k_code, side='left') if len(p_code) else np.zeros(n, dtype=int)
+    base = np.where(base_ok, base, first - 1)
+
+    entry = out['entry_price'].to_numpy(dtype=float)
+    base_close = close[np.clip(base, 0, None)] if len(close) else np.full(n, np.nan)
+    entry = np.where((entry > 0) | ~base_ok, entry, base_close)
+    out['entry_price'] = entry
+
+    def take(arr, idx, ok):
+        vals = arr[np.clip(idx, 0, len(arr) - 1)] if len(arr) else np.full(idx.shape, np.nan)
+        return np.where(ok, vals, np.nan)
+
+    for h in horizons:
+        idx = base + h
+        ok = has_code & (idx < group_end)
+        out[f'R{h}'] = (take(close, idx, ok) / entry - 1) * 100
+
+    if excursion_bars > 0:
+        win = base[:, None] + np.arange(1, excursion_bars + 1)
+        ok_win = has_code[:, None] & (win < group_end[:, None])
+        with np.errstate(all='ignore'):
+            lows = take(low, win, ok_win); highs = take(high, win, ok_win)
+            any_bar = ok_win.any(axis=1)
+            out['MAE'] = np.where(any_bar, (np.nanmin(np.where(any_bar[:, None], lows, 0), axis=1) / entry - 1) * 100, np.nan)
+            out['MFE'] = np.where(any_bar, (np.nanmax(np.where(any_bar[:, None], highs, 0), axis=1) / entry - 1) * 100, np.nan)
+
+    out['Bars'] = np.where(has_code, np.clip(group_end - 1 - base, 0, None), 0)
+    out['LastClose'] = take(close, group_end - 1, has_code & (group_end > 0))
+    out['NeedsLive'] = out['Bars'] == 0
+    return out
+
+def backcheck_history(scan_date=None, start_date=None, horizons=HORIZONS, excursion_bars=EXCURSION_BARS):
+    """scan_history (특정일 / 기간 / 전체) 에 대해 horizon_returns 계산. 주가는 한 번의 쿼리로 로드"""
+    picks = db.load_scan_history(scan_date, start_date)
+    if picks.empty: return picks
+    first_day = pd.to_datetime(picks['scan_date']).min() - timedelta(days=10)
+    prices = db.load_price_panel(sorted(picks['code'].astype(str).unique()), first_day.strftime('%Y-%m-%d'))
+    return horizon_returns(picks, prices, horizons, excursion_bars)
+
+
+# -----------------------------------------------------------------------------
+# [신규] strategy_stats 증분 갱신
+# - 아직 집계되지 않은 (스캔 행, 기간) 중 해당 기간 봉이 저장소에 생긴 것만 계산해
+#   strategy_stats_agg (전략 × 시장 × 기간 × 월) 에 더함. 이미 반영된 결과는 다시 계산하지 않음
+# - [수정] 확인한 행마다 종목 마지막 봉 날짜를 기록해 두고, 그 뒤 새 봉이 저장된 행만 다시 읽음
+#   (주가가 없거나 기간에 아직 못 미친 행을 매번 다시 계산하지 않음)
+# - 스캐너 라벨의 전역 승률(strategy_stats)은 STATS_HORIZON 기준 요약
+# -----------------------------------------------------------------------------
+STATS_HORIZON = 5 # calc_win_rate 와 동일한 5봉 기준
+_stats_lock = threading.Lock()
+
+def refresh_strategy_stats(horizons=HORIZONS):
+    """새로 확정된 결과 수 반환 (다른 갱신이 진행 중이면 0)"""
+    if not _stats_lock.acquire(blocking=False): return 0
+    try:
+        last_dates = db.get_last_price_dates()
+        pending = db.load_pending_outcomes(list(horizons), last_dates)
+        if pending.empty: return 0
+        first_day = pd.to_datetime(pending['scan_date']).min() - timedelta(days=10)
+        prices = db.load_price_panel(sorted(pending['code'].astype(str).unique()), first_day.strftime('%Y-%m-%d'))
+        res = horizon_returns(pending, prices, horizons, excursion_bars=0)
+
+        month = res['scan_date'].str[:7].to_numpy()
+        outcomes = []
+        for h in horizons:
+            ret = res[f'R{h}'].to_numpy()
+            new = ~np.isnan(ret) & np.array([h not in d for d in res['done']])
+            outcomes.extend(zip(res['id'][new].astype(int), [h] * int(new.sum()), ret[new].astype(float),
+                                res['strategy_name'][new], res['market'][new], month[new]))
+        saved = db.apply_scan_outcomes(outcomes, STATS_HORIZON)
+        db.mark_outcomes_checked([(last_dates.get(str(c), ''), int(i)) for c, i in zip(pending['code'], pending['id'])])
+        return saved
+    finally:
+        _stats_lock.release()
+
+def refresh_strategy_stats_async():
+    threading.Thread(target=refresh_strategy_stats, daemon=True).start()
@@ -0,0 +1,201 @@
+import time
+import pandas as pd
+import numpy as np
+from .library import ACTIVE_STRATEGIES
+from .panel import iter_panels
+from .signals import stored_signal_matrix
+
+# -----------------------------------------------------------------------------
+# [신규] 거래 단위 벡터화 백테스트 엔진
+# - 진입: 신호 발생 봉의 종가
+# - 청산: 손절 / 목표가 / 트레일링 스탑 (고가·저가 기준) / 시간 청산 (max_hold 봉 종가)
+# - 같은 봉에서 손절과 목표가가 동시에 닿으면 보수적으로 손절 처리
+# - 갭으로 손절가 아래(목표가 위)에서 시작하면 시가 체결
+# -----------------------------------------------------------------------------
+DEFAULT_MAX_HOLD = 20
+MIN_BARS = 60
+
+TRADE_COLUMNS = ['Code', 'EntryDate', 'ExitDate', 'EntryPrice', 'ExitPrice', 'Return', 'Bars', 'ExitReason']
+
+def _forward_window(arr, t_idx, j_idx, horizon):
+    """2차원 arr[t+1 .. t+horizon, j] 를 (신호 수, horizon) 행렬로 (범위 밖은 NaN)"""
+    padded = np.vstack([arr, np.full((horizon, arr.shape[1]), np.nan)])
+    return padded[t_idx[:, None] + np.arange(1, horizon + 1), j_idx[:, None]]
+
+def _select_non_overlapping(j_idx, entry_idx, exit_idx):
+    """보유 중 발생한 신호는 무시 (1종목 1포지션). 입력은 (종목, 진입봉) 순 정렬"""
+    keep = np.zeros(len(entry_idx), dtype=bool)
+    cur_j, free_from = -1, -1
+    for k in range(len(entry_idx)):
+        if j_idx[k] != cur_j:
+            cur_j, free_from = j_idx[k], -1
+        if entry_idx[k] > free_from:
+            keep[k] = True
+            free_from = exit_idx[k]
+    return keep
+
+def _as_2d(x):
+    arr = np.asarray(x, dtype=float)
+    return arr[:, None] if arr.ndim == 1 else arr
+
+def simulate_trades(o, h, l, c, entries, stop_levels, target_levels, max_hold=DEFAULT_MAX_HOLD,
+                    trail_pct=None, fee_pct=0.0, allow_overlap=False):
+    """(봉 × 종목) 배열 전체의 신호를 한 번에 거래로 변환 (루프는 겹침 제거에만 사용)
+    반환: dict(j, entry_t, exit_t, entry_px, exit_px, ret, bars, reason) - 각 항목은 1차원 배열"""
+    o, h, l, c = _as_2d(o), _as_2d(h), _as_2d(l), _as_2d(c)
+    sig = np.asarray(entries, dtype=bool)
+    if sig.ndim == 1: sig = sig[:, None]
+    sig = sig.copy(); sig[-1, :] = False # 마지막 봉 신호는 평가 불가
+
+    # (종목, 진입봉) 순으로 정렬된 신호 좌표
+    j_idx, t_idx = np.nonzero(sig.T)
+    if len(t_idx) == 0:
+        empty = np.array([], dtype=int)
+        return {"j": empty, "entry_t": empty, "exit_t": empty, "entry_px": np.array([]),
+                "exit_px": np.array([]), "ret": np.array([]), "bars": empty, "reason": np.array([], dtype=object)}
+
+    entry_px = c[t_idx, j_idx]
+    stop0 = _as_2d(stop_levels)[t_idx, j_idx]
+    target = _as_2d(target_levels)[t_idx, j_idx]
+    stop0 = np.where(np.isnan(stop0), -np.inf, stop0)
+    target = np.where(np.isnan(target), np.inf, target)
+
+    ow = _forward_window(o, t_idx, j_idx, max_hold); hw = _forward_window(h, t_idx, j_idx, max_hold)
+    lw = _forward_window(l, t_idx, j_idx, max_hold); cw = _forward_window(c, t_idx, j_idx, max_hold)
+    valid = ~np.isnan(cw)
+
+    stop_mat = np.broadcast_to(stop0[:, None], hw.shape)
+    if trail_pct:
+        # 직전 봉까지의 최고가 기준 트레일링 (당일 고가로 당일 스탑을 올리지 않음)
+        peak = np.fmax.accumulate(np.where(valid, hw, -np.inf), axis=1)
+        peak_prev = np.concatenate([entry_px[:, None], peak[:, :-1]], axis=1)
+        peak_prev = np.maximum(peak_prev, entry_px[:, None])
+        stop_mat = np.fmax(stop_mat, peak_prev * (1 - trail_pct))
+
+    hit_stop = valid & (lw <= stop_mat)
+    hit_target = valid & (hw >= target[:, None])
+    hit = hit_stop | hit_target
+    has_hit = hit.any(axis=1)
+    first = np.argmax(hit, axis=1)
+    n_valid = valid.sum(axis=1)
+    rows = np.arange(len(t_idx))
+
+    exit_off = np.where(has_hit, first, n_valid - 1)
+    is_stop = has_hit & hit_stop[rows, first]
+    open_at = ow[rows, exit_off]
+    stop_at = stop_mat[rows, exit_off]
+    stop_fill = np.where(np.isnan(open_at), stop_at, np.minimum(stop_at, open_at))
+    target_fill = np.where(np.isnan(open_at), target, np.maximum(target, open_at))
+    exit_px = np.where(is_stop, stop_fill, np.where(has_hit, target_fill, cw[rows, exit_off]))
+
+    trailed = is_stop & (stop_at > stop0) if trail_pct else np.zeros(len(t_idx), dtype=bool)
+    reason = np.where(is_stop, np.where(trailed, "trail", "stop"),
+                      np.where(has_hit, "target", np.where(n_valid == max_hold, "time", "open")))
+
+    exit_t = t_idx + 1 + exit_off
+    keep = np.ones(len(t_idx), dtype=bool) if allow_overlap else _select_non_overlapping(j_idx, t_idx, exit_t)
+
+    return {"j": j_idx[keep], "entry_t": t_idx[keep], "exit_t": exit_t[keep],
+            "entry_px": entry_px[keep], "exit_px": exit_px[keep],
+            "ret": ((exit_px / entry_px - 1) * 100 - fee_pct)[keep],
+            "bars": (exit_off + 1)[keep], "reason": reason[keep]}
+
+def _trades_frame(sim, dates, codes):
+    """simulate_trades 결과 + 날짜 배열(봉 × 종목) → 거래 DataFrame"""
+    dates = np.asarray(dates)
+    if dates.ndim == 1: dates = dates[:, None]
+    return pd.DataFrame({
+        'Code': [codes[j] for j in sim['j']],
+        'EntryDate': dates[sim['entry_t'], sim['j']], 'ExitDate': dates[sim['exit_t'], sim['j']],
+        'EntryPrice': sim['entry_px'], 'ExitPrice': sim['exit_px'],
+        'Return': sim['ret'], 'Bars': sim['bars'], 'ExitReason': sim['reason'],
+    }, columns=TRADE_COLUMNS)
+
+def _entries_2d(strategy, data, use_store=True):
+    # [신규] 패널은 신호 테이블이 덮고 있으면 재계산 없이 읽음
+    if use_store and isinstance(data['Close'], pd.DataFrame):
+        stored = stored_signal_matrix(strategy, data, 'entry')
+        if stored is not None: return stored
+    cond = strategy.backtest(data)
+    if isinstance(cond, pd.Series) and isinstance(data['Close'], pd.DataFrame):
+        return np.zeros(data['Close'].shape, dtype=bool) # 기본 StrategyBase (신호 없음)
+    return cond.fillna(False).to_numpy(dtype=bool)
+
+def _scores_2d(strategy, data, use_store=True):
+    """봉별 스캐너 점수 (봉 × 종목) 배열. 패널은 신호 테이블 우선"""
+    if use_store and isinstance(data['Close'], pd.DataFrame):
+        stored = stored_signal_matrix(strategy, data, 'score')
+        if stored is not None: return stored
+    return _as_2d(strategy.score(data))
+
+def run_trade_backtest(df, strategy, max_hold=DEFAULT_MAX_HOLD, trail_pct=None, fee_pct=0.0,
+                       allow_overlap=False, code=""):
+    """지표가 계산된 df 한 종목에 대해 전략의 backtest() 신호를 거래로 변환"""
+    stops, targets = strategy.exit_levels(df)
+    sim = simulate_trades(df['Open'], df['High'], df['Low'], df['Close'], _entries_2d(strategy, df),
+                          stops, targets, max_hold=max_hold, trail_pct=trail_pct,
+                          fee_pct=fee_pct, allow_overlap=allow_overlap)
+    return _trades_frame(sim, df.index.values, [code])
+
+def run_panel_backtest(panel, strategy, max_hold=DEFAULT_MAX_HOLD, trail_pct=None, fee_pct=0.0,
+                       allow_overlap=False):
+    """PricePanel 전 종목에 대해 한 번에 백테스트"""
+    stops, targets = strategy.exit_levels(panel)
+    sim = simulate_trades(panel['Open'], panel['High'], panel['Low'], panel['Close'],
+                          _entries_2d(strategy, panel), stops, targets, max_hold=max_hold,
+                          trail_pct=trail_pct, fee_pct=fee_pct, allow_overlap=allow_overlap)
+    return _trades_frame(sim, panel.dates, panel.codes)
+
+def max_drawdown(returns_pct):
+    """수익률(%) 순서대로 복리 누적한 자산곡선의 최대 낙폭(%)"""
+    if len(returns_pct) == 0: return 0.0
+    equity = np.cumprod(1 + np.asarray(returns_pct, dtype=float) / 100)
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    return float(((equity / peak) - 1).min() * -100)
+
+def summarize_trades(trades, total_bars=None):
+    """거래 목록 → 승률 / 기대값 / 손익비 / 최대낙폭 / 노출도 요약"""
+    n = len(trades)
+    if n == 0:
+        return {"trades": 0, "win_rate": 0.0, "expectancy": 0.0, "avg_win": 0.0, "avg_loss": 0.0,
+                "profit_factor": 0.0, "max_drawdown": 0.0, "exposure": 0.0, "avg_bars": 0.0}
+
+    ret = trades['Return'].to_numpy(dtype=float)
+    wins = ret[ret > 0]; losses = ret[ret <= 0]
+    gross_loss = -losses.sum()
+    # 청산일별 평균 수익률을 복리 누적 (단일 종목이면 거래 순차 복리와 동일)
+    daily = trades.groupby('ExitDate')['Return'].mean().sort_index().to_numpy(dtype=float)
+
+    return {
+        "trades": n,
+        "win_rate": len(wins) / n * 100,
+        "expectancy": float(ret.mean()),
+        "avg_win": float(wins.mean()) if len(wins) else 0.0,
+        "avg_loss": float(losses.mean()) if len(losses) else 0.0,
+        "profit_factor": float(wins.sum() / gross_loss) if gross_loss > 0 else float('inf'),
+        "max_drawdown": max_drawdown(daily),
+        "exposure": float(trades['Bars'].sum() / total_bars * 100) if total_bars else 0.0,
+        "avg_bars": float(trades['Bars'].mean()),
+    }
+
+def get_strategy(name):
+    """전략 이름(이모지/공백 무시)으로 ACTIVE_STRATEGIES 에서 찾기"""
+    key = str(name).replace(" ", "")
+    return next((s for s in ACTIVE_STRATEGIES if s.name.replace(" ", "") == key or key in s.name), None)
+
+def backtest_universe(strategy, codes=None, start_date=None, max_hold=DEFAULT_MAX_HOLD,
+                      trail_pct=None, fee_pct=0.0, chunk_size=500):
+    """저장된 전 종목 이력에 대해 한 전략을 백테스트. {'trades', 'summary', 'elapsed'} 반환"""
+    t0 = time.perf_counter()
+    if isinstance(strategy, str): strategy = get_strategy(strategy)
+
+    all_trades = []
+    total_bars = 0
+    for panel in iter_panels(codes, start_date, chunk_size=chunk_size, min_bars=MIN_BARS):
+        total_bars += int(panel.bar_counts().sum())
+        trades = run_panel_backtest(panel, strategy, max_hold=max_hold, trail_pct=trail_pct, fee_pct=fee_pct)
+        if not trades.empty: all_trades.append(trades)
+
+    trades = pd.concat(all_trades, ignore_index=True) if all_trades else pd.DataFrame(columns=TRADE_COLUMNS)
+    return {"trades": trades, "summary": summarize_trades(trades, total_bars),
+            "elapsed": time.perf_counter() - t0}
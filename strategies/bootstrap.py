@@ -0,0 +1,89 @@
+import threading
+import pandas as pd
+import numpy as np
+import database as db
+from .backtest import get_strategy
+from .event_study import forward_return_matrix
+
+# -----------------------------------------------------------------------------
+# [신규] 부트스트랩 신뢰구간 (승률 / 기대값)
+# - 그룹(전략 또는 종목)별 신호 수익률을 복원추출로 n_boot 번 재표본하여 백분위 구간 계산
+# - 같은 표본 수의 그룹끼리 묶어 (그룹 × 재표본 × 표본) 인덱스 배열 한 번으로 처리 (파이썬 루프 없음)
+# - 메모리 보호: 한 번에 만드는 인덱스 칸 수를 MAX_CELLS 이하로 나눠서 계산
+# -----------------------------------------------------------------------------
+N_BOOT = 2000
+CI_LEVEL = 0.95
+WIN_HOLD = 5 # calc_win_rate 와 동일한 5봉 후 종가 기준
+MAX_CELLS = 5_000_000
+
+CI_COLUMNS = ['n', 'win_rate', 'win_lo', 'win_hi', 'expectancy', 'exp_lo', 'exp_hi']
+
+def bootstrap_groups(values, groups=None, n_boot=N_BOOT, level=CI_LEVEL, seed=0):
+    """values: 수익률(%) 1차원, groups: 같은 길이의 그룹 라벨 (None 이면 전체 1그룹)
+    → DataFrame (index = 그룹, columns = CI_COLUMNS)"""
+    values = np.asarray(values, dtype=float)
+    if groups is None: groups = np.zeros(len(values), dtype=int)
+    labels, inv = np.unique(np.asarray(groups), return_inverse=True)
+    out = pd.DataFrame(np.nan, index=labels, columns=CI_COLUMNS)
+    if len(values) == 0: return out
+
+    order = np.argsort(inv, kind='stable')
+    v = values[order]
+    sizes = np.bincount(inv, minlength=len(labels))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rng = np.random.default_rng(seed)
+    q = [(1 - level) / 2 * 100, (1 + level) / 2 * 100]
+
+    res = np.full((len(labels), len(CI_COLUMNS)), np.nan)
+    for n in np.unique(sizes[sizes > 0]):
+        gs = np.nonzero(sizes == n)[0]
+        per_group = n_boot * n
+        batch = max(1, MAX_CELLS // per_group)       # 한 번에 처리할 그룹 수
+        boot_step = max(1, MAX_CELLS // n)           # 그룹 1개도 큰 경우 재표본을 나눔
+        for b in range(0, len(gs), batch):
+            g = gs[b:b + batch]
+            wins = np.empty((len(g), n_boot)); exps = np.empty((len(g), n_boot))
+            for k in range(0, n_boot, boot_step):
+                m = min(boot_step, n_boot - k)
+                sample = v[starts[g][:, None, None] + rng.integers(0, n, size=(len(g), m, n))]
+                wins[:, k:k + m] = (sample > 0).mean(axis=2) * 100
+                exps[:, k:k + m] = sample.mean(axis=2)
+            base = v[starts[g][:, None] + np.arange(n)]
+            res[g, 0] = n
+            res[g, 1] = (base > 0).mean(axis=1) * 100
+            res[g, 2:4] = np.percentile(wins, q, axis=1).T
+            res[g, 4] = base.mean(axis=1)
+            res[g, 5:7] = np.percentile(exps, q, axis=1).T
+    out[:] = res
+    out['n'] = out['n'].fillna(0).astype(int)
+    return out
+
+def signal_returns(df, strategy, hold=WIN_HOLD):
+    """단일 종목: backtest() 신호 봉 종가 대비 hold 봉 후 종가 수익률(%) 배열"""
+    cond = strategy.cached_entries(df).to_numpy(dtype=bool) # calc_win_rate / calc_win_rate_ci / deep_dive 공용
+    idx = np.nonzero(cond[:-hold])[0] if len(cond) > hold else np.array([], dtype=int)
+    close = df['Close'].to_numpy(dtype=float)
+    return (close[idx + hold] / close[idx] - 1) * 100
+
+# --- 전 종목 (연구소용): 전략별 / 종목별 ---
+_memo = {}
+_memo_lock = threading.Lock()
+
+def strategy_ci_table(strategy, hold=WIN_HOLD, by_ticker=False, n_boot=N_BOOT):
+    """저장소 전 종목의 전략 신호에 대한 CI. by_ticker=True 면 종목별 (주가 데이터 버전 단위 캐시)"""
+    if isinstance(strategy, str): strategy = get_strategy(strategy)
+    key = (strategy.name, tuple(sorted(strategy.params.items())), hold, by_ticker, n_boot, db.get_price_data_version())
+    with _memo_lock:
+        if key in _memo: return _memo[key]
+
+    paths, codes = forward_return_matrix(strategy, horizon=hold, with_codes=True)
+    ret = paths[:, hold - 1] if len(paths) else np.array([])
+    ok = ~np.isnan(ret)
+    groups = np.asarray(codes)[ok] if by_ticker else None
+    table = bootstrap_groups(ret[ok], groups, n_boot=n_boot)
+    if not by_ticker: table.index = [strategy.name]
+
+    with _memo_lock:
+        for k in [k for k in _memo if k[0] == strategy.name and k[-1] != key[-1]]: del _memo[k]
+        _memo[key] = table
+    return table
@@ -5,6 +5,8 @@ import yfinance as yf
 from datetime import datetime, timedelta
 import database as db
 import requests # [추가] 가짜 신분증 생성을 위해 필요
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # -----------------------------------------------------------------------------
 # [신규] 야후 파이낸스 차단 우회용 세션 생성 (가짜 신분증)
@@ -18,17 +20,91 @@ def get_yahoo_session():
     return session
 
 # -----------------------------------------------------------------------------
-# 1. 환율 정보
+# 1. 환율 정보 (DB 일별 시계열 + 메모리 as-of 조회)
 # -----------------------------------------------------------------------------
-def get_exchange_rate():
+FX_PAIR = "USDKRW=X"
+FX_HISTORY_DAYS = 730
+DEFAULT_USD_KRW = 1450.0
+
+# 날짜 문자열 -> 환율 (달력일 기준 forward-fill 되어 있어 조회는 dict 1회)
+_fx_memo = {'by_date': {}, 'first': None, 'last': None, 'loaded_on': None}
+_fx_lock = threading.Lock()
+_fx_refreshing = False
+
+def update_fx_rates():
+    """USD/KRW 일별 종가를 마지막 저장일 이후만 증분 수집. 신규 저장 시 True"""
+    last_date_str = db.get_last_fx_date(FX_PAIR)
+    today = datetime.now().date()
+    start_date = datetime.now() - timedelta(days=FX_HISTORY_DAYS)
+
+    if last_date_str:
+        last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
+        if last_date >= today - timedelta(days=1): return False
+        start_date = last_date + timedelta(days=1)
+
     try:
-        # session 추가
-        ticker = yf.Ticker("USDKRW=X", session=get_yahoo_session())
-        hist = ticker.history(period="5d")
-        if not hist.empty:
-            return float(hist['Close'].iloc[-1])
-    except: pass
-    return 1450.0
+        hist = yf.Ticker(FX_PAIR, session=get_yahoo_session()).history(start=start_date)
+        if hist.empty: return False
+        if hist.index.tz is not None:
+            hist.index = hist.index.tz_localize(None)
+        db.save_fx_rates(FX_PAIR, hist['Close'])
+        return True
+    except Exception: return False
+
+def _load_fx_memo():
+    series = db.load_fx_rates(FX_PAIR)
+    memo = {'by_date': {}, 'first': None, 'last': None, 'loaded_on': datetime.now().date()}
+    if series is not None and not series.empty:
+        full_idx = pd.date_range(series.index[0], series.index[-1], freq='D')
+        filled = series[~series.index.duplicated(keep='last')].reindex(full_idx).ffill()
+        memo['by_date'] = dict(zip(full_idx.strftime("%Y-%m-%d"), filled.values.tolist()))
+        memo['first'] = full_idx[0].strftime("%Y-%m-%d")
+        memo['last'] = full_idx[-1].strftime("%Y-%m-%d")
+    with _fx_lock:
+        _fx_memo.update(memo)
+
+def _refresh_fx_background():
+    global _fx_refreshing
+    try:
+        if update_fx_rates(): _load_fx_memo()
+    finally:
+        with _fx_lock: _fx_refreshing = False
+
+def _ensure_fx_loaded():
+    global _fx_refreshing
+    with _fx_lock:
+        loaded_on = _fx_memo['loaded_on']
+    if loaded_on is None:
+        _load_fx_memo()
+        with _fx_lock: empty = not _fx_memo['by_date']
+        if empty:
+            # 최초 1회만 동기 수집
+            update_fx_rates(); _load_fx_memo()
+        return
+
+    if loaded_on < datetime.now().date():
+        with _fx_lock:
+            if _fx_refreshing: return
+            _fx_refreshing = True
+            _fx_memo['loaded_on'] = datetime.now().date()
+        t = threading.Thread(target=_refresh_fx_background)
+        t.daemon = True; t.start()
+
+def get_usd_krw(date=None):
+    """해당 날짜(미지정 시 최신) 기준 USD/KRW. 휴일은 직전 거래일 환율"""
+    _ensure_fx_loaded()
+    with _fx_lock:
+        by_date, first, last = _fx_memo['by_date'], _fx_memo['first'], _fx_memo['last']
+    if not by_date: return DEFAULT_USD_KRW
+    if date is None: return by_date[last]
+
+    key = str(date)[:10]
+    rate = by_date.get(key)
+    if rate is not None: return rate
+    return by_date[first] if key < first else by_date[last]
+
+def get_exchange_rate():
+    return get_usd_krw()
 
 def format_price(val, market="KR", code=None):
     try:
@@ -44,50 +120,98 @@ def format_price(val, market="KR", code=None):
     except: return str(val)
 
 # -----------------------------------------------------------------------------
-# 2. 데이터 수집
+# 2. 데이터 수집 (계층형 보관 기간 + 구간 단위 증분/역방향 보충)
 # -----------------------------------------------------------------------------
-def fetch_data(code):
+SCAN_HISTORY_DAYS = 400   # 스캔용: MA200(200봉) + 단기 백테스트 구간
+FULL_HISTORY_DAYS = 730   # 연구소/백테스트용 심층 구간
+
+_history_locks = {}
+_history_guard = threading.Lock()
+_backfill_executor = ThreadPoolExecutor(max_workers=2)
+
+def _code_lock(code):
+    with _history_guard:
+        return _history_locks.setdefault(str(code), threading.Lock())
+
+def _download_history(code, symbol, start_date, end_date=None):
+    """야후 일봉 다운로드. 심볼 미확정 국내 종목은 .KS 실패 시 .KQ 재시도.
+    (DataFrame, 확정 심볼) 반환, 통신 실패 시 (None, symbol)"""
+    if not symbol:
+        symbol = f"{code}.KS" if str(code).isdigit() else str(code)
+        candidates = [symbol, symbol.replace(".KS", ".KQ")] if symbol.endswith(".KS") else [symbol]
+    else:
+        candidates = [symbol]
+
     try:
-        ticker_symbol = str(code)
-        if ticker_symbol.isdigit(): 
-            ticker_symbol = f"{code}.KS"
+        df_new = pd.DataFrame()
+        for sym in candidates:
+            # [수정] session 파라미터 추가
+            stock = yf.Ticker(sym, session=get_yahoo_session())
+            df_new = stock.history(start=start_date, end=end_date, auto_adjust=False)
+            if not df_new.empty:
+                symbol = sym
+                break
+
+        if not df_new.empty and df_new.index.tz is not None:
+            df_new.index = df_new.index.tz_localize(None)
+        return df_new, symbol
+    except Exception:
+        return None, symbol
 
-        last_date_str = db.get_last_price_date(code)
+def ensure_history(code, history_days=SCAN_HISTORY_DAYS):
+    """저장소가 최근 history_days 구간을 덮도록, 빠진 앞(신규 봉)/뒤(과거) 구간만 다운로드"""
+    with _code_lock(code):
         today = datetime.now().date()
-        
-        should_update = False
-        start_date = datetime.now() - timedelta(days=730)
-        
-        if last_date_str:
-            last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
-            if last_date < today - timedelta(days=1): 
-                should_update = True
-                start_date = last_date + timedelta(days=1)
-        else:
-            should_update = True
-
-        if should_update:
-            try:
-                # [수정] session 파라미터 추가
-                stock = yf.Ticker(ticker_symbol, session=get_yahoo_session())
-                df_new = stock.history(start=start_date, auto_adjust=False)
-                
-                if df_new.empty and ticker_symbol.endswith(".KS"):
-                    ticker_symbol = ticker_symbol.replace(".KS", ".KQ")
-                    stock = yf.Ticker(ticker_symbol, session=get_yahoo_session())
-                    df_new = stock.history(start=start_date, auto_adjust=False)
-                
-                if not df_new.empty:
-                    if df_new.index.tz is not None:
-                        df_new.index = df_new.index.tz_localize(None)
-                    db.save_daily_price(df_new, code)
-            except Exception: pass 
+        required_start = today - timedelta(days=history_days)
+        cov = db.get_price_coverage(code)
+        symbol = cov['symbol'] if cov else None
+
+        # 1. 최초 조회: 필요한 구간만 다운로드
+        if not cov:
+            df_new, symbol = _download_history(code, symbol, required_start)
+            if df_new is None: return
+            db.save_daily_price(df_new, code)
+            db.update_price_coverage(code, symbol=symbol if not df_new.empty else None,
+                                     start_date=required_start.strftime("%Y-%m-%d"),
+                                     end_date=today.strftime("%Y-%m-%d"))
+            return
+
+        # 2. 신규 봉 증분 (마지막 저장일 이후)
+        last_date_str = db.get_last_price_date(code) or cov['end_date']
+        last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
+        if last_date < today - timedelta(days=1):
+            df_new, symbol = _download_history(code, symbol, last_date + timedelta(days=1))
+            if df_new is not None:
+                db.save_daily_price(df_new, code)
+                db.update_price_coverage(code, symbol=symbol if not df_new.empty else None,
+                                         end_date=today.strftime("%Y-%m-%d"))
 
-        df_final = db.load_daily_price(code)
+        # 3. 과거 구간 보충 (이미 받은 시작일 이전만)
+        cov_start = datetime.strptime(cov['start_date'], "%Y-%m-%d").date()
+        if cov_start > required_start:
+            df_old, symbol = _download_history(code, symbol, required_start, cov_start)
+            if df_old is not None:
+                db.save_daily_price(df_old, code)
+                db.update_price_coverage(code, symbol=symbol if not df_old.empty else None,
+                                         start_date=required_start.strftime("%Y-%m-%d"))
+
+def backfill_history_async(codes, history_days=FULL_HISTORY_DAYS):
+    """연구소/백테스트용 심층 구간을 백그라운드로 보충"""
+    for code in codes:
+        _backfill_executor.submit(ensure_history, str(code), history_days)
+
+def fetch_data(code, history_days=SCAN_HISTORY_DAYS):
+    """history_days 구간을 보장한 뒤 해당 구간만 로드하여 지표 계산"""
+    try:
+        ensure_history(code, history_days)
+        start_str = (datetime.now() - timedelta(days=history_days)).strftime("%Y-%m-%d")
+        df_final = db.load_daily_price(code, start_date=start_str)
         
         if df_final is None or len(df_final) < 60:
             return None
-            
+
+        # [신규] 전략 신호 메모 키 (strategies/signals.py)
+        df_final.attrs.update(code=code, data_version=db.get_price_data_version())
         return calculate_indicators(df_final)
 
     except Exception:
@@ -105,6 +229,37 @@ def calculate_hma(series, period=14):
     hma = raw_hma.rolling(window=sqrt_length).mean()
     return hma
 
+_VWAP_DAY_KEY = 1 << 20
+
+def _trailing_vwap(df, days=SCAN_HISTORY_DAYS):
+    """[신규] 봉마다 최근 days 일(달력) 구간의 TP×Vol 합 / Vol 합.
+    실시간 스캔은 SCAN_HISTORY_DAYS 만 받아 그 구간 누적 VWAP 을 보므로, 같은 구간으로 잘라
+    재생 / 백테스트처럼 더 긴 이력을 올려도 날짜별 값이 스캔과 같게 함 (로드 길이와 무관).
+    단일 종목 DataFrame(DatetimeIndex) / 전 종목 패널(PricePanel.dates) 모두 지원"""
+    tpv, vol = df['TPV'], df['Volume']
+    if hasattr(df, 'dates'): dates = df.dates
+    elif isinstance(df.index, pd.DatetimeIndex): dates = df.index.values.astype('datetime64[ns]')[:, None]
+    else: return tpv.cumsum() / vol.cumsum().replace(0, np.nan) # 날짜 없는 프레임은 기존 누적 방식
+    x = tpv.to_numpy(dtype=float).reshape(len(tpv), -1)
+    v = vol.to_numpy(dtype=float).reshape(len(vol), -1)
+    n_bars, n_codes = x.shape
+    # 종목별 날짜를 (종목 × 2^20 + 일수) 키로 펴서 구간 시작 위치를 한 번에 searchsorted (패딩 NaT 는 0 → 구간 밖)
+    day = np.where(np.isnat(dates), 0, dates.astype('datetime64[D]').astype(np.int64))
+    key = (np.arange(n_codes)[None, :] * _VWAP_DAY_KEY + day).ravel(order='F')
+    start = np.searchsorted(key, key - days, side='left').reshape((n_codes, n_bars)).T
+    start -= np.arange(n_codes)[None, :] * n_bars # 종목 내 봉 위치로 환산
+    # 종목별 누적합(맨 앞 0) 차이로 구간 합 계산 - 종목 간 누적이 섞이지 않게 axis=0
+    cx = np.vstack([np.zeros((1, n_codes)), np.nancumsum(x, axis=0)])
+    cv = np.vstack([np.zeros((1, n_codes)), np.nancumsum(v, axis=0)])
+    cols = np.arange(n_codes)[None, :]
+    win_x = cx[1:] - cx[start, cols]
+    win_v = cv[1:] - cv[start, cols]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = np.where(win_v > 0, win_x / np.where(win_v > 0, win_v, 1.0), np.nan)
+    out[np.isnan(x)] = np.nan
+    if isinstance(tpv, pd.DataFrame): return pd.DataFrame(out, index=tpv.index, columns=tpv.columns)
+    return pd.Series(out[:, 0], index=tpv.index, name='VWAP')
+
 def calculate_indicators(df):
     if 'Close' not in df.columns: return df
 
@@ -147,14 +302,14 @@ def calculate_indicators(df):
     
     df['TP'] = (df['High'] + df['Low'] + df['Close']) / 3
     df['TPV'] = df['TP'] * df['Volume']
-    df['VWAP'] = df['TPV'].cumsum() / df['Volume'].cumsum().replace(0, np.nan)
+    df['VWAP'] = _trailing_vwap(df) # [수정] 로드 시작부터 누적 → 최근 SCAN_HISTORY_DAYS 구간 (재생 / 백테스트 = 실시간 스캔 값)
 
-    pos_flow = pd.Series(0.0, index=df.index)
-    neg_flow = pd.Series(0.0, index=df.index)
+    # [수정] where 기반으로 변경 (단일 종목 DataFrame / 전 종목 패널 모두 동일하게 동작)
+    has_tp = df['TP'].notna()
     pos_idx = df['TP'] > df['TP'].shift(1)
     neg_idx = df['TP'] < df['TP'].shift(1)
-    pos_flow[pos_idx] = df.loc[pos_idx, 'TPV']
-    neg_flow[neg_idx] = df.loc[neg_idx, 'TPV']
+    pos_flow = df['TPV'].where(pos_idx, 0.0).where(has_tp)
+    neg_flow = df['TPV'].where(neg_idx, 0.0).where(has_tp)
     pos_mf_sum = pos_flow.rolling(14).sum()
     neg_mf_sum = neg_flow.rolling(14).sum()
     mfi_ratio = pos_mf_sum / neg_mf_sum.replace(0, 1)
@@ -166,15 +321,17 @@ def calculate_indicators(df):
     tr1 = df['High'] - df['Low']
     tr2 = (df['High'] - df['Close'].shift(1)).abs()
     tr3 = (df['Low'] - df['Close'].shift(1)).abs()
-    df['TR'] = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    df['TR'] = np.fmax(np.fmax(tr1, tr2), tr3)
     df['ATR'] = df['TR'].rolling(window=20).mean()
+    df['ATRP'] = df['ATR'] / df['Close'].replace(0, np.nan) * 100 # [신규] ATR% (종목 간 / 기간 간 변동성 비교용)
         
     return df
 
 # -----------------------------------------------------------------------------
 # 4. 재무 정보 상세 조회 (세션 적용 + 기존 로직 유지)
 # -----------------------------------------------------------------------------
-def get_financial_summary(code):
+def get_financial_summary(code, fetch_quarterly=True, fetch_balance=True):
+    # fetch_quarterly / fetch_balance=False 이면 해당 조회를 생략하고 결과에서 항목도 제외 (캐시 부분 갱신용)
     try:
         ticker_symbol = str(code)
         if ticker_symbol.isdigit(): 
@@ -204,7 +361,7 @@ def get_financial_summary(code):
             if is_us:
                 usd_val = f"${val/1_000_000_000:.2f}B"
                 try:
-                    rate = 1450.0 
+                    rate = get_usd_krw()
                     krw_val = val * rate
                     krw_str = f"{krw_val/1_000_000_000_000:.1f}조" if krw_val >= 1e12 else f"{krw_val/1_000_000_000:.0f}억"
                     return f"{usd_val} ({krw_str})"
@@ -218,7 +375,7 @@ def get_financial_summary(code):
         margin_trend_str = "-"
         
         try:
-            q_fin = stock.quarterly_financials
+            q_fin = stock.quarterly_financials if fetch_quarterly else pd.DataFrame()
             if not q_fin.empty:
                 q_fin = q_fin.sort_index(axis=1)
                 today = pd.Timestamp.now()
@@ -256,7 +413,7 @@ def get_financial_summary(code):
         # 3. 부채비율 직접 계산
         debt_ratio_val = 0
         try:
-            bs = stock.balance_sheet
+            bs = stock.balance_sheet if fetch_balance else pd.DataFrame()
             if not bs.empty:
                 total_debt_keys = ['Total Debt', 'Long Term Debt And Capital Lease Obligation']
                 equity_keys = ['Stockholders Equity', 'Total Equity Gross Minority Interest']
@@ -279,7 +436,7 @@ def get_financial_summary(code):
         per = info.get('trailingPE', 0)
         pbr = info.get('priceToBook', 0)
 
-        return {
+        summary = {
             "시가총액": fmt_cap(market_cap_raw),
             "영업이익_추세": op_trend_str,
             "이익률_추세": margin_trend_str,
@@ -287,5 +444,114 @@ def get_financial_summary(code):
             "PER": f"{per:.2f}" if per else "-",
             "PBR": f"{pbr:.2f}" if pbr else "-"
         }
+        if not fetch_quarterly:
+            summary.pop("영업이익_추세"); summary.pop("이익률_추세")
+        if not fetch_balance:
+            summary.pop("부채비율")
+        return summary
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+# -----------------------------------------------------------------------------
+# 5. [신규] 재무 정보 캐시 (DB + 항목별 TTL + 백그라운드 갱신/선조회)
+# -----------------------------------------------------------------------------
+# 시세 연동 항목은 짧게, 분기/연간 재무 항목은 길게 유지
+FUNDAMENTAL_TTL = {
+    "시가총액": timedelta(days=1),
+    "PER": timedelta(days=1),
+    "PBR": timedelta(days=1),
+    "영업이익_추세": timedelta(days=7),
+    "이익률_추세": timedelta(days=7),
+    "부채비율": timedelta(days=30),
+}
+FUNDAMENTAL_PLACEHOLDER_TTL = timedelta(hours=1) # [신규] 조회 실패 자리표시("-")는 짧게 두고 다시 시도
+FUNDAMENTAL_WAIT_SECONDS = 30 # [신규] 다른 요청이 조회 중일 때 결과를 기다리는 최대 시간
+QUARTERLY_FIELDS = ["영업이익_추세", "이익률_추세"]
+BALANCE_FIELDS = ["부채비율"]
+
+_fund_executor = ThreadPoolExecutor(max_workers=4)
+_fund_inflight = {} # [수정] 종목코드 -> 조회 완료 Event (동기 조회가 진행 중인 조회를 기다릴 수 있게)
+_fund_lock = threading.Lock()
+_fund_stats = {'hit': 0, 'stale': 0, 'miss': 0}
+
+def _stale_fields(cached):
+    now = datetime.now()
+    stale = []
+    for field, ttl in FUNDAMENTAL_TTL.items():
+        if field not in cached:
+            stale.append(field); continue
+        try: updated = datetime.strptime(cached[field][1], "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            stale.append(field); continue
+        if cached[field][0] == "-": ttl = min(ttl, FUNDAMENTAL_PLACEHOLDER_TTL)
+        if now - updated > ttl: stale.append(field)
+    return stale
+
+def refresh_fundamentals(code, stale_fields=None):
+    """만료된 항목 그룹만 다시 조회해서 캐시에 저장"""
+    if stale_fields is None: stale_fields = list(FUNDAMENTAL_TTL)
+    try:
+        fresh = get_financial_summary(
+            code,
+            fetch_quarterly=any(f in stale_fields for f in QUARTERLY_FIELDS),
+            fetch_balance=any(f in stale_fields for f in BALANCE_FIELDS))
+        if fresh: db.save_fundamentals(code, fresh)
+        return fresh
+    finally:
+        with _fund_lock: done = _fund_inflight.pop(str(code), None)
+        if done: done.set()
+
+def _refresh_fundamentals_async(code, stale_fields=None):
+    code = str(code)
+    with _fund_lock:
+        if code in _fund_inflight: return False
+        _fund_inflight[code] = threading.Event()
+    _fund_executor.submit(refresh_fundamentals, code, stale_fields)
+    return True
+
+def get_cached_financial_summary(code):
+    """캐시 우선 재무 조회. (재무 dict 또는 None, 갱신 중 여부) 반환
+    - 전 항목 유효: 캐시 즉시 반환
+    - 일부 만료: 캐시 값 반환 + 백그라운드 갱신
+    - 캐시 없음: 동기 조회 후 저장 (이미 조회 중이면 중복 조회 없이 그 결과를 기다림)"""
+    code = str(code)
+    cached = db.load_fundamentals(code)
+    stale = _stale_fields(cached)
+
+    if cached and all(f in cached for f in FUNDAMENTAL_TTL):
+        summary = {f: cached[f][0] for f in FUNDAMENTAL_TTL}
+        with _fund_lock: _fund_stats['stale' if stale else 'hit'] += 1
+        if stale: _refresh_fundamentals_async(code, stale)
+        return summary, bool(stale)
+
+    # [수정] 진행 중 여부 확인과 등록을 한 번의 잠금 안에서 처리 (동시 미스가 각자 조회하지 않게)
+    with _fund_lock:
+        _fund_stats['miss'] += 1
+        pending = _fund_inflight.get(code)
+        if pending is None: _fund_inflight[code] = threading.Event()
+    if pending is not None:
+        finished = pending.wait(FUNDAMENTAL_WAIT_SECONDS)
+        cached = db.load_fundamentals(code)
+        if all(f in cached for f in FUNDAMENTAL_TTL):
+            return {f: cached[f][0] for f in FUNDAMENTAL_TTL}, False
+        return None, not finished
+    fresh = refresh_fundamentals(code)
+    if fresh is None: return None, False
+    merged = {f: cached[f][0] for f in cached}
+    merged.update(fresh)
+    return merged, False
+
+def prefetch_fundamentals(codes):
+    """스캔 상위 종목 재무 정보를 백그라운드로 미리 적재 (이미 유효하면 건너뜀)"""
+    queued = 0
+    for code in codes:
+        stale = _stale_fields(db.load_fundamentals(code))
+        if stale and _refresh_fundamentals_async(code, stale): queued += 1
+    return queued
+
+def get_fundamentals_cache_stats():
+    with _fund_lock: stats = dict(_fund_stats)
+    total = stats['hit'] + stats['stale'] + stats['miss']
+    stats['total'] = total
+    stats['hit_rate'] = ((stats['hit'] + stats['stale']) / total * 100) if total else 0.0
+    return stats
\ No newline at end of file
@@ -0,0 +1,92 @@
+import time
+import itertools
+import pandas as pd
+import numpy as np
+from .library import ACTIVE_STRATEGIES
+from .panel import iter_panels
+from .backtest import _entries_2d, MIN_BARS
+
+# -----------------------------------------------------------------------------
+# [신규] 전략 조합(앙상블) 평가 - AND / OR / k-of-n
+# - 봉마다 전략별 backtest() 신호를 비트로 묶은 패턴 코드 (전략 i 신호 = 1 << i) 로 변환
+# - 패턴(2^S 가지)별로 hold 봉 후 수익률의 건수 / 승수 / 합계를 학습·검증 구간으로 나눠 bincount 집계
+# - 조합 = 패턴 집합(진리표 비트셋) 이므로 조합 성과는 (조합 × 패턴) 0/1 행렬 @ 패턴 집계 한 번으로 계산
+#   → 전 종목을 한 번만 읽고 나면 조합 수백 개도 행렬곱 한 번
+# - 순위는 검증(표본 외) 구간 기대값 기준
+# -----------------------------------------------------------------------------
+ENSEMBLE_HOLD = 5
+TRAIN_RATIO = 0.7 # 신호 발생일 기준 앞 70% 학습 / 뒤 30% 검증
+MIN_TEST_SIGNALS = 30
+
+def pattern_stats(strategies, codes=None, start_date=None, hold=ENSEMBLE_HOLD, split_date=None, chunk_size=500):
+    """패턴별 [학습 건수, 학습 승수, 학습 수익합, 검증 건수, 검증 승수, 검증 수익합] (2^S × 6) 과 split_date"""
+    n_pat = 1 << len(strategies)
+    cells = [] # 청크별 (패턴, 날짜, 수익률) - split_date 를 모를 때를 위해 보관
+    for panel in iter_panels(codes, start_date, chunk_size=chunk_size, min_bars=MIN_BARS):
+        code = np.zeros(panel.shape, dtype=np.int64)
+        for i, strat in enumerate(strategies):
+            code |= _entries_2d(strat, panel).astype(np.int64) << i
+        close = panel['Close'].to_numpy(dtype=float)
+        fwd = np.full_like(close, np.nan)
+        fwd[:-hold] = (close[hold:] / close[:-hold] - 1) * 100
+        ok = (code > 0) & ~np.isnan(fwd)
+        cells.append((code[ok], panel.dates[ok], fwd[ok]))
+
+    if not cells: return np.zeros((n_pat, 6)), split_date
+    pat = np.concatenate([c[0] for c in cells])
+    dates = np.concatenate([c[1] for c in cells])
+    ret = np.concatenate([c[2] for c in cells])
+    if split_date is None:
+        split_date = np.sort(dates)[int(len(dates) * TRAIN_RATIO)] if len(dates) else None
+    test = dates >= np.datetime64(split_date, 'ns') if split_date is not None else np.zeros(len(dates), dtype=bool)
+
+    stats = np.zeros((n_pat, 6))
+    for k, m in enumerate((~test, test)):
+        stats[:, 3 * k] = np.bincount(pat[m], minlength=n_pat)
+        stats[:, 3 * k + 1] = np.bincount(pat[m], weights=(ret[m] > 0).astype(float), minlength=n_pat)
+        stats[:, 3 * k + 2] = np.bincount(pat[m], weights=ret[m], minlength=n_pat)
+    return stats, pd.Timestamp(split_date) if split_date is not None else None
+
+def combination_masks(n_strategies, names):
+    """[(조합 이름, 진리표 bool 배열 길이 2^S), ...] - 단일 / AND / OR / k-of-n (2 <= k < 부분집합 크기)"""
+    pats = np.arange(1 << n_strategies)
+    bits = (pats[:, None] >> np.arange(n_strategies)) & 1 # (패턴 × 전략)
+    combos = []
+    for i in range(n_strategies):
+        combos.append((names[i], bits[:, i] == 1))
+    for size in range(2, n_strategies + 1):
+        for subset in itertools.combinations(range(n_strategies), size):
+            hits = bits[:, list(subset)].sum(axis=1)
+            label = [names[i] for i in subset]
+            combos.append((" AND ".join(label), hits == size))
+            combos.append((" OR ".join(label), hits >= 1))
+            for k in range(2, size):
+                combos.append((f"{k}-of-{size} ({', '.join(label)})", hits >= k))
+    return combos
+
+def evaluate_ensembles(strategies=None, codes=None, start_date=None, hold=ENSEMBLE_HOLD, split_date=None,
+                       min_test_signals=MIN_TEST_SIGNALS):
+    """전 조합의 학습/검증 성과 DataFrame (검증 기대값 내림차순) 과 메타 정보"""
+    t0 = time.perf_counter()
+    strategies = strategies or ACTIVE_STRATEGIES
+    names = [s.name for s in strategies]
+    stats, split = pattern_stats(strategies, codes, start_date, hold, split_date)
+
+    combos = combination_masks(len(strategies), names)
+    masks = np.array([m for _, m in combos], dtype=float)
+    agg = masks @ stats # (조합 × 6)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df = pd.DataFrame({
+            'combination': [c for c, _ in combos],
+            'train_signals': agg[:, 0].astype(int),
+            'train_win_rate': agg[:, 1] / agg[:, 0] * 100,
+            'train_expectancy': agg[:, 2] / agg[:, 0],
+            'test_signals': agg[:, 3].astype(int),
+            'test_win_rate': agg[:, 4] / agg[:, 3] * 100,
+            'test_expectancy': agg[:, 5] / agg[:, 3],
+        })
+    df['eligible'] = df['test_signals'] >= min_test_signals
+    df = df.sort_values(['eligible', 'test_expectancy'], ascending=[False, False], na_position='last').reset_index(drop=True)
+    meta = {"split_date": split, "hold": hold, "combinations": len(df), "elapsed": time.perf_counter() - t0}
+    return df, meta
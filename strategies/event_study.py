@@ -0,0 +1,85 @@
+import io
+import threading
+import pandas as pd
+import numpy as np
+import database as db
+from .panel import iter_panels
+from .backtest import _entries_2d, _forward_window, get_strategy, MIN_BARS
+
+# -----------------------------------------------------------------------------
+# [신규] 이벤트 스터디 - 신호 발생 후 1~H 거래일 평균/중앙값 수익률 경로
+# - 전략 backtest() 의 모든 신호(겹침 포함)를 전 종목 패널에서 수집
+# - 신호별 향후 종가 / 신호일 종가 - 1 을 (신호 수 × H) 행렬로 한 번에 만든 뒤 열 단위 통계
+# - 결과는 (전략, 파라미터, H, 주가 데이터 버전) 단위로 메모리 + users.db 에 캐시
+# -----------------------------------------------------------------------------
+EVENT_HORIZON = 20
+CI_Z = 1.96 # 평균의 95% 신뢰구간
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+def forward_return_matrix(strategy, codes=None, start_date=None, horizon=EVENT_HORIZON, chunk_size=500,
+                          with_codes=False):
+    """(신호 수 × horizon) 수익률(%) 행렬. 데이터가 끝난 뒤 칸은 NaN
+    with_codes=True 면 (행렬, 행별 종목코드 리스트) 반환"""
+    blocks, sig_codes = [], []
+    for panel in iter_panels(codes, start_date, chunk_size=chunk_size, min_bars=MIN_BARS):
+        sig = _entries_2d(strategy, panel)
+        j_idx, t_idx = np.nonzero(sig.T)
+        if len(t_idx) == 0: continue
+        close = panel['Close'].to_numpy(dtype=float)
+        base = close[t_idx, j_idx]
+        blocks.append((_forward_window(close, t_idx, j_idx, horizon) / base[:, None] - 1) * 100)
+        sig_codes.extend(panel.codes[j] for j in j_idx)
+    paths = np.vstack(blocks) if blocks else np.empty((0, horizon))
+    return (paths, sig_codes) if with_codes else paths
+
+def summarize_paths(paths):
+    """경로 행렬 → 거래일(0~H)별 표본 수 / 평균 / 중앙값 / 평균 95% CI / 사분위 / 승률"""
+    horizon = paths.shape[1]
+    with np.errstate(all='ignore'):
+        n = (~np.isnan(paths)).sum(axis=0)
+        mean = np.nanmean(paths, axis=0) if len(paths) else np.full(horizon, np.nan)
+        std = np.nanstd(paths, axis=0, ddof=1) if len(paths) > 1 else np.full(horizon, np.nan)
+        half = CI_Z * std / np.sqrt(np.maximum(n, 1))
+        q25, median, q75 = (np.nanpercentile(paths, [25, 50, 75], axis=0) if len(paths)
+                            else np.full((3, horizon), np.nan))
+        win = (paths > 0).sum(axis=0) / np.maximum(n, 1) * 100
+
+    df = pd.DataFrame({'n': n, 'mean': mean, 'median': median, 'ci_low': mean - half, 'ci_high': mean + half,
+                       'q25': q25, 'q75': q75, 'win_rate': win}, index=pd.RangeIndex(1, horizon + 1, name='day'))
+    # 0일차 (신호일) = 0%
+    day0 = pd.DataFrame({c: [0.0] for c in df.columns}, index=pd.Index([0], name='day'))
+    day0['n'] = len(paths)
+    return pd.concat([day0, df])
+
+def _cache_key(strategy, horizon, codes, start_date, version):
+    params = strategy.signature() # [수정] 조건 버전 / 규칙 정의가 바뀌어도 캐시 무효화
+    scope = ",".join(sorted(map(str, codes))) if codes is not None else "*"
+    return f"{strategy.name}|{params}|{horizon}|{start_date or ''}|{scope}|v{version}"
+
+def run_event_study(strategy, codes=None, start_date=None, horizon=EVENT_HORIZON, use_cache=True):
+    """전략 이벤트 스터디 결과 DataFrame (index = 0..horizon 거래일). 같은 데이터 버전이면 캐시 반환"""
+    if isinstance(strategy, str): strategy = get_strategy(strategy)
+    if strategy is None: return None
+    version = db.get_price_data_version()
+    key = _cache_key(strategy, horizon, codes, start_date, version)
+
+    if use_cache:
+        with _memo_lock:
+            if key in _memo: return _memo[key]
+        cached = db.load_event_study(key)
+        if cached:
+            df = pd.read_json(io.StringIO(cached), orient='split')
+            df.index.name = 'day'
+            with _memo_lock: _memo[key] = df
+            return df
+
+    df = summarize_paths(forward_return_matrix(strategy, codes, start_date, horizon))
+    db.save_event_study(key, strategy.name, version, df.to_json(orient='split'))
+    with _memo_lock:
+        # 이전 데이터 버전 결과는 버림
+        for k in [k for k in _memo if k.startswith(f"{strategy.name}|") and not k.endswith(f"|v{version}")]:
+            del _memo[k]
+        _memo[key] = df
+    return df
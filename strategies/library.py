@@ -1,17 +1,48 @@
+import json
 import pandas as pd
 import numpy as np
 from .common import format_price
+from .rules import compile_condition, compile_expr, load_rule_definitions, derived_refs, derived_column
+from .vwap import anchored_vwap
+from .signals import cached, stored_series
 
 # ==========================================
 # 기본 전략 클래스 (틀)
 # ==========================================
 class StrategyBase:
     name = "Base"
+    default_params = {} # 최적화(파라미터 스윕) 대상 임계값
+    vwap_anchors = () # [신규] 정밀분석 차트에 그릴 앵커 VWAP (vwap.py 앵커 문자열)
+    signal_version = 3 # [신규] 진입 / 점수 조건을 바꾸면 올림 (신호 테이블 · 점수 분포 · 이벤트 스터디 캐시 무효화)
+    def __init__(self, **params):
+        self.params = {**self.default_params, **params}
+    def with_params(self, **params):
+        return type(self)(**{**self.params, **params})
     def check_signal(self, df): return 0 
     def get_report(self, item): return "" 
     def deep_dive(self, df): return {} 
     def backtest(self, df): 
         return pd.Series(False, index=df.index)
+    def exit_levels(self, df):
+        # 봉별 (손절가, 목표가) 시리즈. deep_dive의 마지막 봉 계산을 전 구간으로 벡터화한 것
+        return df['Close'] * 0.95, df['Close'] * 1.10
+    def score(self, df):
+        # 봉별 스캐너 점수 (포착 안 된 봉은 0). 각 봉을 마지막 봉으로 둔 check_signal 과 동일한 값을
+        # 전 구간에 대해 한 번에 계산 (df 는 단일 종목 DataFrame 또는 PricePanel)
+        return self.backtest(df).astype(float) * 50
+    # [신규] 같은 종목 · 데이터 버전이면 한 번만 계산 (스캔 → 승률 → 정밀분석이 결과를 공유)
+    def cached_check(self, df):
+        return cached(self, df, 'check', self.check_signal)
+    def cached_entries(self, df):
+        return cached(self, df, 'entries', self._entries_from_store)
+    def _entries_from_store(self, df):
+        stored = stored_series(self, df, 'entry') # [신규] 신호 테이블이 있으면 재계산 생략
+        return stored if stored is not None else self.backtest(df).fillna(False).astype(bool)
+    def signature(self):
+        # 신호 테이블 무효화 기준 (파라미터 / 조건 버전이 바뀌면 다시 계산)
+        return json.dumps({**self.params, '_v': self.signal_version}, sort_keys=True)
+    def cached_score(self, df):
+        return cached(self, df, 'score', self.score)
     def _make_html(self, title, analysis, action):
         return f"""<div style="background-color:#1a1c24; padding:15px; border-radius:10px;"><div style="font-size:1.4em; font-weight:bold; color:#fff;">{title}</div><ul style="color:#ddd; margin:10px 0;">{analysis}</ul><div style="background-color:#25262b; border-left:5px solid #00d2d3; padding:10px; color:#fff;">{action}</div></div>"""
 
@@ -20,6 +51,7 @@ class StrategyBase:
 # ==========================================
 class StrategyTH(StrategyBase):
     name = "🧬TH알고리즘"
+    default_params = {'rsi_min': 40, 'rsi_max': 70}
     
     def check_signal(self, df):
         if len(df) < 5: return 0
@@ -36,7 +68,7 @@ class StrategyTH(StrategyBase):
         pullback = is_uptrend and (prev['Close'] < prev['HMA']) and (curr['Close'] > curr['HMA'])
         
         # 필터: RSI가 과열(70)이 아니어야 함
-        rsi_ok = 40 <= curr['RSI'] <= 70
+        rsi_ok = self.params['rsi_min'] <= curr['RSI'] <= self.params['rsi_max']
         
         if (hma_turn_up or pullback) and rsi_ok:
             return 80 + (curr['RSI'] / 5) # 점수 계산
@@ -50,13 +82,23 @@ class StrategyTH(StrategyBase):
         return self._make_html(title, analysis, action)
 
     def backtest(self, df):
-        if 'HMA' not in df.columns: return pd.Series(False, index=df.index)
-        # HMA 상승 반전 조건
-        return (df['HMA'] > df['HMA'].shift(1)) & (df['HMA'].shift(1) <= df['HMA'].shift(2)) & (df['Close'] > df['HMA'])
+        # [수정] 스캐너 점수와 같은 조건 (눌림목 분기 포함, 종가 > HMA 추가 필터 없음)
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['HMA'], df['Close'] * 1.1
+
+    def score(self, df):
+        hma, hma1, hma2 = df['HMA'], df['HMA'].shift(1), df['HMA'].shift(2)
+        hma_turn_up = (hma > hma1) & (hma1 <= hma2)
+        pullback = (hma > hma1) & (hma1 > hma2) & (df['Close'].shift(1) < hma1) & (df['Close'] > hma)
+        rsi_ok = (df['RSI'] >= self.params['rsi_min']) & (df['RSI'] <= self.params['rsi_max'])
+        enough = df['Close'].notna().cumsum() >= 5
+        return (80 + df['RSI'] / 5).where((hma_turn_up | pullback) & rsi_ok & enough, 0.0)
 
     def deep_dive(self, df):
         curr = df.iloc[-1]; prev = df.iloc[-2]
-        buy_cond = self.backtest(df)
+        buy_cond = self.cached_entries(df)
         df = df.copy(); df['Chart_Signal'] = 0
         df.loc[buy_cond, 'Chart_Signal'] = 1
         
@@ -94,12 +136,21 @@ class StrategyTurtle(StrategyBase):
         return self._make_html("🐢 터틀: 거래량 실린 신고가", "<li><b>상황:</b> 20일 고점을 <b>강한 거래량</b>과 함께 돌파.</li><li><b>의미:</b> 새로운 시세의 출발 신호.</li>", f"돌파 매수.")
     
     def backtest(self, df):
-        vol_ma = df['Volume'].rolling(20).mean()
-        return (df['Close'] > df['High20']) & (df['Close'].shift(1) <= df['High20'].shift(1)) & (df['Volume'] > vol_ma)
+        # [수정] 스캐너 점수와 같은 조건 (200일선 추세 필터 포함)
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['High20'] - 2*df['ATR'], df['High20'] + 4*df['ATR']
+
+    def score(self, df):
+        breakout = (df['Close'] > df['High20']) & (df['Close'].shift(1) <= df['High20'].shift(1))
+        vol_ok = df['Volume'] > df['Volume'].rolling(20).mean()
+        trend_ok = df['Close'] > df['MA200']
+        return (breakout & vol_ok & trend_ok).astype(float) * 90
 
     def deep_dive(self, df):
         curr = df.iloc[-1]
-        buy_cond = self.backtest(df)
+        buy_cond = self.cached_entries(df)
         df = df.copy(); df['Chart_Signal'] = 0
         df.loc[buy_cond, 'Chart_Signal'] = 1
         
@@ -115,13 +166,14 @@ class StrategyTurtle(StrategyBase):
 # ==========================================
 class StrategyBNF(StrategyBase):
     name = "💧BNF"
+    default_params = {'disparity_max': 90, 'rsi_max': 35}
     def check_signal(self, df):
         curr = df.iloc[-1]
         # 1. 이격도 90 이하 (10% 이상 괴리)
-        disp_ok = curr['Disparity25'] <= 90
+        disp_ok = curr['Disparity25'] <= self.params['disparity_max']
         
         # [수정] RSI 침체권 확인 (떨어지는 칼날 잡기 방지)
-        rsi_ok = curr['RSI'] < 35 
+        rsi_ok = curr['RSI'] < self.params['rsi_max']
         
         if disp_ok and rsi_ok:
             return (100 - curr['Disparity25']) * 3
@@ -131,15 +183,22 @@ class StrategyBNF(StrategyBase):
         return self._make_html("💧 BNF: 과매도 바닥 잡기", "<li><b>상황:</b> 이격도 90 이하 + RSI 침체.</li><li><b>판단:</b> 기술적 반등 확률 매우 높음.</li>", "분할 매수 진입.")
 
     def backtest(self, df):
-        return (df['Disparity25'] <= 90) & (df['RSI'] < 35)
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['Close'] * 0.93, df['MA25']
+
+    def score(self, df):
+        hit = (df['Disparity25'] <= self.params['disparity_max']) & (df['RSI'] < self.params['rsi_max'])
+        return ((100 - df['Disparity25']) * 3).where(hit, 0.0)
 
     def deep_dive(self, df):
         curr = df.iloc[-1]
-        buy_cond = self.backtest(df)
+        buy_cond = self.cached_entries(df)
         df = df.copy(); df['Chart_Signal'] = 0
         df.loc[buy_cond, 'Chart_Signal'] = 1
         
-        sig = "BUY (투매발생)" if (curr['Disparity25'] <= 90 and curr['RSI'] < 35) else "Wait"
+        sig = "BUY (투매발생)" if (curr['Disparity25'] <= self.params['disparity_max'] and curr['RSI'] < self.params['rsi_max']) else "Wait"
         return {"signal": sig, "df": df, "entry_price": curr['Close'], "stop_price": curr['Close']*0.93, "target_price": curr['MA25']}
 
 # ==========================================
@@ -147,6 +206,7 @@ class StrategyBNF(StrategyBase):
 # ==========================================
 class StrategyHyperSniper(StrategyBase):
     name = "🔫하이퍼스나이퍼"
+    default_params = {'bw_tight': 0.15, 'bw_prev_max': 0.20, 'bw_max': 0.30, 'vol_mult': 1.5}
     
     def check_signal(self, df):
         if len(df) < 60: return 0
@@ -155,7 +215,7 @@ class StrategyHyperSniper(StrategyBase):
         # 1. [필수] 거래량 폭발 조건 추가 (평균 대비 150% 이상)
         avg_vol = df['Volume'].rolling(20).mean().iloc[-1]
         if avg_vol == 0: return 0
-        vol_spike = curr['Volume'] >= (avg_vol * 1.5)
+        vol_spike = curr['Volume'] >= (avg_vol * self.params['vol_mult'])
         
         # 2. [필수] 캔들 조건 (양봉이어야 함)
         is_bullish = curr['Close'] > curr['Open']
@@ -169,8 +229,8 @@ class StrategyHyperSniper(StrategyBase):
         # 밴드폭이 매우 좁거나(0.15 이하), 좁았다가 막 벌어지는(Expansion) 순간
         bw = curr['Bandwidth']
         prev_bw = prev['Bandwidth']
-        is_tight = bw < 0.15 # 매우 좁음
-        is_expanding = (bw < 0.30) and (bw > prev_bw) and (prev_bw < 0.20) # 좁았다가 팍!
+        is_tight = bw < self.params['bw_tight'] # 매우 좁음
+        is_expanding = (bw < self.params['bw_max']) and (bw > prev_bw) and (prev_bw < self.params['bw_prev_max']) # 좁았다가 팍!
         squeeze_ok = is_tight or is_expanding
         
         # 5. 정배열 초입 (10일선 > 20일선)
@@ -200,13 +260,29 @@ class StrategyHyperSniper(StrategyBase):
         )
 
     def backtest(self, df):
-        # 백테스트 조건도 동일하게 강화
-        vol_ma = df['Volume'].rolling(20).mean()
-        vol_cond = df['Volume'] > (vol_ma * 1.5)
-        bullish = df['Close'] > df['Open']
-        ma_cross = df['Close'] > df['MA20']
-        squeeze = df['Bandwidth'] < 0.30
-        return vol_cond & bullish & ma_cross & squeeze
+        # [수정] 스캐너 점수와 같은 조건 (VWAP / 정배열 / RSI / 돌파·지지 / 60봉 필터 포함)
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['MA20'] * 0.97, df['Close'] * 1.20
+
+    def score(self, df):
+        p = self.params
+        avg_vol = df['Volume'].rolling(20).mean()
+        vol_spike = (df['Volume'] >= avg_vol * p['vol_mult']) & (avg_vol != 0)
+        is_bullish = df['Close'] > df['Open']
+        vwap_ok = (df['Close'] >= df['VWAP']) | df['VWAP'].isna() if 'VWAP' in df.columns else True
+        bw, prev_bw = df['Bandwidth'], df['Bandwidth'].shift(1)
+        is_expanding = (bw < p['bw_max']) & (bw > prev_bw) & (prev_bw < p['bw_prev_max'])
+        squeeze_ok = (bw < p['bw_tight']) | is_expanding
+        elite_ok = df['EMA10'] > df['EMA20']
+        breakout = (df['Close'].shift(1) < df['MA20'].shift(1)) & (df['Close'] > df['MA20'])
+        support = (df['Close'] > df['MA20']) & (df['Low'] <= df['MA20'] * 1.02)
+        rsi_ok = (df['RSI'] >= 50) & (df['RSI'] <= 80)
+        enough = df['Close'].notna().cumsum() >= 60
+        hit = vol_spike & is_bullish & vwap_ok & squeeze_ok & elite_ok & (breakout | support) & rsi_ok & enough
+        # 밴드폭이 좁았다가 막 벌어지는 봉은 가산점 (+10)
+        return (90 + is_expanding.astype(float) * 10).where(hit, 0.0)
 
     def deep_dive(self, df):
         curr = df.iloc[-1]
@@ -214,20 +290,20 @@ class StrategyHyperSniper(StrategyBase):
         # 분석 메시지 생성
         score_msg = []
         vol_ma = df['Volume'].rolling(20).mean().iloc[-1]
-        if curr['Volume'] > vol_ma * 1.5: score_msg.append("거래량폭발🔥")
-        if curr['Bandwidth'] < 0.20: score_msg.append("초강력응축⚡")
-        elif curr['Bandwidth'] < 0.30: score_msg.append("응축양호✅")
+        if curr['Volume'] > vol_ma * self.params['vol_mult']: score_msg.append("거래량폭발🔥")
+        if curr['Bandwidth'] < self.params['bw_prev_max']: score_msg.append("초강력응축⚡")
+        elif curr['Bandwidth'] < self.params['bw_max']: score_msg.append("응축양호✅")
         
         if 'VWAP' in df.columns and curr['Close'] >= curr['VWAP']: score_msg.append("세력선지지🛡️")
         
+        # 신호 판단 (엄격하게) - 스캐너가 이미 계산했으면 재사용
+        is_signal = self.cached_check(df) > 0
+
         # 차트 신호 표시
-        buy_cond = self.backtest(df)
+        buy_cond = self.cached_entries(df)
         df = df.copy(); df['Chart_Signal'] = 0
         df.loc[buy_cond, 'Chart_Signal'] = 1
         
-        # 신호 판단 (엄격하게)
-        is_signal = self.check_signal(df) > 0
-        
         if is_signal: sig = "BUY (Sniper!)"
         elif curr['Close'] > curr['MA20']: sig = "HOLD"
         else: sig = "Wait"
@@ -238,6 +314,293 @@ class StrategyHyperSniper(StrategyBase):
         
         return {"signal": sig, "df": df, "entry_price": entry, "stop_price": stop, "target_price": target, "msg": " ".join(score_msg)}
 
+# ==========================================
+# [신규] 레거시 strategies.py 전략 이식 (엘리트 / DBB / AI스퀴즈 / 버핏 / VWAP)
+# - check_signal: 레거시 analyze_single_stock 의 마지막 봉 판정 + 점수식 그대로
+# - score: 같은 판정을 전 구간 벡터화 (봉마다 그 봉을 마지막 봉으로 본 check_signal)
+# - [수정] backtest / 차트 마커: score > 0 (스캐너가 포착하는 조건 그대로, 레거시 backtest_past_performance 의
+#   단순화 조건은 쓰지 않음 → 과거승률 / 스윕 / 이벤트 스터디 / 신호 테이블이 스캐너와 같은 신호를 측정)
+# - deep_dive / exit_levels: 레거시 analyze_strategy_deep_dive 의 진입 · 손절 · 목표가
+# ==========================================
+def _cross_above(a, b):
+    return (a > b) & (a.shift(1) <= b.shift(1))
+
+class StrategyElite(StrategyBase):
+    name = "⚡엘리트"
+
+    def _hit(self, df):
+        aligned = (df['EMA10'] > df['EMA20']) & (df['EMA20'] > df['EMA60'])
+        return aligned & _cross_above(df['MACD'], df['Signal'])
+
+    def check_signal(self, df):
+        curr = df.iloc[-1]; prev = df.iloc[-2]
+        is_aligned = curr['EMA10'] > curr['EMA20'] > curr['EMA60']
+        is_macd_cross = (curr['MACD'] > curr['Signal']) and (prev['MACD'] <= prev['Signal'])
+        if is_aligned and is_macd_cross:
+            return max(10 + (curr['RSI'] - 50), 0.1) # RSI 40 미만이어도 포착은 유지 (점수 > 0)
+        return 0
+
+    def get_report(self, item):
+        return self._make_html("⚡ 엘리트: 골든크로스", "<li><b>상황:</b> 정배열 + MACD 매수 신호.</li>",
+                               f"정석 매수. 🛑 손절: {format_price(item['MA20'], item['시장'], item['코드'])}")
+
+    def backtest(self, df):
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['MA20'], df['Close'] * 1.1
+
+    def score(self, df):
+        return (10 + (df['RSI'] - 50)).clip(lower=0.1).where(self._hit(df), 0.0)
+
+    def deep_dive(self, df):
+        curr = df.iloc[-1]
+        buy_cond = self.cached_entries(df)
+        df = df.copy(); df['Chart_Signal'] = 0
+        df.loc[buy_cond, 'Chart_Signal'] = 1
+
+        if buy_cond.iloc[-1]: sig = "BUY"
+        elif curr['EMA10'] > curr['EMA20'] > curr['EMA60']: sig = "HOLD"
+        else: sig = "Wait"
+        return {"signal": sig, "df": df, "entry_price": curr['Close'], "stop_price": curr['MA20'], "target_price": curr['Close'] * 1.1}
+
+class StrategyDBB(StrategyBase):
+    name = "🔥DBB"
+
+    def check_signal(self, df):
+        curr = df.iloc[-1]; prev = df.iloc[-2]
+        if (curr['Close'] > curr['BB_Up2']) and (prev['Close'] <= prev['BB_Up2']):
+            return ((curr['Close'] / curr['BB_Up2']) - 1) * 1000
+        return 0
+
+    def get_report(self, item):
+        return self._make_html("🔥 DBB: 밴드 상단 돌파", "<li><b>상황:</b> 볼린저밴드 상단 <b>방금</b> 돌파.</li>",
+                               f"돌파 매매. 🛑 손절: {format_price(item['현재가_RAW'] * 0.97, item['시장'], item['코드'])}")
+
+    def backtest(self, df):
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['Close'] * 0.97, df['BB_Up2'] * 1.15
+
+    def score(self, df):
+        return ((df['Close'] / df['BB_Up2'] - 1) * 1000).where(_cross_above(df['Close'], df['BB_Up2']), 0.0)
+
+    def deep_dive(self, df):
+        curr = df.iloc[-1]
+        buy_cond = self.cached_entries(df)
+        df = df.copy(); df['Chart_Signal'] = 0
+        df.loc[buy_cond, 'Chart_Signal'] = 1
+
+        if buy_cond.iloc[-1]: sig = "BUY"
+        elif curr['Close'] > curr['BB_Up2']: sig = "HOLD"
+        else: sig = "Wait"
+        return {"signal": sig, "df": df, "entry_price": curr['BB_Up2'], "stop_price": curr['Close'] * 0.97, "target_price": curr['BB_Up2'] * 1.15}
+
+class StrategyAISqueeze(StrategyBase):
+    name = "🤖AI스퀴즈"
+    default_params = {'bw_tight': 0.15, 'bw_ratio': 0.7, 'vol_mult': 1.5}
+
+    def check_signal(self, df):
+        p = self.params
+        curr = df.iloc[-1]; prev = df.iloc[-2]
+        avg_bw = df['Bandwidth'].rolling(120).mean().iloc[-1]
+        is_squeeze_prev = (prev['Bandwidth'] < p['bw_tight']) or (prev['Bandwidth'] < avg_bw * p['bw_ratio'])
+        vol_avg = df['Volume'].rolling(20).mean().iloc[-1]
+        vol_explode = curr['Volume'] > vol_avg * p['vol_mult']
+        if is_squeeze_prev and vol_explode and curr['Close'] > prev['Close']:
+            return (curr['Volume'] / vol_avg) * 10
+        return 0
+
+    def get_report(self, item):
+        return self._make_html("🚀 AI스퀴즈: 에너지 폭발", "<li><b>상황:</b> 응축 후 <b>첫</b> 발산 캔들.</li>",
+                               f"공격 매수. 🛑 손절: {format_price(item['MA20'], item['시장'], item['코드'])}")
+
+    def backtest(self, df):
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['MA20'], df['Close'] * 1.2
+
+    def score(self, df):
+        p = self.params
+        prev_bw = df['Bandwidth'].shift(1)
+        squeeze = (prev_bw < p['bw_tight']) | (prev_bw < df['Bandwidth'].rolling(120).mean() * p['bw_ratio'])
+        vol_avg = df['Volume'].rolling(20).mean()
+        hit = squeeze & (df['Volume'] > vol_avg * p['vol_mult']) & (df['Close'] > df['Close'].shift(1))
+        return (df['Volume'] / vol_avg * 10).where(hit, 0.0)
+
+    def deep_dive(self, df):
+        curr = df.iloc[-1]
+        buy_cond = self.cached_entries(df)
+        df = df.copy(); df['Chart_Signal'] = 0
+        df.loc[buy_cond, 'Chart_Signal'] = 1
+
+        sig = "BUY" if buy_cond.iloc[-1] else "Wait"
+        return {"signal": sig, "df": df, "entry_price": curr['Close'], "stop_price": curr['MA20'], "target_price": curr['Close'] * 1.2}
+
+class StrategyBuffett(StrategyBase):
+    name = "🛡️버핏"
+
+    def check_signal(self, df):
+        curr = df.iloc[-1]; prev = df.iloc[-2]
+        if (curr['Close'] > curr['MA200']) and (prev['Close'] <= prev['MA200']):
+            return ((curr['Close'] / curr['MA200']) - 1) * 100
+        return 0
+
+    def get_report(self, item):
+        return self._make_html("🛡️ 버핏: 장기 추세 전환", "<li><b>상황:</b> 200일선을 <b>방금</b> 상향 돌파했습니다.</li>",
+                               f"장기 보유 진입. 🛑 손절: {format_price(item['현재가_RAW'] * 0.95, item['시장'], item['코드'])}")
+
+    def backtest(self, df):
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        return df['MA200'], df['Close'] * 1.2
+
+    def score(self, df):
+        return ((df['Close'] / df['MA200'] - 1) * 100).where(_cross_above(df['Close'], df['MA200']), 0.0)
+
+    def deep_dive(self, df):
+        curr = df.iloc[-1]
+        buy_cond = self.cached_entries(df)
+        df = df.copy(); df['Chart_Signal'] = 0
+        df.loc[buy_cond, 'Chart_Signal'] = 1
+
+        if buy_cond.iloc[-1]: sig = "BUY"
+        elif curr['Close'] > curr['MA200']: sig = "HOLD"
+        else: sig = "Wait"
+        return {"signal": sig, "df": df, "entry_price": curr['Close'], "stop_price": curr['MA200'], "target_price": curr['Close'] * 1.2}
+
+class StrategyVWAP(StrategyBase):
+    name = "⚓VWAP"
+    default_params = {'band_pct': 0.03, 'anchor_bars': 150}
+
+    @property
+    def vwap_anchors(self):
+        return (f"low:{self.params['anchor_bars']}",)
+
+    def _vwap(self, df):
+        return anchored_vwap(df, self.vwap_anchors[0])
+
+    def check_signal(self, df):
+        vwap = self._vwap(df.iloc[-self.params['anchor_bars']:]).iloc[-1]
+        if pd.notnull(vwap):
+            diff_pct = abs(df['Close'].iloc[-1] - vwap) / vwap
+            if diff_pct <= self.params['band_pct']:
+                return (1 - (diff_pct / self.params['band_pct'])) * 50
+        return 0
+
+    def get_report(self, item):
+        return self._make_html("⚓ VWAP: 세력선 지지", "<li><b>상황:</b> VWAP 선 부근에서 지지 중.</li>",
+                               f"눌림목 매수. 🛑 손절: {format_price(item['현재가_RAW'] * 0.97, item['시장'], item['코드'])}")
+
+    def backtest(self, df):
+        # 레거시는 마지막 봉 기준 앵커를 전 구간에 적용(미래 참조) → 봉마다 그 시점의 앵커로 계산
+        return self.score(df) > 0
+
+    def exit_levels(self, df):
+        vwap = self._vwap(df)
+        return vwap * 0.97, vwap * 1.15
+
+    def score(self, df):
+        vwap = self._vwap(df)
+        diff_pct = (df['Close'] - vwap).abs() / vwap
+        return ((1 - diff_pct / self.params['band_pct']) * 50).where(diff_pct <= self.params['band_pct'], 0.0)
+
+    def deep_dive(self, df):
+        curr = df.iloc[-1]
+        vwap = self._vwap(df)
+        buy_cond = self.cached_entries(df)
+        df = df.copy(); df['Chart_Signal'] = 0
+        df.loc[buy_cond, 'Chart_Signal'] = 1
+
+        v = vwap.iloc[-1]
+        if pd.isna(v):
+            return {"signal": "N/A", "df": df, "entry_price": curr['Close'], "stop_price": 0, "target_price": 0}
+        sig = "BUY (지지권)" if abs(curr['Close'] - v) / v <= self.params['band_pct'] else "Wait"
+        return {"signal": sig, "df": df, "entry_price": v, "stop_price": v * 0.97, "target_price": v * 1.15}
+
+# ==========================================
+# [신규] 6. 선언형 전략 (설정 파일 / dict 정의를 컴파일)
+# - entry 조건 하나로 스캔(마지막 봉) / 백테스트 / 차트 마커를 모두 처리 → 세 군데 로직이 어긋날 일이 없음
+# - 정의 예:
+#   {"name": "📐골든크로스", "params": {"vol_mult": 1.2}, "min_bars": 60,
+#    "entry": {"all": [["cross_above", "EMA10", "EMA20"],
+#                      [">", "Volume", {"mul": [{"mean": "Volume", "window": 20}, "$vol_mult"]}],
+#                      ["between", "RSI", 50, 70]]},
+#    "score": {"add": [70, {"div": ["RSI", 5]}]}, "bonus": [{"when": ["<", "Bandwidth", 0.15], "add": 10}],
+#    "stop": {"mul": ["MA20", 0.97]}, "target": {"mul": ["Close", 1.2]},
+#    (주봉 추세 + 일봉 트리거: [">", "W_Close", "W_MA20"] 처럼 W_ / M_ 컬럼을 그대로 사용)
+#    "report": {"title": "📐 골든크로스", "analysis": "<li>...</li>", "action": "추세 매수"}}
+# ==========================================
+class StrategyRule(StrategyBase):
+    def __init__(self, definition, **params):
+        self.definition = definition
+        self.name = definition['name']
+        self.default_params = dict(definition.get('params', {}))
+        super().__init__(**params)
+        self.min_bars = int(definition.get('min_bars', 2))
+        self._entry, lb = compile_condition(definition['entry'])
+        self._score, score_lb = compile_expr(definition.get('score', 50))
+        bonus = [(compile_condition(b['when']), compile_expr(b['add'])) for b in definition.get('bonus', [])]
+        self._bonus = [(when, add) for (when, _), (add, _) in bonus]
+        self._stop = compile_expr(definition['stop'])[0] if 'stop' in definition else None
+        self._target = compile_expr(definition['target'])[0] if 'target' in definition else None
+        # 마지막 봉 판정에 필요한 꼬리 길이 (이동 통계 / 과거봉 참조 포함)
+        # [수정] 점수 / 보너스 가산 수식의 이동 통계도 포함 (빠지면 check_signal 점수가 NaN → 포착 누락)
+        self.lookback = max([lb, score_lb] + [max(wl, al) for (_, wl), (_, al) in bonus])
+        # [신규] 파생 컬럼(주봉/월봉, 앵커 VWAP, 이동 순위, 상대강도)은 꼬리가 아닌 전 구간 프레임에서 먼저 붙임
+        self.derived_cols = sorted(derived_refs(definition))
+        self.vwap_anchors = tuple(c[len("AVWAP_"):] for c in self.derived_cols if c.startswith("AVWAP_"))
+
+    def with_params(self, **params):
+        return type(self)(self.definition, **{**self.params, **params})
+
+    def signature(self):
+        return json.dumps({'definition': self.definition, 'params': self.params, '_v': self.signal_version}, sort_keys=True, ensure_ascii=False)
+
+    def _enough(self, df):
+        return df['Close'].notna().cumsum() >= self.min_bars
+
+    def backtest(self, df):
+        return (self._entry(df, self.params) & self._enough(df)).fillna(False).astype(bool)
+
+    def _points(self, df, hit):
+        p = self.params
+        val = self._score(df, p)
+        for when, add in self._bonus:
+            val = val + when(df, p).astype(float) * add(df, p)
+        return (hit.astype(float) * val).where(hit, 0.0)
+
+    def score(self, df):
+        return self._points(df, self._entry(df, self.params) & self._enough(df))
+
+    def check_signal(self, df):
+        if len(df) < self.min_bars: return 0
+        # 전 구간 대신 필요한 꼬리만 평가 (지표 컬럼은 이미 전 구간으로 계산돼 있음)
+        for col in self.derived_cols: derived_column(df, col)
+        tail = df.iloc[-(self.lookback + 1):]
+        return float(self._points(tail, self._entry(tail, self.params)).iloc[-1])
+
+    def exit_levels(self, df):
+        stop = self._stop(df, self.params) if self._stop else df['Close'] * 0.95
+        target = self._target(df, self.params) if self._target else df['Close'] * 1.10
+        return stop, target
+
+    def get_report(self, item):
+        rep = self.definition.get('report', {})
+        return self._make_html(rep.get('title', self.name), rep.get('analysis', ''), rep.get('action', ''))
+
+    def deep_dive(self, df):
+        curr = df.iloc[-1]
+        buy_cond = self.cached_entries(df)
+        stop, target = self.exit_levels(df)
+        df = df.copy(); df['Chart_Signal'] = 0
+        df.loc[buy_cond, 'Chart_Signal'] = 1
+        sig = "BUY" if buy_cond.iloc[-1] else "Wait"
+        return {"signal": sig, "df": df, "entry_price": curr['Close'], "stop_price": stop.iloc[-1], "target_price": target.iloc[-1]}
+
 # ==========================================
 # 활성화된 전략 목록
 # ==========================================
@@ -245,5 +608,19 @@ ACTIVE_STRATEGIES = [
     StrategyHyperSniper(), 
     StrategyTH(),          
     StrategyTurtle(),      
-    StrategyBNF()          
-]
\ No newline at end of file
+    StrategyBNF(),
+    # [신규] 레거시 strategies.py 이식 (스캐너 전략 필터에서 선택 시에만 검사)
+    StrategyElite(),
+    StrategyDBB(),
+    StrategyAISqueeze(),
+    StrategyBuffett(),
+    StrategyVWAP()
+]
+
+# [신규] 설정 파일(Data/strategies.json)의 선언형 전략 자동 등록 (기본 전략과 이름이 겹치면 무시)
+ACTIVE_STRATEGIES += [StrategyRule(d) for d in load_rule_definitions()
+                      if d['name'] not in {s.name for s in ACTIVE_STRATEGIES}]
+
+# [신규] 직접 고를 때만 도는 전략 (기본 스캔 / 관심종목 알림 / 포트폴리오 시뮬레이션에서 제외)
+OPT_IN_STRATEGIES = tuple(cls.name for cls in (StrategyElite, StrategyDBB, StrategyAISqueeze, StrategyBuffett, StrategyVWAP))
+DEFAULT_STRATEGIES = [s for s in ACTIVE_STRATEGIES if s.name not in OPT_IN_STRATEGIES]
\ No newline at end of file
@@ -0,0 +1,204 @@
+import os
+import time
+import random
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import pandas as pd
+import numpy as np
+import database as db
+from .panel import load_panel, share_panel, attach_panel, release_shared
+from .backtest import (run_panel_backtest, simulate_trades, summarize_trades, get_strategy,
+                       _entries_2d, _trades_frame, DEFAULT_MAX_HOLD)
+
+# -----------------------------------------------------------------------------
+# [신규] 전략 임계값 파라미터 스윕 (그리드 / 랜덤)
+# - 부모 프로세스가 전 종목 패널 + 지표를 1회 계산하여 공유 메모리에 올림
+# - 워커는 공유 패널을 읽기 전용으로 붙여서 조합별 백테스트만 수행
+# - 결과는 users.db sweep_results 테이블에 조합별로 저장
+# -----------------------------------------------------------------------------
+SWEEP_GRIDS = {
+    "🔫하이퍼스나이퍼": {'bw_max': [0.20, 0.25, 0.30, 0.35, 0.40], 'vol_mult': [1.2, 1.5, 2.0, 2.5, 3.0]},
+    "🧬TH알고리즘": {'rsi_min': [30, 35, 40, 45, 50], 'rsi_max': [60, 65, 70, 75, 80]},
+    "💧BNF": {'disparity_max': [85, 88, 90, 92, 95], 'rsi_max': [25, 30, 35, 40, 45]},
+}
+METRIC_COLUMNS = ['trades', 'win_rate', 'expectancy', 'profit_factor', 'max_drawdown', 'exposure']
+
+def _make_strategy(strategy_name, params):
+    # [수정] 클래스 대신 이름으로 복원 (설정 파일에서 읽은 선언형 전략은 클래스가 모두 StrategyRule)
+    return get_strategy(strategy_name).with_params(**params)
+
+def grid_params(grid):
+    """{'a': [1, 2], 'b': [3]} → [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]"""
+    keys = list(grid)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+
+def random_params(grid, n, seed=None):
+    """그리드 조합 중 n개를 중복 없이 무작위 추출"""
+    combos = grid_params(grid)
+    if n >= len(combos): return combos
+    return random.Random(seed).sample(combos, n)
+
+# --- 워커 프로세스 ---
+_worker = {}
+
+def _init_worker(handle):
+    panel, shms = attach_panel(handle)
+    _worker['panel'] = panel
+    _worker['shms'] = shms # 참조 유지 (해제 시 버퍼가 사라짐)
+
+def _pool_call(job):
+    fn, args = job
+    return fn(_worker['panel'], *args)
+
+def _map_panel(panel, fn, tasks, workers=None):
+    """fn(panel, *task) 를 tasks 전체에 적용. 2개 이상 워커면 공유 메모리 패널을 붙인 프로세스 풀 사용"""
+    if workers is None: workers = min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1: return [fn(panel, *t) for t in tasks]
+
+    handle, shms = share_panel(panel)
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(handle,)) as ex:
+            return list(ex.map(_pool_call, [(fn, t) for t in tasks]))
+    finally:
+        release_shared(shms)
+
+def _evaluate(panel, strategy_name, params, bt_kwargs):
+    strat = _make_strategy(strategy_name, params)
+    summary = summarize_trades(run_panel_backtest(panel, strat, **bt_kwargs), int(panel.bar_counts().sum()))
+    return {'params': params, **{k: summary[k] for k in METRIC_COLUMNS}}
+
+def _bt_kwargs(max_hold, trail_pct, fee_pct):
+    return {'max_hold': max_hold, 'trail_pct': trail_pct, 'fee_pct': fee_pct}
+
+def run_sweep(strategy, param_list, codes=None, start_date=None, workers=None,
+              max_hold=DEFAULT_MAX_HOLD, trail_pct=None, fee_pct=0.0, save=True):
+    """param_list 의 모든 조합을 저장소 전 종목에 대해 평가. (sweep_id, 결과 DataFrame, 소요초) 반환"""
+    t0 = time.perf_counter()
+    if isinstance(strategy, str): strategy = get_strategy(strategy)
+    cls_name = type(strategy).__name__
+    bt_kwargs = _bt_kwargs(max_hold, trail_pct, fee_pct)
+    tasks = [(strategy.name, {**strategy.params, **p}, bt_kwargs) for p in param_list]
+
+    panel = load_panel(codes, start_date)
+    if panel is None or not tasks: return None, pd.DataFrame(), time.perf_counter() - t0
+    rows = _map_panel(panel, _evaluate, tasks, workers)
+
+    sweep_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{cls_name}"
+    if save: db.save_sweep_results(sweep_id, strategy.name, rows)
+
+    # 스윕 대상 파라미터만 컬럼으로 펼침
+    swept = list(param_list[0])
+    df = pd.DataFrame([{**{k: r['params'][k] for k in swept}, **{k: r[k] for k in METRIC_COLUMNS}} for r in rows])
+    return sweep_id, df, time.perf_counter() - t0
+
+# -----------------------------------------------------------------------------
+# [신규] 워크포워드 평가
+# - 저장 이력을 [학습 train_months | 검증 test_months] 구간으로 나누고 test_months 씩 이동
+# - 학습 구간 성과로 파라미터를 고르고, 바로 다음 검증 구간(표본 외) 성과만 기록
+# - 지표는 인과적(과거 봉만 사용)이므로 전체 이력에 대해 1회만 계산하고,
+#   조합별 신호 / 손절·목표가도 1회만 계산
+# - [수정] 거래 시뮬레이션은 학습 / 검증 구간마다 따로 (그 구간 봉에서만 진입)
+#   학습 구간 보유 포지션이 검증 구간 진입을 막지 않도록 하고,
+#   청산일이 검증 구간에 걸친 학습 거래는 제외 (검증 구간 가격이 학습 성과에 섞이지 않게)
+# -----------------------------------------------------------------------------
+WF_TRAIN_MONTHS = 12
+WF_TEST_MONTHS = 3
+WF_MIN_TRAIN_TRADES = 20
+
+def walk_forward_windows(dates, train_months=WF_TRAIN_MONTHS, test_months=WF_TEST_MONTHS):
+    """[(train_start, train_end, test_end), ...] - 구간은 [start, end) 반열림, 마지막 검증 구간은 짧을 수 있음"""
+    valid = np.asarray(dates)[~np.isnat(dates)]
+    if len(valid) == 0: return []
+    first, last = pd.Timestamp(valid.min()), pd.Timestamp(valid.max()) + pd.Timedelta(days=1)
+    windows = []
+    start = first
+    while True:
+        train_end = start + pd.DateOffset(months=train_months)
+        if train_end >= last: break
+        windows.append((start, train_end, min(train_end + pd.DateOffset(months=test_months), last)))
+        start += pd.DateOffset(months=test_months)
+    return windows
+
+def _window_bars(panel, windows):
+    """구간별 (학습 봉 수, 검증 봉 수) - 노출도 계산용"""
+    d = panel.dates
+    count = lambda lo, hi: int(((d >= np.datetime64(lo)) & (d < np.datetime64(hi))).sum())
+    return [(count(ts, te), count(te, xe)) for ts, te, xe in windows]
+
+def _evaluate_windows(panel, strategy_name, params, bt_kwargs, windows, window_bars):
+    """한 조합의 신호를 전체 이력에 1회 계산 → 구간별로 따로 시뮬레이션한 학습/검증 요약 리스트"""
+    strategy = _make_strategy(strategy_name, params)
+    entries = _entries_2d(strategy, panel)
+    stops, targets = strategy.exit_levels(panel)
+    d = panel.dates
+
+    def window_trades(lo, hi):
+        in_window = (d >= np.datetime64(lo)) & (d < np.datetime64(hi))
+        sim = simulate_trades(panel['Open'], panel['High'], panel['Low'], panel['Close'],
+                              entries & in_window, stops, targets, **bt_kwargs)
+        return _trades_frame(sim, d, panel.codes)
+
+    out = []
+    for (ts, te, xe), (train_bars, test_bars) in zip(windows, window_bars):
+        train = window_trades(ts, te)
+        train = train[train['ExitDate'].to_numpy(dtype='datetime64[ns]') < np.datetime64(te)]
+        out.append({'train': summarize_trades(train, train_bars),
+                    'test': summarize_trades(window_trades(te, xe), test_bars)})
+    return out
+
+def _pick_params(results, w, min_trades):
+    """w 번째 학습 구간에서 기대값 최대 조합 (거래 수 부족 조합은 제외, 전부 부족하면 거래 수 최대)"""
+    train = [r[w]['train'] for _, r in results]
+    ok = [i for i, s in enumerate(train) if s['trades'] >= min_trades]
+    if ok: return max(ok, key=lambda i: train[i]['expectancy'])
+    return max(range(len(train)), key=lambda i: train[i]['trades'])
+
+def run_walk_forward(strategy, param_list, codes=None, start_date=None, workers=None,
+                     train_months=WF_TRAIN_MONTHS, test_months=WF_TEST_MONTHS,
+                     min_train_trades=WF_MIN_TRAIN_TRADES,
+                     max_hold=DEFAULT_MAX_HOLD, trail_pct=None, fee_pct=0.0, save=True):
+    """구간별 표본 외 성과 DataFrame 과 전체 표본 외 요약. (run_id, 구간 DataFrame, 요약 dict, 소요초) 반환"""
+    t0 = time.perf_counter()
+    if isinstance(strategy, str): strategy = get_strategy(strategy)
+    cls_name = type(strategy).__name__
+    if not param_list: param_list = [{}]
+
+    panel = load_panel(codes, start_date)
+    windows = walk_forward_windows(panel.dates, train_months, test_months) if panel is not None else []
+    if not windows: return None, pd.DataFrame(), {}, time.perf_counter() - t0
+
+    window_bars = _window_bars(panel, windows)
+    bt_kwargs = _bt_kwargs(max_hold, trail_pct, fee_pct)
+    params = [{**strategy.params, **p} for p in param_list]
+    tasks = [(strategy.name, p, bt_kwargs, windows, window_bars) for p in params]
+    results = list(zip(params, _map_panel(panel, _evaluate_windows, tasks, workers)))
+
+    fmt = lambda t: t.strftime('%Y-%m-%d')
+    rows = []
+    for w, (ts, te, xe) in enumerate(windows):
+        best_params, res = results[_pick_params(results, w, min_train_trades)]
+        train, test = res[w]['train'], res[w]['test']
+        rows.append({'window_no': w + 1, 'train_start': fmt(ts), 'train_end': fmt(te),
+                     'test_start': fmt(te), 'test_end': fmt(xe), 'params': best_params,
+                     'train_trades': train['trades'], 'train_expectancy': train['expectancy'],
+                     'test_trades': test['trades'], 'test_win_rate': test['win_rate'],
+                     'test_expectancy': test['expectancy'], 'test_profit_factor': test['profit_factor'],
+                     'test_max_drawdown': test['max_drawdown']})
+
+    run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-WF-{cls_name}"
+    if save: db.save_walkforward_results(run_id, strategy.name, rows)
+    df = pd.DataFrame(rows)
+    return run_id, df, summarize_walk_forward(df), time.perf_counter() - t0
+
+def summarize_walk_forward(df):
+    """구간별 결과 → 전체 표본 외 거래 수 / 승률 / 기대값 (거래 수 가중)"""
+    n = int(df['test_trades'].sum()) if not df.empty else 0
+    if n == 0: return {"windows": len(df), "trades": 0, "win_rate": 0.0, "expectancy": 0.0}
+    w = df['test_trades']
+    return {"windows": len(df), "trades": n,
+            "win_rate": float((df['test_win_rate'] * w).sum() / n),
+            "expectancy": float((df['test_expectancy'] * w).sum() / n)}
\ No newline at end of file
@@ -0,0 +1,152 @@
+import pandas as pd
+import numpy as np
+from multiprocessing import shared_memory
+import database as db
+from .common import calculate_indicators
+
+# -----------------------------------------------------------------------------
+# [신규] 전 종목 와이드 패널
+# - 필드별 2차원 DataFrame (행 = 봉 위치, 열 = 종목코드)
+# - 종목마다 자기 봉 순서대로 "우측 정렬" 하므로 (마지막 행 = 각 종목의 최신 봉)
+#   휴장일이 다른 한국/미국 종목이 섞여도 rolling/shift 결과가 종목 단독 계산과 동일
+# - panel['Close'] 처럼 접근하므로 calculate_indicators 와 전략 backtest()/exit_levels()를
+#   종목 루프 없이 전 종목에 한 번에 적용할 수 있음
+# -----------------------------------------------------------------------------
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class PricePanel:
+    def __init__(self, fields, dates, codes):
+        self.fields = fields                  # 필드명 -> DataFrame (봉 위치 × 종목)
+        self.dates = dates                    # (봉 위치 × 종목) datetime64 배열, 패딩은 NaT
+        self.codes = list(codes)
+
+    @property
+    def columns(self):
+        return list(self.fields)
+
+    @property
+    def index(self):
+        return self.fields['Close'].index
+
+    @property
+    def shape(self):
+        return self.dates.shape
+
+    def __len__(self):
+        return self.dates.shape[0]
+
+    def __contains__(self, key):
+        return key in self.fields
+
+    def __getitem__(self, key):
+        return self.fields[key]
+
+    def __setitem__(self, key, value):
+        self.fields[key] = value
+
+    def get(self, key, default=None):
+        return self.fields.get(key, default)
+
+    def bar_counts(self):
+        """종목별 실제 봉 수"""
+        return (~np.isnat(self.dates)).sum(axis=0)
+
+    def frame(self, code):
+        """한 종목의 일반 DataFrame (날짜 인덱스, 패딩 제거) 복원"""
+        j = self.codes.index(code)
+        valid = ~np.isnat(self.dates[:, j])
+        data = {k: v.iloc[:, j].to_numpy()[valid] for k, v in self.fields.items()}
+        return pd.DataFrame(data, index=pd.DatetimeIndex(self.dates[valid, j], name='Date'))
+
+def build_panel(long_df, min_bars=1):
+    """load_price_panel 롱 포맷 → PricePanel (종목별 우측 정렬)"""
+    if long_df is None or long_df.empty: return None
+
+    codes_arr = long_df['code'].to_numpy()
+    uniq, start, counts = np.unique(codes_arr, return_index=True, return_counts=True)
+    keep = counts >= min_bars
+    if not keep.any(): return None
+
+    # 정렬 보장: code, date 순 (load_price_panel 이 이미 정렬해서 반환)
+    order = np.argsort(start)
+    uniq, start, counts = uniq[order], start[order], counts[order]
+    keep = counts >= min_bars
+    col_of = np.full(len(uniq), -1)
+    col_of[keep] = np.arange(keep.sum())
+
+    group = np.repeat(np.arange(len(uniq)), counts)
+    pos = np.arange(len(codes_arr)) - np.repeat(start, counts)
+    n_rows = int(counts[keep].max())
+    rows = n_rows - np.repeat(counts, counts) + pos
+    cols = col_of[group]
+    sel = cols >= 0
+    rows, cols = rows[sel], cols[sel]
+
+    codes = [str(c) for c in uniq[keep]]
+    dates = np.full((n_rows, len(codes)), np.datetime64('NaT'), dtype='datetime64[ns]')
+    dates[rows, cols] = long_df['Date'].to_numpy(dtype='datetime64[ns]')[sel]
+
+    fields = {}
+    for f in PRICE_FIELDS:
+        arr = np.full((n_rows, len(codes)), np.nan)
+        arr[rows, cols] = long_df[f].to_numpy(dtype=float)[sel]
+        fields[f] = pd.DataFrame(arr, columns=codes)
+    return PricePanel(fields, dates, codes)
+
+def load_panel(codes=None, start_date=None, min_bars=60, with_indicators=True):
+    """저장소 주가를 한 번의 쿼리로 읽어 패널 구성 (+ 전 종목 지표 일괄 계산)"""
+    panel = build_panel(db.load_price_panel(codes, start_date), min_bars=min_bars)
+    if panel is not None and with_indicators:
+        calculate_indicators(panel)
+    return panel
+
+def iter_panels(codes=None, start_date=None, chunk_size=500, min_bars=60, with_indicators=True):
+    """메모리 보호용: 종목을 chunk_size 단위로 나눠 패널을 순서대로 반환"""
+    if codes is None: codes = db.get_stored_codes()
+    codes = [str(c) for c in codes]
+    for i in range(0, len(codes), chunk_size):
+        panel = load_panel(codes[i:i + chunk_size], start_date, min_bars, with_indicators)
+        if panel is not None: yield panel
+
+# -----------------------------------------------------------------------------
+# 프로세스 간 읽기 전용 공유 (워커마다 패널을 복사하지 않도록 shared_memory 사용)
+# -----------------------------------------------------------------------------
+def _to_shm(arr):
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    return shm
+
+def share_panel(panel):
+    """패널 배열을 공유 메모리에 올리고 (handle, shm 목록) 반환. 사용 후 release_shared() 필요"""
+    shms = []
+    handle = {'codes': panel.codes, 'shape': panel.shape, 'fields': {}, 'dates': None}
+    for name, frame in panel.fields.items():
+        shm = _to_shm(np.ascontiguousarray(frame.to_numpy(dtype=float)))
+        shms.append(shm); handle['fields'][name] = shm.name
+    shm = _to_shm(np.ascontiguousarray(panel.dates.astype('datetime64[ns]').view('int64')))
+    shms.append(shm); handle['dates'] = shm.name
+    return handle, shms
+
+def attach_panel(handle):
+    """share_panel 핸들로 읽기 전용 PricePanel 구성 (데이터 복사 없음). (panel, shm 목록) 반환"""
+    shape = tuple(handle['shape'])
+    shms = []
+
+    def view(name, dtype):
+        # 풀 워커는 부모의 resource_tracker 를 공유하므로 해제(unlink)는 부모의 release_shared 가 담당
+        shm = shared_memory.SharedMemory(name=name)
+        shms.append(shm)
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        arr.flags.writeable = False
+        return arr
+
+    fields = {name: pd.DataFrame(view(shm_name, np.float64), columns=handle['codes'], copy=False)
+              for name, shm_name in handle['fields'].items()}
+    dates = view(handle['dates'], np.int64).view('datetime64[ns]')
+    return PricePanel(fields, dates, handle['codes']), shms
+
+def release_shared(shms):
+    for shm in shms:
+        try:
+            shm.close(); shm.unlink()
+        except Exception: pass
@@ -0,0 +1,199 @@
+import time
+import pandas as pd
+import numpy as np
+import database as db
+from .common import get_usd_krw
+from .library import DEFAULT_STRATEGIES
+from .panel import iter_panels
+from .backtest import (simulate_trades, _trades_frame, _as_2d, _scores_2d, get_strategy,
+                       max_drawdown, DEFAULT_MAX_HOLD, MIN_BARS)
+
+# -----------------------------------------------------------------------------
+# [신규] 포트폴리오 단위 시뮬레이션
+# - 매일 전 종목의 전략 신호(= 그날 스캐너 결과)를 점수순으로 정렬
+# - 최대 보유 종목 수 / 거래당 위험(손절폭 기준 수량) / 종목당 최대 비중 / 통화별 현금 제약 적용
+# - 한국 종목은 원화 현금, 미국 종목은 달러 현금으로 매수 (환전은 하지 않음)
+# - 후보 거래의 청산 경로는 simulate_trades 로 미리 벡터화 계산하고,
+#   날짜 루프에서는 그날 청산/진입만 배열 연산으로 처리
+# - [수정] 아직 청산되지 않은 신호(ExitReason 'open')도 후보로 유지: 기간 끝까지 보유한 채 마지막 종가로 평가
+# -----------------------------------------------------------------------------
+DEFAULT_CAPITAL = 100_000_000
+DEFAULT_MAX_POSITIONS = 10
+DEFAULT_RISK_PCT = 0.02 # analyze_strategy_deep_dive 와 동일한 거래당 위험 비율
+
+CANDIDATE_COLUMNS = ['Code', 'Strategy', 'Score', 'EntryDate', 'ExitDate', 'EntryPrice', 'StopPrice', 'ExitPrice', 'ExitReason']
+
+def collect_candidates(strategies, codes=None, start_date=None, max_hold=DEFAULT_MAX_HOLD,
+                       trail_pct=None, chunk_size=500):
+    """전 종목 × 전략의 스캐너 포착(score > 0)을 (겹침 허용) 후보 거래로 변환. 같은 날 같은 종목은 최고 점수 전략만 유지"""
+    frames = []
+    for panel in iter_panels(codes, start_date, chunk_size=chunk_size, min_bars=MIN_BARS):
+        for strat in strategies:
+            score = _scores_2d(strat, panel)
+            stops, targets = strat.exit_levels(panel)
+            sim = simulate_trades(panel['Open'], panel['High'], panel['Low'], panel['Close'],
+                                  score > 0, stops, targets, max_hold=max_hold,
+                                  trail_pct=trail_pct, allow_overlap=True)
+            if len(sim['j']) == 0: continue
+            df = _trades_frame(sim, panel.dates, panel.codes)
+            df['Strategy'] = strat.name
+            df['Score'] = score[sim['entry_t'], sim['j']]
+            df['StopPrice'] = _as_2d(stops)[sim['entry_t'], sim['j']]
+            frames.append(df[CANDIDATE_COLUMNS])
+
+    if not frames: return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+    cands = pd.concat(frames, ignore_index=True)
+    cands = cands.sort_values('Score', ascending=False, kind='stable')
+    return cands.drop_duplicates(['Code', 'EntryDate']).reset_index(drop=True)
+
+def _close_frame(codes, start):
+    """보유했던 종목의 종가 (날짜 × 종목) DataFrame"""
+    if not codes: return pd.DataFrame()
+    long_df = db.load_price_panel(codes, pd.Timestamp(start).strftime('%Y-%m-%d'))
+    wide = long_df.pivot(index='Date', columns='code', values='Close')
+    wide.index = pd.to_datetime(wide.index).astype('datetime64[ns]')
+    return wide.reindex(columns=codes)
+
+def simulate_portfolio(cands, capital=DEFAULT_CAPITAL, max_positions=DEFAULT_MAX_POSITIONS,
+                       risk_pct=DEFAULT_RISK_PCT, max_weight=None, usd_ratio=None, fee_pct=0.0):
+    """후보 거래 → 실제 체결 거래 / 일별 자산곡선 / 회전율. 금액은 모두 원화 환산 기준
+    usd_ratio: 초기 자본 중 달러 현금 비중 (None 이면 후보에 미국 종목이 있을 때 0.5)"""
+    if cands.empty: return None
+    if max_weight is None: max_weight = 1.0 / max_positions
+    fee = fee_pct / 100 / 2 # 왕복 비용을 매수/매도에 절반씩
+
+    codes = cands['Code'].to_numpy()
+    is_us = np.array([str(c).isalpha() for c in codes])
+    if usd_ratio is None: usd_ratio = 0.5 if is_us.any() else 0.0
+
+    # 이벤트(진입/청산) 날짜 달력과 후보별 날짜 인덱스
+    entry_dt = cands['EntryDate'].to_numpy(dtype='datetime64[ns]')
+    exit_dt = cands['ExitDate'].to_numpy(dtype='datetime64[ns]')
+    cal = np.unique(np.concatenate([entry_dt, exit_dt]))
+    ed = np.searchsorted(cal, entry_dt); xd = np.searchsorted(cal, exit_dt)
+    fx = np.array([get_usd_krw(pd.Timestamp(d)) for d in cal])
+
+    order = np.lexsort((-cands['Score'].to_numpy(dtype=float), ed)) # 날짜순, 같은 날은 점수 높은 순
+    day_start = np.searchsorted(ed[order], np.arange(len(cal) + 1))
+    pool = is_us.astype(int) # 0 = 원화, 1 = 달러
+    entry_px = cands['EntryPrice'].to_numpy(dtype=float)
+    exit_px = cands['ExitPrice'].to_numpy(dtype=float)
+    risk_ps = entry_px - cands['StopPrice'].to_numpy(dtype=float)
+    is_open = cands['ExitReason'].to_numpy() == 'open' # 미청산: ExitPrice = 마지막 종가 (매도하지 않음)
+    code_id, uniq_codes = pd.factorize(codes)
+
+    cash = np.array([capital * (1 - usd_ratio), capital * usd_ratio / fx[0]])
+    open_cost = np.zeros(2) # 통화별 보유 원가
+    held = np.zeros(len(uniq_codes), dtype=bool)
+    exits_on = [[] for _ in range(len(cal))]
+    shares_all = np.zeros(len(cands))
+    cash_hist = np.zeros((len(cal), 2)); traded_krw = np.zeros(len(cal))
+
+    for d in range(len(cal)):
+        # 1) 청산: 매도 대금을 해당 통화 현금으로
+        if exits_on[d]:
+            k = np.array(exits_on[d])
+            proceeds = shares_all[k] * exit_px[k] * (1 - fee)
+            np.add.at(cash, pool[k], proceeds)
+            np.add.at(open_cost, pool[k], -shares_all[k] * entry_px[k])
+            held[code_id[k]] = False
+            traded_krw[d] += (proceeds * np.where(pool[k] == 1, fx[d], 1.0)).sum()
+
+        # 2) 진입: 그날 후보를 점수순으로, 빈 슬롯과 통화별 현금 한도 안에서
+        slots = max_positions - int(held.sum())
+        k = order[day_start[d]:day_start[d + 1]]
+        k = k[~held[code_id[k]]]
+        if slots > 0 and len(k):
+            rate = np.where(pool[k] == 1, fx[d], 1.0)
+            equity_krw = cash[0] + open_cost[0] + (cash[1] + open_cost[1]) * fx[d]
+            risk_amt = equity_krw * risk_pct / rate
+            cap_amt = equity_krw * max_weight / rate
+            with np.errstate(divide='ignore', invalid='ignore'):
+                shares = np.where(risk_ps[k] > 0, np.floor(risk_amt / risk_ps[k]), 0)
+                shares = np.minimum(shares, np.floor(cap_amt / entry_px[k]))
+            cost = shares * entry_px[k] * (1 + fee)
+            # [수정] 현금이 모자란 후보만 건너뛰고 다음(더 싼) 후보는 계속 검토
+            take, avail = [], cash.copy()
+            for i in np.nonzero(shares > 0)[0]:
+                if len(take) == slots: break
+                if cost[i] <= avail[pool[k[i]]]:
+                    avail[pool[k[i]]] -= cost[i]
+                    take.append(i)
+            take = np.array(take, dtype=int)
+            if len(take):
+                kt = k[take]
+                shares_all[kt] = shares[take]
+                np.add.at(cash, pool[kt], -cost[take])
+                np.add.at(open_cost, pool[kt], shares[take] * entry_px[kt])
+                held[code_id[kt]] = True
+                traded_krw[d] += (cost[take] * rate[take]).sum()
+                closing = kt[~is_open[kt]] # 미청산 거래는 끝까지 보유
+                for x, kk in zip(xd[closing], closing): exits_on[x].append(kk)
+        cash_hist[d] = cash
+
+    taken = shares_all > 0
+    trades = cands[taken].copy()
+    trades['Shares'] = shares_all[taken]
+    sell_fee = np.where(is_open[taken], 0.0, fee) # 미청산은 평가 손익 (매도 비용 없음)
+    trades['Return'] = (exit_px[taken] * (1 - sell_fee) / (entry_px[taken] * (1 + fee)) - 1) * 100
+
+    # 3) 일별 평가: 보유 종목 종가로 시가평가 (달력 = 이벤트일 + 보유 종목 거래일)
+    t_codes = list(pd.unique(trades['Code']))
+    wide = _close_frame(t_codes, cal[0])
+    days = np.union1d(cal, wide.index.to_numpy(dtype='datetime64[ns]'))
+    days = days[days <= cal[-1]]
+    closes = wide.reindex(pd.DatetimeIndex(days)).ffill().to_numpy(dtype=float) if t_codes else np.zeros((len(days), 0))
+
+    col = pd.Index(t_codes).get_indexer(trades['Code'])
+    t_ed = np.searchsorted(days, trades['EntryDate'].to_numpy(dtype='datetime64[ns]'))
+    t_xd = np.searchsorted(days, trades['ExitDate'].to_numpy(dtype='datetime64[ns]'))
+    t_xd[is_open[taken]] = len(days) # 미청산은 마지막 날까지 보유
+    delta = np.zeros((len(days) + 1, len(t_codes)))
+    np.add.at(delta, (t_ed, col), trades['Shares'].to_numpy())
+    np.add.at(delta, (t_xd, col), -trades['Shares'].to_numpy())
+    holdings = np.cumsum(delta, axis=0)[:-1]
+    value = np.nan_to_num(holdings * closes)
+    us_col = np.array([str(c).isalpha() for c in t_codes], dtype=bool)
+
+    day_ix = np.searchsorted(cal, days, side='right') - 1 # 그날까지 마지막 이벤트의 현금
+    fx_days = np.array([get_usd_krw(pd.Timestamp(d)) for d in days])
+    cash_d = cash_hist[day_ix]
+    invested = value[:, ~us_col].sum(axis=1) + value[:, us_col].sum(axis=1) * fx_days
+    cash_krw = cash_d[:, 0] + cash_d[:, 1] * fx_days
+    equity = pd.DataFrame({'Equity': cash_krw + invested, 'Cash': cash_krw, 'Invested': invested,
+                           'Positions': (holdings > 0).sum(axis=1)}, index=pd.DatetimeIndex(days, name='Date'))
+
+    traded = pd.Series(traded_krw, index=pd.DatetimeIndex(cal)).reindex(equity.index, fill_value=0.0)
+    equity['Turnover'] = traded / 2 / equity['Equity'].shift(1).fillna(capital) * 100 # 일별 회전율(%)
+
+    years = max((days[-1] - days[0]) / np.timedelta64(365, 'D'), 1e-9)
+    final = float(equity['Equity'].iloc[-1])
+    eq_ret = equity['Equity'].pct_change().fillna(0).to_numpy() * 100
+    summary = {
+        "trades": int(taken.sum()),
+        "win_rate": float((trades['Return'] > 0).mean() * 100) if len(trades) else 0.0,
+        "total_return": (final / capital - 1) * 100,
+        "cagr": float(((final / capital) ** (1 / years) - 1) * 100) if final > 0 else -100.0,
+        "max_drawdown": max_drawdown(eq_ret),
+        "annual_turnover": float(traded.sum() / 2 / equity['Equity'].mean() / years * 100),
+        "avg_positions": float(equity['Positions'].mean()),
+        "skipped_signals": int(len(cands) - taken.sum()),
+        "open_positions": int(is_open[taken].sum()),
+    }
+    return {"equity": equity, "trades": trades.reset_index(drop=True), "summary": summary}
+
+def run_portfolio_backtest(strategy_names=None, codes=None, start_date=None, capital=DEFAULT_CAPITAL,
+                           max_positions=DEFAULT_MAX_POSITIONS, risk_pct=DEFAULT_RISK_PCT, max_weight=None,
+                           usd_ratio=None, max_hold=DEFAULT_MAX_HOLD, trail_pct=None, fee_pct=0.0):
+    """저장소 전 종목에 대해 일별 스캐너 추천을 실제 자본으로 매매했을 때의 결과.
+    strategy_names 가 없으면 기본 스캔과 같은 DEFAULT_STRATEGIES.
+    {'equity', 'trades', 'summary', 'elapsed'} 반환 (신호가 없으면 None)"""
+    t0 = time.perf_counter()
+    strategies = [get_strategy(n) for n in strategy_names] if strategy_names else DEFAULT_STRATEGIES
+    strategies = [s for s in strategies if s is not None]
+
+    cands = collect_candidates(strategies, codes, start_date, max_hold=max_hold, trail_pct=trail_pct)
+    res = simulate_portfolio(cands, capital, max_positions, risk_pct, max_weight, usd_ratio, fee_pct)
+    if res is None: return None
+    res["elapsed"] = time.perf_counter() - t0
+    return res
@@ -0,0 +1,106 @@
+import json
+import heapq
+import itertools
+import threading
+import numpy as np
+import database as db
+from .library import ACTIVE_STRATEGIES
+from .panel import load_panel
+from .backtest import _scores_2d, MIN_BARS
+
+# -----------------------------------------------------------------------------
+# [신규] 전략 간 랭킹 (점수 정규화 + 스캔 중 상위 K 유지)
+# - 전략마다 점수 척도가 다름 (TH 80 + RSI/5, 터틀 고정 90, BNF (100 - 이격도) × 3 ...)
+#   → 원점수를 그 전략의 과거 포착 점수 분포 안 백분위(0~100)로 바꿔 비교
+# - 분포: 표본 종목 패널의 봉별 score() 중 포착(> 0)된 값의 분위수 RANK_QUANTILES 개
+#   (전략 + 파라미터 + 주가 데이터 버전 단위로 한 번만 계산, 메모 → score_dist_cache → 계산)
+# - TopK: 최소 힙으로 상위 k 개만 유지 (push O(log k)) - 스캔이 끝나기 전에도 상위 종목 조회 가능
+# -----------------------------------------------------------------------------
+RANK_TOP_K = 50
+RANK_SAMPLE_CODES = 400
+RANK_QUANTILES = 201
+
+_memo = {}
+_memo_lock = threading.Lock() # 여러 스캔 스레드가 동시에 같은 분포를 계산하지 않도록 계산 구간까지 잠금
+
+def _cache_key(strategy, version):
+    return f"{strategy.name}|{strategy.signature()}|v{version}"
+
+def _sample_codes(n=RANK_SAMPLE_CODES):
+    """저장소 종목 중 코드 순으로 고르게 n 개 (매번 같은 표본)"""
+    codes = sorted(map(str, db.get_stored_codes()))
+    if len(codes) <= n: return codes
+    return [codes[i] for i in np.linspace(0, len(codes) - 1, n).astype(int)]
+
+def score_distributions(strategies=None, version=None):
+    """전략 이름 → 포착 점수 분위수 (오름차순 배열, 과거 포착이 없으면 빈 배열)"""
+    strategies = strategies or ACTIVE_STRATEGIES
+    version = db.get_price_data_version() if version is None else version
+    out = {}
+    with _memo_lock:
+        missing = []
+        for s in strategies:
+            key = _cache_key(s, version)
+            if key not in _memo:
+                cached = db.load_score_distribution(key)
+                if cached is None:
+                    missing.append(s); continue
+                _memo[key] = np.array(json.loads(cached), dtype=float)
+            out[s.name] = _memo[key]
+
+        if missing:
+            panel = load_panel(_sample_codes(), None, min_bars=MIN_BARS)
+            valid = panel['Close'].notna().cumsum().to_numpy() >= MIN_BARS if panel is not None else None
+            for s in missing:
+                hits = np.array([])
+                if panel is not None:
+                    sc = _scores_2d(s, panel)
+                    hits = sc[(sc > 0) & np.isfinite(sc) & valid]
+                q = np.quantile(hits, np.linspace(0, 1, RANK_QUANTILES)) if len(hits) else np.array([])
+                key = _cache_key(s, version)
+                db.save_score_distribution(key, s.name, version, json.dumps(q.tolist()))
+                # 이전 데이터 버전 분포는 버림
+                for k in [k for k in _memo if k.startswith(f"{s.name}|") and not k.endswith(f"|v{version}")]:
+                    del _memo[k]
+                _memo[key] = q
+                out[s.name] = q
+    return out
+
+class ScoreRanker:
+    """한 데이터 버전 기준의 전략별 점수 분포로 원점수 → 백분위 (스캔 시작 시 한 번 만들어 공유)"""
+    def __init__(self, strategies=None, version=None):
+        self.version = db.get_price_data_version() if version is None else version
+        self.quantiles = score_distributions(strategies, self.version)
+
+    def normalize(self, strategy_name, score):
+        """분포 안 백분위 (동점은 중간 순위 → 고정 점수 전략은 50). 과거 포착이 없으면 50"""
+        q = self.quantiles.get(strategy_name)
+        if q is None or len(q) == 0: return 50.0
+        lo = np.searchsorted(q, score, side='left')
+        hi = np.searchsorted(q, score, side='right')
+        return float((lo + hi) / 2 / len(q) * 100)
+
+def get_score_ranker(strategies=None):
+    return ScoreRanker(strategies)
+
+class TopK:
+    """점수 상위 k 개 항목 (스캔 스레드가 push, UI 가 실행 중에 items() 로 조회)"""
+    def __init__(self, k=RANK_TOP_K):
+        self.k = k
+        self._heap = [] # (점수, -도착순서, 항목) 최소 힙 → 동점이면 먼저 들어온 항목 유지
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, key, item):
+        entry = (key, -next(self._seq), item)
+        with self._lock:
+            if len(self._heap) < self.k: heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]: heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """점수 내림차순 항목 리스트 (최대 k 개만 정렬)"""
+        with self._lock: entries = list(self._heap)
+        return [e[2] for e in sorted(entries, key=lambda e: e[:2], reverse=True)]
+
+    def __len__(self):
+        return len(self._heap)
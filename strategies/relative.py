@@ -0,0 +1,220 @@
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import yfinance as yf
+import database as db
+from .common import get_yahoo_session
+from .vwap import _arr, _dates, _codes, _like
+
+# -----------------------------------------------------------------------------
+# [신규] 상대강도 / 횡단면 순위 지표 (종목 프레임 하나만 보는 check_signal 에 시장 대비 정보 제공)
+# - "RS_KOSPI" / "RS_KOSDAQ" / "RS_SPY"  종가 / 지수 종가 (상대강도선, 지수는 index_prices 에 증분 저장)
+#   "RS_MKT"                           종목 시장 지수 기준 (KOSPI / KOSDAQ, 미국 종목은 SPY)
+#   한국 종목의 SPY 는 같은 날 미국 종가가 한국 장 마감 뒤라 전일 종가 사용 (미래 참조 없음)
+# - "XRANK_3M" / "XRANK_6M" / "XRANK_12M" 저장 종목 전체 중 그 날 63 / 126 / 252봉 수익률 백분위 (0~100)
+#   한국 / 미국 종목은 따로 순위. 날짜별 순위는 xsection_ranks 에 저장하고
+#   종목 구간(첫 봉, 마지막 봉, 봉 수)이 바뀐 날짜만 전 종목 한 번의 벡터 연산으로 다시 계산
+#   아직 순위 계산 전인 최신 봉은 그 종목의 마지막 계산일 순위를 씀 (update_cross_ranks 후 정확한 값)
+# - 규칙 / 전략에서 컬럼명으로 사용 (처음 조회할 때 계산해 df 에 붙임)
+# -----------------------------------------------------------------------------
+RS_BENCHMARKS = {'KOSPI': '^KS11', 'KOSDAQ': '^KQ11', 'SPY': 'SPY'}
+RS_HISTORY_DAYS = 1825
+XRANK_HORIZONS = {'3M': 63, '6M': 126, '12M': 252}
+XRANK_HISTORY_DAYS = 550 # 다시 계산할 첫 날짜보다 이만큼 앞부터 읽음 (252봉 + 휴장 / 거래정지 여유)
+_XRANK_FIELDS = {'3M': 'r3m', '6M': 'r6m', '12M': 'r12m'}
+_DAY_KEY = 1 << 20 # 종목 위치 × _DAY_KEY + 1970년 이후 일수
+
+def split_relative_column(name):
+    """'RS_KOSPI' → ('rs', 'KOSPI'), 'XRANK_6M' → ('xrank', '6M'), 아니면 None"""
+    kind, _, arg = str(name).partition('_')
+    if kind == 'RS' and (arg in RS_BENCHMARKS or arg == 'MKT'): return 'rs', arg
+    if kind == 'XRANK' and arg in XRANK_HORIZONS: return 'xrank', arg
+    return None
+
+# -----------------------------------------------------------------------------
+# 지수 종가 (환율과 같은 방식: DB 증분 수집 + 메모리, 하루 한 번 백그라운드 갱신)
+# -----------------------------------------------------------------------------
+_bench_memo = {'series': {}, 'loaded_on': None}
+_bench_lock = threading.Lock()
+_bench_refreshing = False
+
+def update_benchmarks():
+    """지수 종가를 마지막 저장일 이후만 증분 수집. 새로 저장한 지수 수 반환"""
+    today = datetime.now().date()
+    saved = 0
+    for symbol in RS_BENCHMARKS.values():
+        last_date_str = db.get_last_index_date(symbol)
+        start_date = datetime.now() - timedelta(days=RS_HISTORY_DAYS)
+        if last_date_str:
+            last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
+            if last_date >= today - timedelta(days=1): continue
+            start_date = last_date + timedelta(days=1)
+        try:
+            hist = yf.Ticker(symbol, session=get_yahoo_session()).history(start=start_date)
+            if hist.empty: continue
+            if hist.index.tz is not None:
+                hist.index = hist.index.tz_localize(None)
+            db.save_index_prices(symbol, hist['Close'])
+            saved += 1
+        except Exception: continue
+    return saved
+
+def _load_benchmarks():
+    series = {name: db.load_index_prices(symbol) for name, symbol in RS_BENCHMARKS.items()}
+    with _bench_lock:
+        _bench_memo['series'] = {k: v for k, v in series.items() if v is not None}
+        _bench_memo['loaded_on'] = datetime.now().date()
+
+def _refresh_benchmarks_background():
+    global _bench_refreshing
+    try:
+        if update_benchmarks(): _load_benchmarks()
+    finally:
+        with _bench_lock: _bench_refreshing = False
+
+def benchmark_close(name):
+    """지수 종가 Series (없으면 None). 처음 한 번만 동기 수집, 이후는 하루 한 번 백그라운드 갱신"""
+    global _bench_refreshing
+    with _bench_lock: loaded_on = _bench_memo['loaded_on']
+    if loaded_on is None:
+        _load_benchmarks()
+        with _bench_lock: empty = not _bench_memo['series']
+        if empty:
+            update_benchmarks(); _load_benchmarks()
+    elif loaded_on < datetime.now().date():
+        with _bench_lock:
+            start = not _bench_refreshing
+            _bench_refreshing = True
+            _bench_memo['loaded_on'] = datetime.now().date()
+        if start: threading.Thread(target=_refresh_benchmarks_background, daemon=True).start()
+    with _bench_lock: return _bench_memo['series'].get(name)
+
+# -----------------------------------------------------------------------------
+# 상대강도선
+# -----------------------------------------------------------------------------
+_listing_memo = {'names': {}, 'loaded_on': None}
+
+def _market_benchmark(codes):
+    """종목별 시장 지수 이름 (KOSPI / KOSDAQ, 미국 종목은 SPY, 코드를 모르면 None)"""
+    today = datetime.now().date()
+    if _listing_memo['loaded_on'] != today:
+        _listing_memo.update(names=db.get_listing_names(), loaded_on=today)
+    out = []
+    for code in codes:
+        if not code: out.append(None); continue
+        market = _listing_memo['names'].get(str(code), (None, None))[1]
+        if market in ('KOSPI', 'KOSDAQ'): out.append(market)
+        else: out.append('KOSPI' if str(code).isdigit() else 'SPY')
+    return out
+
+def rs_line(df, bench='KOSPI'):
+    """종가 / 지수 종가 (단일 종목 Series / 패널 DataFrame). bench='MKT' 면 종목 시장 지수"""
+    dates, codes = _dates(df), _codes(df)
+    benches = _market_benchmark(codes) if bench == 'MKT' else [bench] * len(codes)
+    ref = np.full(dates.shape, np.nan)
+    for name in {b for b in benches if b}:
+        series = benchmark_close(name)
+        if series is None: continue
+        idx = series.index.values.astype('datetime64[ns]')
+        vals = series.to_numpy(dtype=float)
+        for strict in (False, True):
+            cols = [j for j, b in enumerate(benches)
+                    if b == name and strict == (name == 'SPY' and str(codes[j]).isdigit())]
+            if not cols: continue
+            d = dates[:, cols]
+            pos = np.searchsorted(idx, d, side='left' if strict else 'right') - 1
+            ok = (pos >= 0) & ~np.isnat(d)
+            block = np.full(d.shape, np.nan)
+            block[ok] = vals[pos[ok]]
+            ref[:, cols] = block
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _like(df, _arr(df['Close']) / ref)
+
+# -----------------------------------------------------------------------------
+# 횡단면 수익률 순위 (증분 갱신)
+# -----------------------------------------------------------------------------
+_xrank_lock = threading.Lock()
+
+def update_cross_ranks():
+    """구간이 바뀐 종목이 있는 날짜만 전 종목 순위 재계산. 다시 계산한 날짜 수 반환 (다른 갱신이 진행 중이면 0)"""
+    if not _xrank_lock.acquire(blocking=False): return 0
+    try:
+        fps, done = db.get_price_fingerprints(), db.get_xsection_progress()
+        # 종목별 다시 볼 첫 날짜: 뒤에 봉만 붙었으면 이전 마지막 봉부터, 그 외(신규 / 과거 보충)는 첫 봉부터
+        bounds = {}
+        for code, fp in fps.items():
+            old = done.get(code)
+            if old == fp: continue
+            appended = old is not None and old[0] == fp[0] and old[1] < fp[1]
+            bounds[code] = old[1] if appended else fp[0]
+        if not bounds: return 0
+
+        start = (pd.Timestamp(min(bounds.values())) - timedelta(days=XRANK_HISTORY_DAYS)).strftime('%Y-%m-%d')
+        prices = db.load_close_prices(start)
+        code = prices['code'].to_numpy(dtype=str)
+        day = prices['date'].to_numpy(dtype=str)
+        close = prices['close'].to_numpy(dtype=float)
+
+        bound = pd.Series(bounds).reindex(code).to_numpy()
+        changed = pd.notna(bound)
+        changed[changed] = day[changed] >= bound[changed].astype(str)
+        sel = np.isin(day, np.unique(day[changed])) # 바뀐 종목이 있는 날짜의 전 종목
+
+        # 종목 · 날짜 순 롱 포맷 → n 행 앞이 같은 종목이면 n 봉 전 종가 (전 종목 한 번에)
+        data = {'date': day[sel], 'kr': np.char.isdigit(code[sel])}
+        for key, n in XRANK_HORIZONS.items():
+            ret = np.full(len(close), np.nan)
+            if len(close) > n:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ret[n:] = np.where(code[n:] == code[:-n], close[n:] / close[:-n] - 1, np.nan)
+            data[key] = ret[sel]
+        ranks = pd.DataFrame(data).groupby(['date', 'kr'])[list(XRANK_HORIZONS)].rank(pct=True) * 100
+
+        keep = ranks.notna().any(axis=1).to_numpy()
+        vals = ranks[keep].astype(object).where(ranks[keep].notna(), None)
+        rows = list(zip(code[sel][keep], day[sel][keep], *(vals[k] for k in XRANK_HORIZONS)))
+        db.save_xsection_ranks(rows, [(c, *fps[c]) for c in bounds])
+        return int(len(np.unique(day[sel])))
+    finally:
+        _xrank_lock.release()
+
+def refresh_cross_ranks_async():
+    threading.Thread(target=update_cross_ranks, daemon=True).start()
+
+def cross_rank(df, horizon='6M'):
+    """저장된 횡단면 순위를 (봉 × 종목) 위치에 맞춰 반환 (단일 종목 Series / 패널 DataFrame)"""
+    dates, codes = _dates(df), _codes(df)
+    n_bars, n_codes = dates.shape
+    out = np.full(dates.shape, np.nan)
+    valid = ~np.isnat(dates)
+    known = [str(c) for c in codes if c]
+    if known and valid.any():
+        rows = db.load_xsection_ranks(known, np.datetime_as_string(dates[valid].min(), unit='D'))
+        if not rows.empty:
+            # 열 우선으로 펼친 (종목, 날짜) 키로 한 번에 위치 찾기 (signals.stored_signal_matrix 와 같은 방식)
+            days = np.where(valid, dates.astype('datetime64[D]').astype(np.int64), -1)
+            cell_key = (np.arange(n_codes)[None, :] * _DAY_KEY + days).ravel(order='F')
+            col = pd.Series(np.arange(n_codes), index=[str(c) for c in codes])
+            row_col = col.reindex(rows['code'].astype(str)).to_numpy().astype(np.int64)
+            row_day = rows['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+            key = row_col * _DAY_KEY + row_day
+            p = np.minimum(np.searchsorted(cell_key, key), len(cell_key) - 1)
+            ok = cell_key[p] == key
+            out[p[ok] % n_bars, p[ok] // n_bars] = rows[_XRANK_FIELDS[horizon]].to_numpy(dtype=float)[ok]
+
+            # 마지막 계산일 이후 봉은 그 종목 마지막 순위를 이어 씀
+            last_day = np.full(n_codes, -1)
+            np.maximum.at(last_day, row_col, row_day)
+            tail = (days > last_day[None, :]) & (last_day[None, :] >= 0)
+            out = np.where(tail, pd.DataFrame(out).ffill().to_numpy(), out)
+    return _like(df, out)
+
+def relative_column(df, name):
+    """'RS_KOSPI', 'XRANK_6M' 같은 컬럼을 계산해 df[name] 에 저장하고 반환 (이미 있으면 그대로)"""
+    if name in df: return df[name]
+    parsed = split_relative_column(name)
+    if parsed is None: raise KeyError(name)
+    kind, arg = parsed
+    df[name] = rs_line(df, arg) if kind == 'rs' else cross_rank(df, arg)
+    return df[name]
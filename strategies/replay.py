@@ -0,0 +1,82 @@
+import time
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+import database as db
+from .common import SCAN_HISTORY_DAYS
+from .library import ACTIVE_STRATEGIES
+from .panel import load_panel
+from .backtest import _scores_2d
+
+# -----------------------------------------------------------------------------
+# [신규] 과거 스캔 재생 (point-in-time replay) → scan_history 백필
+# - 각 과거 거래일을 "그날 스캔했다면" 으로 보고 전 전략의 check_signal 을 재현
+#   (strategy.score() 는 봉마다 그 봉까지의 데이터만 쓰므로 미래 참조 없음)
+# - 날짜 × 종목 전체를 종목 묶음(chunk) 단위 패널로 한 번에 계산하고 일괄 INSERT
+# - 멱등: scan_history UNIQUE(scan_date, strategy_name, code) + INSERT OR IGNORE
+# - 재개: 묶음마다 종목별 재생 완료일(replay_progress)을 같은 트랜잭션으로 기록,
+#   다음 실행은 그 이후 날짜만 재생 (중단 시 최대 한 묶음만 다시 계산)
+#   (완료일 이전 구간을 다시 채우려면 resume=False - 이미 있는 행은 무시되므로 안전)
+# -----------------------------------------------------------------------------
+REPLAY_MIN_BARS = 60 # fetch_data 와 동일: 60봉 미만 종목은 스캔되지 않음
+
+def _market_of(code):
+    return "US" if str(code).isalpha() else "KR"
+
+def replay_scan_history(start_date=None, end_date=None, codes=None, strategies=None,
+                        chunk_size=500, resume=True, progress_cb=None):
+    """start_date ~ end_date 의 매 거래일 스캔을 재생하여 scan_history 에 저장.
+    {'hits', 'inserted', 'codes', 'skipped', 'elapsed', 'rows_per_sec'} 반환"""
+    t0 = time.perf_counter()
+    strategies = strategies or ACTIVE_STRATEGIES
+    if codes is None: codes = db.get_stored_codes()
+    codes = [str(c) for c in codes]
+
+    last_bar = db.get_last_price_dates()
+    done = db.get_replay_progress() if resume else {}
+    end_str = end_date or "9999-12-31"
+    # 재생할 구간이 남은 종목만 (마지막 저장 봉 또는 end_date 까지 이미 재생했으면 건너뜀)
+    pending = [c for c in codes if c in last_bar and done.get(c, "") < min(last_bar[c], end_str)]
+
+    # 지표 워밍업을 위해 start_date 이전 이력도 함께 로드
+    warm_start = None
+    if start_date:
+        warm_start = (pd.Timestamp(start_date) - timedelta(days=SCAN_HISTORY_DAYS)).strftime("%Y-%m-%d")
+    lo_global = np.datetime64(start_date or "1900-01-01", 'ns')
+    hi_global = np.datetime64(end_str if end_date else "2262-01-01", 'ns')
+
+    names = db.get_listing_names()
+    hits = inserted = 0
+    for i in range(0, len(pending), chunk_size):
+        chunk = pending[i:i + chunk_size]
+        panel = load_panel(chunk, warm_start, min_bars=REPLAY_MIN_BARS)
+        progress = {c: min(last_bar[c], end_str) for c in chunk}
+        rows = _replay_panel(panel, strategies, names, done, lo_global, hi_global) if panel is not None else []
+        hits += len(rows)
+        inserted += db.save_scan_results_bulk(rows, progress)
+        if progress_cb: progress_cb(min(i + chunk_size, len(pending)), len(pending))
+
+    elapsed = time.perf_counter() - t0
+    return {"hits": hits, "inserted": inserted, "codes": len(pending), "skipped": len(codes) - len(pending),
+            "elapsed": elapsed, "rows_per_sec": hits / elapsed if elapsed > 0 else 0.0}
+
+def _replay_panel(panel, strategies, names, done, lo_global, hi_global):
+    """패널 한 묶음의 재생 대상 봉에서 전략별 포착을 scan_history 행으로"""
+    # 종목별 재생 하한: max(start_date, 재생 완료일 다음 날)
+    lo = np.array([max(lo_global, np.datetime64(done[c], 'ns') + np.timedelta64(1, 'D')) if c in done else lo_global
+                   for c in panel.codes])
+    dates = panel.dates
+    scannable = (dates >= lo[None, :]) & (dates <= hi_global) & \
+                (panel['Close'].notna().cumsum().to_numpy() >= REPLAY_MIN_BARS)
+    date_str = np.datetime_as_string(dates, unit='D')
+    close = panel['Close'].to_numpy()
+    code_arr = np.array(panel.codes, dtype=object)
+    name_arr = np.array([names.get(c, (c, None))[0] for c in panel.codes], dtype=object)
+    mkt_arr = np.array([names.get(c, (None, None))[1] or _market_of(c) for c in panel.codes], dtype=object)
+
+    rows = []
+    for strat in strategies:
+        t, j = np.nonzero((_scores_2d(strat, panel) > 0) & scannable)
+        rows.extend(zip(date_str[t, j], [strat.name] * len(t), code_arr[j], name_arr[j],
+                        close[t, j].astype(float), mkt_arr[j]))
+    return rows
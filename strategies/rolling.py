@@ -0,0 +1,107 @@
+import re
+import time
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# -----------------------------------------------------------------------------
+# [신규] 이동 백분위 순위 / 이동 분위수 지표
+# - "밴드폭이 최근 1년 중 하위 5%" 같은 상대 조건용 (고정 임계값 / 120일 평균 대신)
+# - pandas rolling().rank / rolling().quantile 사용: 창 안 값을 인덱스 스킵리스트로 유지해
+#   봉 하나 넣고 빼는 데 O(log w) (rolling().apply 로 매 봉 창 전체를 정렬하면 O(w log w))
+#   단일 종목 Series / 패널 DataFrame 모두 한 번에 계산 (파이썬 봉 루프 없음)
+# - 창이 꽉 찬 봉(w 개 모두 값 있음)부터 값이 나옴 → 꼬리만 평가해도 전 구간 평가와 같은 값
+# - 컬럼명으로 규칙 / 전략에서 바로 사용 (처음 조회할 때 계산해 df 에 붙임)
+#   "PRANK_Bandwidth"        최근 252봉 안에서 현재 값의 백분위 순위 (0~100, 동률은 평균 순위)
+#   "PRANKW120_Volume"       창 길이 지정
+#   "Q5_ATRP" / "Q5W120_RSI" 최근 252봉(또는 w 봉)의 5% 분위수 값
+#   대상은 아무 지표 컬럼이나 가능 (밴드폭 Bandwidth, ATR% ATRP, 거래량 Volume, RSI 등)
+# -----------------------------------------------------------------------------
+ROLL_WINDOW = 252
+ROLL_COLUMNS = ('Bandwidth', 'ATRP', 'Volume', 'RSI')
+
+_NAME = re.compile(r'^(PRANK|Q(\d+(?:\.\d+)?))(?:W(\d+))?_(.+)$')
+
+def split_rolling_column(name):
+    """'PRANK_RSI' → ('rank', None, 252, 'RSI'), 'Q5W120_ATRP' → ('quantile', 0.05, 120, 'ATRP'), 아니면 None"""
+    m = _NAME.match(str(name))
+    if not m: return None
+    window = int(m.group(3)) if m.group(3) else ROLL_WINDOW
+    if m.group(2) is None: return 'rank', None, window, m.group(4)
+    q = float(m.group(2)) / 100
+    return ('quantile', q, window, m.group(4)) if 0 <= q <= 1 else None
+
+def rolling_rank(values, window=ROLL_WINDOW):
+    """최근 window 봉 안에서 봉별 현재 값의 백분위 순위 (0~100)"""
+    return values.rolling(window, min_periods=window).rank(pct=True) * 100
+
+def rolling_quantile(values, q, window=ROLL_WINDOW):
+    """최근 window 봉의 q 분위수 (선형 보간)"""
+    return values.rolling(window, min_periods=window).quantile(q)
+
+def rolling_column(df, name):
+    """'PRANK_Bandwidth' 같은 컬럼을 계산해 df[name] 에 저장하고 반환 (이미 있으면 그대로)"""
+    if name in df: return df[name]
+    parsed = split_rolling_column(name)
+    if parsed is None: raise KeyError(name)
+    kind, q, window, base = parsed
+    values = df[base]
+    df[name] = rolling_rank(values, window) if kind == 'rank' else rolling_quantile(values, q, window)
+    return df[name]
+
+# -----------------------------------------------------------------------------
+# 벤치마크 (python -m strategies.rolling)
+# - 같은 입력에 대해 rolling().apply (봉마다 창 정렬) / numpy 창 비교 (봉마다 O(w)) / 스킵리스트 비교
+# -----------------------------------------------------------------------------
+def _apply_rank(values, window):
+    def rank(a):
+        return ((a < a[-1]).sum() + ((a == a[-1]).sum() + 1) / 2) / len(a) * 100
+    return values.rolling(window, min_periods=window).apply(rank, raw=True)
+
+def _window_rank(values, window):
+    x = np.asarray(values.to_numpy(dtype=float))
+    x = x[:, None] if x.ndim == 1 else x
+    win = sliding_window_view(x, window, axis=0) # (n - w + 1, 종목, w)
+    cur = x[window - 1:, :, None]
+    out = np.full(x.shape, np.nan)
+    with np.errstate(invalid='ignore'):
+        rank = ((win < cur).sum(-1) + ((win == cur).sum(-1) + 1) / 2) / window * 100
+    out[window - 1:] = np.where(np.isnan(win).any(-1) | np.isnan(cur[..., 0]), np.nan, rank)
+    return out if np.ndim(values) == 2 else out[:, 0]
+
+def benchmark(frame, panel=None, window=ROLL_WINDOW, columns=ROLL_COLUMNS, repeat=3):
+    """frame: 단일 종목 지표 DataFrame, panel: PricePanel (선택). 방식별 평균 ms 와 결과 일치 여부"""
+    def timed(fn):
+        t0 = time.perf_counter()
+        for _ in range(repeat): out = fn()
+        return out, (time.perf_counter() - t0) * 1000 / repeat
+
+    res = {"bars": len(frame), "window": window}
+    ref, res['frame_apply_ms'] = timed(lambda: [_apply_rank(frame[c], window) for c in columns])
+    win, res['frame_window_ms'] = timed(lambda: [_window_rank(frame[c], window) for c in columns])
+    fast, res['frame_rank_ms'] = timed(lambda: [rolling_rank(frame[c], window) for c in columns])
+    _, res['frame_quantile_ms'] = timed(lambda: [rolling_quantile(frame[c], 0.05, window) for c in columns])
+    res['match'] = all(np.allclose(a.to_numpy(), b.to_numpy(), equal_nan=True) and np.allclose(w, b.to_numpy(), equal_nan=True)
+                       for a, w, b in zip(ref, win, fast))
+    if panel is not None:
+        res['panel_cells'] = int(np.prod(panel.shape))
+        win, res['panel_window_ms'] = timed(lambda: [_window_rank(panel[c], window) for c in columns])
+        fast, res['panel_rank_ms'] = timed(lambda: [rolling_rank(panel[c], window) for c in columns])
+        res['match'] &= all(np.allclose(w, b.to_numpy(), equal_nan=True) for w, b in zip(win, fast))
+    return res
+
+if __name__ == "__main__":
+    import database as db
+    from .common import calculate_indicators
+    from .panel import load_panel
+    codes = sorted(map(str, db.get_stored_codes()))[:300]
+    panel = load_panel(codes, None, min_bars=ROLL_WINDOW)
+    if panel is None: raise SystemExit("저장된 주가가 없습니다")
+    calculate_indicators(panel)
+    frame = panel.frame(panel.codes[0])
+    res = benchmark(frame, panel)
+    print(f"frame {res['bars']} bars x {len(ROLL_COLUMNS)} cols (w={res['window']}): "
+          f"apply={res['frame_apply_ms']:.1f}ms window={res['frame_window_ms']:.1f}ms "
+          f"rank={res['frame_rank_ms']:.1f}ms quantile={res['frame_quantile_ms']:.1f}ms")
+    print(f"panel {res['panel_cells']:,} cells: window={res['panel_window_ms']:.0f}ms rank={res['panel_rank_ms']:.0f}ms "
+          f"match={res['match']}")
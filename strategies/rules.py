@@ -0,0 +1,213 @@
+import os
+import json
+import pandas as pd
+import numpy as np
+import database as db
+from .timeframes import split_timeframe_column, timeframe_column
+from .vwap import is_vwap_column, vwap_column
+from .rolling import ROLL_WINDOW, split_rolling_column, rolling_column, rolling_rank, rolling_quantile
+from .relative import split_relative_column, relative_column
+
+# -----------------------------------------------------------------------------
+# [신규] 선언형 전략 조건 → 벡터화 평가기 컴파일
+# - 조건/수식을 JSON 호환 구조로 적고, 한 번 컴파일하면 (평가함수, 필요 과거봉 수) 가 나옴
+# - 평가함수는 단일 종목 DataFrame / PricePanel 모두 전 구간을 한 번에 계산 (파이썬 봉 루프 없음)
+#   → 스캔(마지막 봉) / 백테스트(전 구간) / 차트 마커가 같은 컴파일 결과를 공유
+#
+# 수식 (expr)
+#   10, 1.5                     상수
+#   "Close", "RSI"              지표 컬럼 (calculate_indicators 결과)
+#   "Close[1]"                  n 봉 전 값
+#   "W_MA20", "M_RSI"           주봉 / 월봉 지표 (그 날까지 끝난 주/월 기준, timeframes.py)
+#   "AVWAP_low52w", "AVWAP_gap" 앵커 VWAP (vwap.py)
+#   "PRANK_Bandwidth", "Q5_ATRP" 최근 252봉 백분위 순위 / 분위수 (rolling.py, "PRANK_W_RSI" 처럼 파생 컬럼도 가능)
+#   "RS_KOSPI", "RS_MKT"        지수 대비 상대강도선 (relative.py)
+#   "XRANK_6M"                  저장 종목 전체 중 3/6/12개월(3M/6M/12M) 수익률 백분위 순위 (relative.py)
+#   "$vol_mult"                 전략 파라미터 (with_params 로 바꿀 수 있음)
+#   {"add"|"sub"|"mul"|"div": [a, b, ...]}
+#   {"mean"|"max"|"min"|"sum"|"std": expr, "window": 20}    이동 통계
+#   {"shift": expr, "n": 1}
+#   {"prank": expr, "window": 252}                           이동 백분위 순위 (0~100)
+#   {"quantile": expr, "q": 0.05, "window": 252}            이동 분위수
+#
+# 조건 (cond)
+#   [">", a, b]  (>, >=, <, <=, ==, !=)      비교
+#   ["between", x, lo, hi]                    lo <= x <= hi
+#   ["cross_above", a, b] / ["cross_below", a, b]   직전 봉 대비 돌파
+#   {"all": [...]} / {"any": [...]} / {"not": cond}
+#   {"within": n, "cond": cond}               최근 n 봉 중 한 번이라도
+#   {"for": n, "cond": cond}                  최근 n 봉 연속
+# -----------------------------------------------------------------------------
+RULES_FILE = os.path.join(db.DB_DIR, "strategies.json")
+
+_CMP = {
+    '>': lambda a, b: a > b, '>=': lambda a, b: a >= b,
+    '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+    '==': lambda a, b: a == b, '!=': lambda a, b: a != b,
+}
+_ARITH = {
+    'add': lambda a, b: a + b, 'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b, 'div': lambda a, b: a / b,
+}
+_ROLL = ('mean', 'max', 'min', 'sum', 'std')
+
+def _like(df, value):
+    """스칼라를 df 와 같은 모양(Series / 패널 DataFrame)으로 확장"""
+    base = df['Close']
+    if isinstance(base, pd.Series): return pd.Series(value, index=base.index)
+    return pd.DataFrame(value, index=base.index, columns=base.columns)
+
+def compile_expr(spec):
+    """수식 → (fn(df, params), lookback)"""
+    if isinstance(spec, bool):
+        raise ValueError(f"수식 자리에 논리값은 쓸 수 없습니다: {spec}")
+    if isinstance(spec, (int, float)):
+        return (lambda df, p: spec), 0
+    if isinstance(spec, str):
+        if spec.startswith('$'):
+            key = spec[1:]
+            return (lambda df, p: p[key]), 0
+        col, n = spec, 0
+        if spec.endswith(']') and '[' in spec:
+            col, n = spec[:-1].split('[', 1)
+            n = int(n)
+        getter = _derived_getter(col)
+        if getter:
+            if n: return (lambda df, p: getter(df, col).shift(n)), n
+            return (lambda df, p: getter(df, col)), 0
+        if n: return (lambda df, p: df[col].shift(n)), n
+        return (lambda df, p: df[col]), 0
+    if isinstance(spec, dict):
+        for op, fn in _ARITH.items():
+            if op in spec:
+                parts = [compile_expr(s) for s in spec[op]]
+                if len(parts) < 2: raise ValueError(f"'{op}' 에는 피연산자가 2개 이상 필요합니다")
+                def run(df, p, parts=parts, fn=fn):
+                    val = parts[0][0](df, p)
+                    for f, _ in parts[1:]: val = fn(val, f(df, p))
+                    return val
+                return run, max(lb for _, lb in parts)
+        for op in _ROLL:
+            if op in spec:
+                inner, lb = compile_expr(spec[op])
+                w = int(spec['window'])
+                return (lambda df, p: getattr(_series(inner(df, p), df).rolling(w), op)()), lb + w - 1
+        if 'prank' in spec or 'quantile' in spec:
+            is_rank = 'prank' in spec
+            inner, lb = compile_expr(spec['prank' if is_rank else 'quantile'])
+            w, q = int(spec.get('window', ROLL_WINDOW)), float(spec.get('q', 0.5))
+            def run(df, p, inner=inner, w=w, q=q):
+                val = _series(inner(df, p), df)
+                return rolling_rank(val, w) if is_rank else rolling_quantile(val, q, w)
+            return run, lb + w - 1
+        if 'shift' in spec:
+            inner, lb = compile_expr(spec['shift'])
+            n = int(spec.get('n', 1))
+            return (lambda df, p: _series(inner(df, p), df).shift(n)), lb + n
+    raise ValueError(f"알 수 없는 수식: {spec!r}")
+
+def _derived_getter(col):
+    """calculate_indicators 밖에서 필요할 때 만드는 컬럼 (주봉/월봉, 앵커 VWAP, 이동 순위/분위수, 상대강도)의 계산 함수"""
+    if split_timeframe_column(col): return timeframe_column
+    if is_vwap_column(col): return vwap_column
+    if split_rolling_column(col): return _rolling_getter
+    if split_relative_column(col): return relative_column
+    return None
+
+def _rolling_getter(df, col):
+    base = split_rolling_column(col)[3]
+    if base not in df and _derived_getter(base): derived_column(df, base) # 예: PRANK_W_RSI
+    return rolling_column(df, col)
+
+def derived_column(df, col):
+    return _derived_getter(col)(df, col)
+
+def _series(val, df):
+    return val if isinstance(val, (pd.Series, pd.DataFrame)) else _like(df, val)
+
+def compile_condition(spec):
+    """조건 → (fn(df, params) → bool Series/DataFrame, lookback)"""
+    if isinstance(spec, list) and spec:
+        op, args = spec[0], spec[1:]
+        if op in _CMP and len(args) == 2:
+            (a, la), (b, lb) = compile_expr(args[0]), compile_expr(args[1])
+            cmp = _CMP[op]
+            return (lambda df, p: _series(cmp(a(df, p), b(df, p)), df)), max(la, lb)
+        if op == 'between' and len(args) == 3:
+            (x, lx), (lo, llo), (hi, lhi) = (compile_expr(s) for s in args)
+            def run(df, p):
+                v = x(df, p)
+                return _series((v >= lo(df, p)) & (v <= hi(df, p)), df)
+            return run, max(lx, llo, lhi)
+        if op in ('cross_above', 'cross_below') and len(args) == 2:
+            (a, la), (b, lb) = compile_expr(args[0]), compile_expr(args[1])
+            above = op == 'cross_above'
+            def run(df, p):
+                diff = _series(a(df, p), df) - _series(b(df, p), df)
+                prev = diff.shift(1)
+                return (diff > 0) & (prev <= 0) if above else (diff < 0) & (prev >= 0)
+            return run, max(la, lb) + 1
+    if isinstance(spec, dict):
+        if 'all' in spec or 'any' in spec:
+            is_all = 'all' in spec
+            parts = [compile_condition(s) for s in spec['all' if is_all else 'any']]
+            if not parts: raise ValueError("빈 all/any 조건")
+            def run(df, p):
+                val = parts[0][0](df, p)
+                for f, _ in parts[1:]: val = (val & f(df, p)) if is_all else (val | f(df, p))
+                return val
+            return run, max(lb for _, lb in parts)
+        if 'not' in spec:
+            inner, lb = compile_condition(spec['not'])
+            return (lambda df, p: ~inner(df, p)), lb
+        if 'within' in spec or 'for' in spec:
+            is_any = 'within' in spec
+            n = int(spec['within' if is_any else 'for'])
+            inner, lb = compile_condition(spec['cond'])
+            def run(df, p):
+                hits = inner(df, p).astype(float).rolling(n, min_periods=1).sum()
+                return hits > 0 if is_any else hits >= n
+            return run, lb + n - 1
+    raise ValueError(f"알 수 없는 조건: {spec!r}")
+
+def derived_refs(spec):
+    """정의 안에서 쓰인 파생 컬럼명 집합 (주봉/월봉, 앵커 VWAP, 이동 순위/분위수, 상대강도)"""
+    if isinstance(spec, str):
+        col = spec.split('[', 1)[0]
+        return {col} if _derived_getter(col) else set()
+    if isinstance(spec, dict): return set().union(*map(derived_refs, spec.values())) if spec else set()
+    if isinstance(spec, list): return set().union(*map(derived_refs, spec)) if spec else set()
+    return set()
+
+def validate_definition(defn):
+    """필수 항목 확인 + 조건/수식을 미리 컴파일해 오류를 일찍 드러냄"""
+    for key in ('name', 'entry'):
+        if key not in defn: raise ValueError(f"전략 정의에 '{key}' 항목이 없습니다")
+    # [수정] 백테스트 전용 조건은 받지 않음 (스캔과 백테스트 / 차트 마커가 같은 entry 조건을 써야 함)
+    if 'backtest' in defn: raise ValueError("'backtest' 항목은 지원하지 않습니다 - 'entry' 조건 하나로 스캔 / 백테스트를 모두 처리합니다")
+    compile_condition(defn['entry'])
+    for key in ('score', 'stop', 'target'):
+        if key in defn: compile_expr(defn[key])
+    for b in defn.get('bonus', []):
+        compile_condition(b['when']); compile_expr(b['add'])
+    return defn
+
+# 설정 파일에서 읽지 못한 정의 (전략 이름 → 오류 메시지)
+RULE_ERRORS = {}
+
+def load_rule_definitions(path=RULES_FILE):
+    """JSON 파일 (정의 리스트 또는 {"strategies": [...]}) 에서 유효한 전략 정의만 반환"""
+    RULE_ERRORS.clear()
+    if not os.path.exists(path): return []
+    try:
+        with open(path, encoding='utf-8') as f: data = json.load(f)
+    except (OSError, ValueError) as e:
+        RULE_ERRORS[path] = str(e)
+        return []
+    if isinstance(data, dict): data = data.get('strategies', [])
+    out = []
+    for i, defn in enumerate(data):
+        try: out.append(validate_definition(defn))
+        except (ValueError, KeyError, TypeError) as e:
+            RULE_ERRORS[defn.get('name', f"#{i}") if isinstance(defn, dict) else f"#{i}"] = str(e)
+    return out
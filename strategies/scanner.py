@@ -2,10 +2,17 @@ import pandas as pd
 import numpy as np
 from .common import fetch_data, format_price
 from .library import ACTIVE_STRATEGIES
+from .bootstrap import signal_returns, bootstrap_groups
+from .ranking import get_score_ranker
+from .vwap import add_vwap_columns
 
 # [수정] exclude_penny 파라미터 삭제
-def analyze_single_stock(code, name_raw, market_raw):
+# [수정] strategies: 검사할 전략만 지정 (스캐너 전략 필터 - 선택하지 않은 전략은 계산하지 않음, None 이면 전체)
+# [수정] ranker: 전략별 점수 분포 백분위로 정렬 (스캔 시작 시 만든 ScoreRanker 공유, None 이면 새로 생성)
+def analyze_single_stock(code, name_raw, market_raw, strategies=None, ranker=None):
     try:
+        strategies = strategies or ACTIVE_STRATEGIES
+        ranker = ranker or get_score_ranker()
         df = fetch_data(code)
         if df is None: return None
         curr = df.iloc[-1]
@@ -14,28 +21,31 @@ def analyze_single_stock(code, name_raw, market_raw):
         
         scored_strategies = []
         
-        for strat in ACTIVE_STRATEGIES:
-            score = strat.check_signal(df)
+        for strat in strategies:
+            score = strat.cached_check(df)
             if score > 0:
-                scored_strategies.append((strat.name, score))
+                scored_strategies.append((strat.name, score, ranker.normalize(strat.name, score)))
         
         if not scored_strategies: return None
         
-        scored_strategies.sort(key=lambda x: x[1], reverse=True)
+        # [수정] 원점수는 전략마다 척도가 달라 백분위로 비교
+        scored_strategies.sort(key=lambda x: x[2], reverse=True)
         strategies_list = [s[0] for s in scored_strategies]
         top_strategy_name = strategies_list[0]
         
-        top_strat_obj = next((s for s in ACTIVE_STRATEGIES if s.name == top_strategy_name), None)
-        past_win_rate = "N/A"
+        top_strat_obj = next((s for s in strategies if s.name == top_strategy_name), None)
+        past_win_rate = "N/A"; win_rate_ci = "-"
         if top_strat_obj:
             win_rate_str = calc_win_rate(df, top_strat_obj)
             past_win_rate = f"{top_strategy_name}: {win_rate_str}"
+            win_rate_ci = calc_win_rate_ci(df, top_strat_obj)
             
         item = {
             "종목명": name_raw, "코드": code, "시장": market_raw,
             "현재가_RAW": curr['Close'], "현재가": format_price(curr['Close'], market_raw, code),
             "발견된_전략": " > ".join(strategies_list), "전략_리스트": strategies_list,
-            "과거승률": past_win_rate,
+            "과거승률": past_win_rate, "승률_CI": win_rate_ci,
+            "랭크점수": round(scored_strategies[0][2], 1),
             "RSI": round(curr['RSI'], 0), "Bandwidth": round(curr['Bandwidth'], 3),
             "Disparity25": round(curr['Disparity25'], 1), "MA20": curr['MA20'], "MA5": curr['MA5'],
             "ATR": curr.get('ATR', curr['Close']*0.01), "High20": curr['High20'],
@@ -61,19 +71,25 @@ def analyze_single_stock(code, name_raw, market_raw):
 
 def calc_win_rate(df, strategy_obj):
     try:
-        cond = strategy_obj.backtest(df)
-        signal_indices = np.where(cond.iloc[:-5])[0]
-        total = len(signal_indices)
+        rets = signal_returns(df, strategy_obj)
+        total = len(rets)
         if total == 0: return "0% (0/0)"
-        
-        entry_prices = df['Close'].iloc[signal_indices].values
-        future_prices = df['Close'].iloc[signal_indices + 5].values
-        wins = np.sum(future_prices > entry_prices)
+        wins = int(np.sum(rets > 0))
         return f"{(wins/total)*100:.0f}% ({wins}/{total})"
     except: return "Err"
 
+# [신규] 과거승률 옆에 표시할 부트스트랩 95% 신뢰구간 (표본이 적을수록 넓게 나옴)
+def calc_win_rate_ci(df, strategy_obj):
+    try:
+        rets = signal_returns(df, strategy_obj)
+        if len(rets) == 0: return "-"
+        ci = bootstrap_groups(rets, n_boot=1000).iloc[0]
+        return f"{ci['win_lo']:.0f}~{ci['win_hi']:.0f}% (기대 {ci['exp_lo']:+.1f}~{ci['exp_hi']:+.1f}%)"
+    except: return "Err"
+
 # (나머지 deep_dive 함수 등은 수정 없음, 그대로 둠)
-def analyze_strategy_deep_dive(df, capital_krw, usd_rate, strategy_full_name, ticker_code):
+# [수정] vwap_anchors: 차트에 추가로 그릴 앵커 VWAP (사용자 지정일 등), 전략이 선언한 앵커와 함께 AVWAP_ 컬럼으로
+def analyze_strategy_deep_dive(df, capital_krw, usd_rate, strategy_full_name, ticker_code, vwap_anchors=()):
     try:
         short_name = strategy_full_name.split(' ')[0] + strategy_full_name.split(' ')[1]
         target_strat = next((s for s in ACTIVE_STRATEGIES if s.name.replace(" ", "") == short_name.replace(" ", "")), None)
@@ -95,7 +111,8 @@ def analyze_strategy_deep_dive(df, capital_krw, usd_rate, strategy_full_name, ti
         if risk_per_share > 0: shares = int(allowable_risk / risk_per_share)
         if shares * curr_price > applied_capital: shares = int(applied_capital / curr_price)
         
-        final_df = res.get('df', df)
+        final_df = res.get('df', df).copy() # 전략마다 앵커가 달라 원본 프레임에 컬럼을 붙이지 않음
+        add_vwap_columns(final_df, list(target_strat.vwap_anchors) + list(vwap_anchors))
         
         res.update({
             "shares": shares, "total_loss": shares * risk_per_share, "allowable_risk": allowable_risk,
@@ -0,0 +1,84 @@
+import time
+import threading
+import numpy as np
+import database as db
+from .library import ACTIVE_STRATEGIES
+from .panel import load_panel
+from .backtest import _entries_2d, _as_2d, MIN_BARS
+
+# -----------------------------------------------------------------------------
+# [신규] 전략 신호 테이블 (strategy_signals) 증분 적재
+# - (전략, 종목, 날짜)별 진입 신호(backtest) / 스캐너 점수(score) 를 포착된 봉만 저장
+# - (전략, 종목)별 계산 완료일 + 파라미터 서명(signal_progress) 기준으로
+#   새 봉이 생긴 종목만 다시 계산하고, 완료일 이후 봉만 추가 (서명이 바뀌면 그 조합만 전부 재적재)
+# - [수정] 계산 당시 첫 봉 날짜 / 봉 수도 기록 → 과거 봉이 보충(backfill)되면 마지막 봉이 그대로여도
+#   그 조합을 처음부터 다시 적재 (뒤에 봉만 붙은 경우만 이어서 추가)
+# - 지표는 전 이력으로 계산 (백테스트 / 이벤트 스터디의 전 종목 패널과 같은 값)
+# - 차트 마커 · 승률 · 백테스트 · 재생은 테이블이 해당 구간을 덮고 있으면 여기서 읽음 (signals.py)
+# -----------------------------------------------------------------------------
+_store_lock = threading.Lock()
+
+def materialize_signals(codes=None, strategies=None, chunk_size=500, progress_cb=None):
+    """새로 저장된 봉의 신호를 적재. {'rows', 'codes', 'skipped', 'elapsed'} 반환 (다른 적재가 진행 중이면 None)"""
+    if not _store_lock.acquire(blocking=False): return None
+    try:
+        t0 = time.perf_counter()
+        strategies = strategies or ACTIVE_STRATEGIES
+        fps = db.get_price_fingerprints() # {code: (첫 봉, 마지막 봉, 봉 수)}
+        codes = [str(c) for c in (codes if codes is not None else fps) if str(c) in fps]
+        progress = db.get_signal_progress()
+        sigs = {s.name: s.signature() for s in strategies}
+
+        # (전략, 종목)별 적재 시작일: 서명 · 첫 봉이 같고 뒤에 봉만 붙었으면 완료일 다음 날,
+        # 서명 / 첫 봉 / 봉 수가 바뀌었으면 처음부터 (None), 그대로면 제외
+        todo = {}
+        for c in codes:
+            first, last, count = fps[c]
+            for s in strategies:
+                p = progress.get((s.name, c))
+                if p and p[0] == sigs[s.name] and p[2] == first:
+                    if p[1] == last and p[3] == count: continue
+                    todo[(s.name, c)] = p[1] if p[1] < last else None
+                else: todo[(s.name, c)] = None
+        pending = sorted({c for _, c in todo})
+
+        rows = 0
+        for i in range(0, len(pending), chunk_size):
+            chunk = pending[i:i + chunk_size]
+            panel = load_panel(chunk, None, min_bars=MIN_BARS)
+            if panel is not None: rows += _store_panel(panel, strategies, sigs, todo, fps, progress)
+            if progress_cb: progress_cb(min(i + chunk_size, len(pending)), len(pending))
+
+        return {"rows": rows, "codes": len(pending), "skipped": len(codes) - len(pending),
+                "elapsed": time.perf_counter() - t0}
+    finally:
+        _store_lock.release()
+
+def _store_panel(panel, strategies, sigs, todo, fps, progress):
+    date_str = np.datetime_as_string(panel.dates, unit='D')
+    code_arr = np.array(panel.codes, dtype=object)
+    valid = ~np.isnat(panel.dates)
+    rows, prog, reset = [], [], []
+    for strat in strategies:
+        # 이어서 추가할 조합도 완료일까지의 봉 수가 기록과 다르면 (중간 구간 보충) 처음부터
+        for j, c in enumerate(panel.codes):
+            start = todo.get((strat.name, c))
+            if start and int((valid[:, j] & (date_str[:, j] <= start)).sum()) != progress[(strat.name, c)][3]:
+                todo[(strat.name, c)] = None
+        # 적재 대상이 아닌 종목은 하한을 무한대로 (패널에는 있지만 이미 최신)
+        lo = np.array([todo.get((strat.name, c), '9999-12-31') or '' for c in panel.codes], dtype=object)
+        if (lo == '9999-12-31').all(): continue
+        entry = _entries_2d(strat, panel, use_store=False)
+        score = _as_2d(strat.score(panel))
+        t, j = np.nonzero((entry | (score > 0)) & valid & (date_str > lo[None, :].astype(str)))
+        rows.extend(zip([strat.name] * len(t), code_arr[j], date_str[t, j],
+                        entry[t, j].astype(int).tolist(), score[t, j].astype(float).tolist()))
+        for c, start in zip(panel.codes, lo):
+            if start == '9999-12-31': continue
+            first, last, count = fps[c]
+            prog.append((strat.name, c, sigs[strat.name], last, first, count))
+            if start == '': reset.append((strat.name, c))
+    return db.save_signals(rows, prog, reset)
+
+def materialize_signals_async():
+    threading.Thread(target=materialize_signals, daemon=True).start()
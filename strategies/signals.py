@@ -0,0 +1,119 @@
+import time
+import threading
+from collections import OrderedDict
+import pandas as pd
+import numpy as np
+import database as db
+
+# -----------------------------------------------------------------------------
+# [신규] 종목별 전략 신호 메모 (스캔 / 승률 / 정밀분석 공용)
+# - 같은 프레임에 대해 check_signal(마지막 봉) / backtest(전 구간 진입) / score(전 구간 점수)를
+#   전략 · 파라미터 · 종목 · 주가 데이터 버전 단위로 한 번만 계산
+# - fetch_data 가 붙여 둔 df.attrs (code, data_version) 로 키를 만들고,
+#   출처를 모르는 프레임은 종가 합계 등 내용 지문으로 대신함
+# - 최근 사용 순 SIGNAL_CACHE_SIZE 개만 유지 (스캔 중 메모리 보호)
+# - [신규] 신호 테이블(strategy_signals)이 해당 구간을 덮고 있으면 계산 대신 테이블에서 읽음
+# -----------------------------------------------------------------------------
+SIGNAL_CACHE_SIZE = 2048
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+_stats = {'hit': 0, 'miss': 0, 'compute_sec': 0.0, 'saved_sec': 0.0}
+
+def frame_key(df):
+    a = df.attrs
+    if len(df) == 0: return (None, None, 0)
+    if 'code' in a and 'data_version' in a:
+        return (a['code'], a['data_version'], len(df), df.index[0], df.index[-1])
+    close = df['Close'].to_numpy(dtype=float)
+    return (None, None, len(df), df.index[0], df.index[-1], float(np.nansum(close)), float(close[-1]))
+
+def cached(strategy, df, kind, compute):
+    """kind 별 결과를 메모에서 꺼내거나 compute(df) 로 계산해 저장"""
+    key = (strategy.name, tuple(sorted(strategy.params.items())), frame_key(df), kind)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            val, cost = _memo[key]
+            _stats['hit'] += 1; _stats['saved_sec'] += cost
+            return val
+
+    t0 = time.perf_counter()
+    val = compute(df)
+    cost = time.perf_counter() - t0
+    with _memo_lock:
+        _memo[key] = (val, cost)
+        _stats['miss'] += 1; _stats['compute_sec'] += cost
+        while len(_memo) > SIGNAL_CACHE_SIZE: _memo.popitem(last=False)
+    return val
+
+def get_signal_cache_stats():
+    with _memo_lock:
+        stats = dict(_stats)
+        stats['entries'] = len(_memo)
+    total = stats['hit'] + stats['miss']
+    stats['total'] = total
+    stats['hit_rate'] = (stats['hit'] / total * 100) if total else 0.0
+    return stats
+
+def clear_signal_cache():
+    with _memo_lock:
+        _memo.clear()
+        _stats.update({'hit': 0, 'miss': 0, 'compute_sec': 0.0, 'saved_sec': 0.0})
+
+# -----------------------------------------------------------------------------
+# [신규] 신호 테이블 읽기 - 파라미터 서명이 같고 계산 구간(첫 봉 ~ 완료일)이 데이터 구간을 덮을 때만 사용 (아니면 None)
+# [수정] 구간 시작도 확인 (과거 봉이 보충됐는데 아직 다시 적재 전이면 그 앞 구간 신호가 없음)
+# -----------------------------------------------------------------------------
+_DAY_KEY = 1 << 20 # 종목 위치 × _DAY_KEY + 1970년 이후 일수
+
+def _covered(strategy, codes, first_dates, last_dates):
+    sig = strategy.signature()
+    prog = db.get_signal_progress(strategy.name, codes)
+    for code, first, last in zip(codes, first_dates, last_dates):
+        p = prog.get((strategy.name, str(code)))
+        if not p or p[0] != sig or p[1] < last or not p[2] or p[2] > first: return False
+    return True
+
+def stored_series(strategy, df, kind='entry'):
+    """fetch_data 프레임 한 종목의 진입 신호(bool) 또는 점수(float) 시리즈"""
+    code = df.attrs.get('code')
+    if not code or len(df) == 0: return None
+    first, last = (d.strftime('%Y-%m-%d') for d in (df.index[0], df.index[-1]))
+    if not _covered(strategy, [code], [first], [last]): return None
+    rows = db.load_signals(strategy.name, start_date=first, end_date=last, codes=[code])
+    bar_days = df.index.values.astype('datetime64[D]')
+    row_days = rows['date'].to_numpy().astype('datetime64[D]')
+    pos = np.minimum(np.searchsorted(bar_days, row_days), len(df) - 1)
+    ok = bar_days[pos] == row_days
+    val = rows['entry'].to_numpy() == 1 if kind == 'entry' else rows['score'].to_numpy(dtype=float)
+    out = np.zeros(len(df), dtype=bool if kind == 'entry' else float)
+    out[pos[ok]] = val[ok]
+    return pd.Series(out, index=df.index)
+
+def stored_signal_matrix(strategy, panel, kind='entry'):
+    """PricePanel 전 종목의 (봉 × 종목) 진입 신호 또는 점수 배열"""
+    dates = panel.dates
+    n_bars, n_codes = dates.shape
+    if n_codes == 0: return None
+    last = np.datetime_as_string(dates[-1], unit='D') # 오른쪽 정렬 → 마지막 행이 종목별 마지막 봉
+    counts = panel.bar_counts()
+    firsts = np.datetime_as_string(dates[np.minimum(n_bars - counts, n_bars - 1), np.arange(n_codes)], unit='D')
+    if not _covered(strategy, panel.codes, firsts, last): return None
+
+    first = min(f for f, n in zip(firsts, counts) if n > 0)
+    rows = db.load_signals(strategy.name, start_date=first, codes=panel.codes)
+    out = np.zeros(dates.shape, dtype=bool if kind == 'entry' else float)
+    if rows.empty: return out
+
+    # 열 우선으로 펼치면 (종목, 날짜) 키가 오름차순 → searchsorted 한 번으로 (봉, 종목) 위치 찾기
+    days = np.where(np.isnat(dates), -1, dates.astype('datetime64[D]').astype(np.int64))
+    cell_key = (np.arange(n_codes)[None, :] * _DAY_KEY + days).ravel(order='F')
+    col = pd.Series(np.arange(n_codes), index=[str(c) for c in panel.codes])
+    key = col.reindex(rows['code'].astype(str)).to_numpy() * _DAY_KEY + \
+          rows['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    p = np.minimum(np.searchsorted(cell_key, key), len(cell_key) - 1)
+    ok = cell_key[p] == key
+    val = rows['entry'].to_numpy() == 1 if kind == 'entry' else rows['score'].to_numpy(dtype=float)
+    out[p[ok] % n_bars, p[ok] // n_bars] = val[ok]
+    return out
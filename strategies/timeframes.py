@@ -0,0 +1,162 @@
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import database as db
+from .common import calculate_indicators
+from .panel import PricePanel
+
+# -----------------------------------------------------------------------------
+# [신규] 주봉 / 월봉 지표 레이어 (일봉에서 재구성, 추가 다운로드 없음)
+# - 'W_MA20', 'M_RSI' 처럼 접두어(W_ 주봉 / M_ 월봉) + calculate_indicators 컬럼명
+# - 주봉은 금요일 마감, 월봉은 말일 마감. 일봉 위치에는 "그 날까지 끝난 마지막 기간" 값을 붙임
+#   (진행 중인 주/월은 쓰지 않음 → 백테스트와 실시간 스캔이 같은 값, 미래 참조 없음)
+# - fetch_data 프레임 (attrs 에 code / data_version): stock_prices 전 이력으로 만든 종목별 기간봉을
+#   데이터 버전 단위로 캐시. 새 일봉이 들어오면 마지막 기간부터만 다시 읽어 이어 붙임
+#   (그 앞 구간에 과거 봉이 보충되면 전부 다시 만듦)
+# - PricePanel / 출처를 모르는 프레임: 가진 일봉으로 전 종목을 한 번에 재구성 (종목 루프 없음)
+# -----------------------------------------------------------------------------
+TIMEFRAMES = ('W', 'M')
+TF_CACHE_SIZE = 1024
+_OHLCV = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+_memo = OrderedDict() # (code, tf) → {'version', 'bars', 'ind', 'tail_start', 'head_rows'}
+_memo_lock = threading.Lock()
+_panel_memo = weakref.WeakKeyDictionary() # PricePanel → {tf: (기간봉 지표 패널, 참조 행)}
+
+def split_timeframe_column(name):
+    """'W_MA20' → ('W', 'MA20'), 주봉/월봉 컬럼이 아니면 None"""
+    tf, _, col = str(name).partition('_')
+    return (tf, col) if tf in TIMEFRAMES and col else None
+
+def _period_end_days(days, tf):
+    """1970-01-01 이후 일수 → 그 날이 속한 기간의 마지막 달력일 (주: 금요일, 월: 말일)"""
+    if tf == 'W': return days + (4 - (days + 3) % 7) % 7 # 1970-01-01 은 목요일
+    month = days.astype('datetime64[D]').astype('datetime64[M]')
+    return ((month + 1).astype('datetime64[D]') - 1).astype(np.int64)
+
+def _group(dates, tf):
+    """(봉 × 종목) 날짜 → 열 우선으로 펼친 실제 봉 위치와 기간 묶음"""
+    j, t = np.nonzero(~np.isnat(dates).T) # 종목별 날짜 오름차순
+    days = dates[t, j].astype('datetime64[D]').astype(np.int64)
+    end = _period_end_days(days, tf)
+    new = np.ones(len(t), dtype=bool)
+    new[1:] = (j[1:] != j[:-1]) | (end[1:] != end[:-1])
+    starts = np.nonzero(new)[0]
+    ends = np.r_[starts[1:], len(t)] - 1
+    return t, j, days, end, starts, ends, np.cumsum(new) - 1
+
+def _aggregate(values, starts, ends):
+    """필드별 펼친 일봉 값 → 기간봉 OHLCV"""
+    return {
+        'Open': values['Open'][starts], 'Close': values['Close'][ends],
+        'High': np.fmax.reduceat(values['High'], starts), 'Low': np.fmin.reduceat(values['Low'], starts),
+        'Volume': np.add.reduceat(np.nan_to_num(values['Volume']), starts),
+    }
+
+def _frame_periods(daily, tf):
+    """한 종목 일봉 DataFrame → 기간봉 DataFrame (index = 기간 마지막 달력일, Start / Bars 포함)"""
+    dates = daily.index.values.astype('datetime64[ns]')[:, None]
+    t, _, days, end, starts, ends, _ = _group(dates, tf)
+    values = {f: daily[f].to_numpy(dtype=float)[t] for f in _OHLCV}
+    bars = pd.DataFrame(_aggregate(values, starts, ends),
+                        index=pd.DatetimeIndex(end[starts].astype('datetime64[D]'), name='Date'))
+    bars['Start'] = np.datetime_as_string(days[starts].astype('datetime64[D]'), unit='D')
+    bars['Bars'] = ends - starts + 1
+    return bars
+
+def _code_periods(code, tf, version):
+    """종목 기간봉 지표 (데이터 버전 단위 캐시, 새 일봉은 마지막 기간부터 증분 반영)"""
+    key = (code, tf)
+    with _memo_lock:
+        ent = _memo.get(key)
+        if ent and ent['version'] == version:
+            _memo.move_to_end(key)
+            return ent['ind']
+
+    bars, ind = None, None
+    if ent and db.count_daily_price(code, ent['tail_start']) == ent['head_rows']:
+        tail = db.load_daily_price(code, start_date=ent['tail_start'])
+        if tail is not None:
+            tail = _frame_periods(tail, tf)
+            # 다른 종목의 새 봉으로 버전만 바뀐 경우: 기간봉이 그대로면 지표도 재사용
+            if tail.equals(ent['bars'].iloc[-1:]): bars, ind = ent['bars'], ent['ind']
+            else: bars = pd.concat([ent['bars'].iloc[:-1], tail])
+    if bars is None:
+        daily = db.load_daily_price(code)
+        if daily is None: return None
+        bars = _frame_periods(daily, tf)
+
+    if ind is None: ind = calculate_indicators(bars[list(_OHLCV)].copy())
+    with _memo_lock:
+        _memo[key] = {'version': version, 'bars': bars, 'ind': ind,
+                      'tail_start': bars['Start'].iloc[-1], 'head_rows': int(bars['Bars'].iloc[:-1].sum())}
+        _memo.move_to_end(key)
+        while len(_memo) > TF_CACHE_SIZE: _memo.popitem(last=False)
+    return ind
+
+def _array_periods(dates, fields, codes, tf):
+    """(봉 × 종목) 일봉 → (기간봉 지표 PricePanel, 일봉 칸별 참조 행 (없으면 -1))"""
+    n_bars, n_codes = dates.shape
+    t, j, days, end, starts, ends, g = _group(dates, tf)
+    if len(t) == 0: return None, np.full(dates.shape, -1)
+    values = {f: np.asarray(fields[f].to_numpy(dtype=float))[t, j] for f in _OHLCV}
+    agg = _aggregate(values, starts, ends)
+
+    # 기간봉도 종목별 우측 정렬 (PricePanel 과 같은 배치 → calculate_indicators 를 그대로 적용)
+    gj = j[starts]
+    counts = np.bincount(gj, minlength=n_codes)
+    k = np.arange(len(starts)) - np.r_[0, np.cumsum(counts)[:-1]][gj]
+    n_rows = int(counts.max())
+    rows = n_rows - counts[gj] + k
+    period_dates = np.full((n_rows, n_codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+    period_dates[rows, gj] = end[starts].astype('datetime64[D]')
+    period_fields = {}
+    for f in _OHLCV:
+        arr = np.full((n_rows, n_codes), np.nan)
+        arr[rows, gj] = agg[f]
+        period_fields[f] = pd.DataFrame(arr, columns=codes)
+    periods = calculate_indicators(PricePanel(period_fields, period_dates, codes))
+
+    # 기간 마지막 날이면 자기 기간, 아니면 직전 기간 (같은 종목에 없으면 -1)
+    closed = end == days
+    ref = np.full(dates.shape, -1)
+    ref[t, j] = np.where(closed, rows[g], np.where(k[g] > 0, rows[g] - 1, -1))
+    return periods, ref
+
+def timeframe_column(df, name):
+    """주봉/월봉 지표를 일봉 위치에 맞춰 반환 (df[name] 에도 저장해 같은 프레임의 다음 조회는 바로 반환)"""
+    if name in df: return df[name]
+    parsed = split_timeframe_column(name)
+    if parsed is None: raise KeyError(name)
+    tf, col = parsed
+
+    if isinstance(df, PricePanel):
+        cache = _panel_memo.setdefault(df, {})
+        if tf not in cache: cache[tf] = _array_periods(df.dates, df.fields, df.codes, tf)
+        periods, ref = cache[tf]
+        out = np.full(df.shape, np.nan)
+        if periods is not None:
+            vals = periods[col].to_numpy(dtype=float)
+            ok = ref >= 0
+            out[ok] = vals[ref[ok], np.nonzero(ok)[1]]
+        df[name] = pd.DataFrame(out, index=df.index, columns=df.codes)
+        return df[name]
+
+    code, version = df.attrs.get('code'), df.attrs.get('data_version')
+    ind = _code_periods(code, tf, version) if code and version is not None else None
+    if ind is not None:
+        # 그 날까지 끝난 마지막 기간 (기간 마지막 달력일 <= 일봉 날짜)
+        pos = np.searchsorted(ind.index.values, df.index.values, side='right') - 1
+        vals = ind[col].to_numpy(dtype=float)
+        out = np.where(pos >= 0, vals[np.maximum(pos, 0)], np.nan)
+    else:
+        dates = df.index.values.astype('datetime64[ns]')[:, None]
+        periods, ref = _array_periods(dates, {f: df[[f]] for f in _OHLCV}, ['_'], tf)
+        out = np.full(len(df), np.nan)
+        if periods is not None:
+            vals = periods[col].to_numpy(dtype=float)[:, 0]
+            out[ref[:, 0] >= 0] = vals[ref[ref[:, 0] >= 0, 0]]
+    df[name] = out
+    return df[name]
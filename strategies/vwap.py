@@ -0,0 +1,173 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import yfinance as yf
+import database as db
+from .common import get_yahoo_session
+from .panel import PricePanel
+
+# -----------------------------------------------------------------------------
+# [신규] 앵커 VWAP (기준봉부터의 누적 TP×거래량 / 누적 거래량)
+# - calculate_indicators 의 VWAP 는 최근 SCAN_HISTORY_DAYS 구간 기준 (구간 시작이 봉마다 밀림)
+#   앵커 VWAP 는 기준봉이 정해져 있어 구간 밖의 기준도 쓸 수 있음
+# - TP×Vol / Vol 누적합(CumTPV / CumVol)을 프레임 · 패널에 한 번만 만들어 두고
+#   어떤 앵커든 봉마다 누적합 차이 한 번으로 계산 (앵커 수와 무관하게 봉당 O(1))
+# - 앵커는 봉마다 그 시점까지의 데이터로만 정함 (미래 참조 없음)
+#   "low52w" / "high52w"   최근 252봉 최저가(Low) / 최고가(High) 봉
+#   "low:150" / "high:60"  최근 n 봉 최저가 / 최고가 봉
+#   "gap" / "gap:0.05"     마지막 갭상승 봉 (시가 >= 전일 종가 × (1 + 비율), 기본 3%)
+#   "earnings"             마지막 실적 발표일 (earnings_dates 테이블, 이후 첫 봉)
+#   "date:2024-03-15"      사용자 지정일 (이후 첫 봉, 데이터 시작 전 날짜면 값 없음)
+# - 컬럼명 "AVWAP_<앵커>" 로 전략 규칙 / 차트에서 사용. 전략은 vwap_anchors 로 필요한 앵커를 선언
+# -----------------------------------------------------------------------------
+VWAP_PREFIX = "AVWAP_"
+YEAR_BARS = 252
+DEFAULT_GAP_PCT = 0.03
+
+def parse_anchor(spec):
+    """앵커 문자열 → (종류, 인자)"""
+    kind, _, arg = str(spec).partition(':')
+    if kind in ('low52w', 'high52w') and not arg: return kind[:-3], YEAR_BARS
+    if kind in ('low', 'high') and arg: return kind, int(arg)
+    if kind == 'gap': return kind, float(arg) if arg else DEFAULT_GAP_PCT
+    if kind == 'earnings' and not arg: return kind, None
+    if kind == 'date' and arg: return kind, np.datetime64(pd.Timestamp(arg).date(), 'ns')
+    raise ValueError(f"알 수 없는 VWAP 앵커: {spec!r}")
+
+def is_vwap_column(name):
+    return str(name).startswith(VWAP_PREFIX) and len(str(name)) > len(VWAP_PREFIX)
+
+def _arr(x):
+    arr = np.asarray(x.to_numpy(dtype=float))
+    return arr[:, None] if arr.ndim == 1 else arr
+
+def _dates(df):
+    if isinstance(df, PricePanel): return df.dates
+    return df.index.values.astype('datetime64[ns]')[:, None]
+
+def _codes(df):
+    if isinstance(df, PricePanel): return df.codes
+    return [df.attrs.get('code')]
+
+def _like(df, arr):
+    base = df['Close']
+    if isinstance(base, pd.DataFrame): return pd.DataFrame(arr, index=base.index, columns=base.columns)
+    return pd.Series(arr[:, 0], index=base.index)
+
+def _last_event(event):
+    """봉별 그 봉까지의 마지막 이벤트 봉 위치 (없으면 -1)"""
+    rows = np.arange(len(event))[:, None]
+    return np.maximum.accumulate(np.where(event, rows, -1), axis=0)
+
+def _events_on_dates(dates, dates_by_col):
+    """종목별 날짜 목록 → 각 날짜 이후 첫 봉에 이벤트 (데이터 시작 전 / 마지막 봉 이후 날짜는 제외)"""
+    event = np.zeros(dates.shape, dtype=bool)
+    for j, targets in dates_by_col.items():
+        valid = ~np.isnat(dates[:, j])
+        days = dates[valid, j]
+        if len(days) == 0: continue
+        targets = np.asarray(targets, dtype='datetime64[ns]')
+        targets = targets[(targets >= days[0]) & (targets <= days[-1])]
+        event[np.argmax(valid) + np.searchsorted(days, targets), j] = True # 오른쪽 정렬 → 실제 봉은 연속
+    return event
+
+def _rolling_extreme(values, window, low):
+    """최근 window 봉 중 최저(low) / 최고 값 봉 위치 (동률이면 앞선 봉)
+    [수정] 희소 테이블: 길이 2^k 구간의 최저 위치를 두 배씩 합쳐 가며 만들고, 창은 겹치는 두 구간으로 덮음
+    (봉당 O(log w), 창 전체를 훑는 argmin 은 O(w))"""
+    v = np.where(np.isnan(values), np.inf, values if low else -values)
+    v = np.vstack([np.full((window - 1, v.shape[1]), np.inf), v])
+    cols = np.arange(v.shape[1])
+    pick = lambda a, b: np.where(v[b, cols] < v[a, cols], b, a) # 동률이면 앞선 봉 a
+    best = np.broadcast_to(np.arange(len(v))[:, None], v.shape) # best[t] = [t - span + 1, t] 구간 최저 위치
+    span = 1
+    while span * 2 <= window:
+        best = np.vstack([best[:span], pick(best[:-span], best[span:])])
+        span *= 2
+    t = np.arange(window - 1, len(v))
+    return np.maximum(pick(best[t - window + span], best[t]) - (window - 1), 0)
+
+def anchor_index(df, spec):
+    """(봉 × 종목) 봉별 앵커 봉 위치 배열 (앵커가 없으면 -1)"""
+    kind, arg = parse_anchor(spec)
+    if kind in ('low', 'high'):
+        return _rolling_extreme(_arr(df['Low' if kind == 'low' else 'High']), arg, kind == 'low')
+    if kind == 'gap':
+        o, c = _arr(df['Open']), _arr(df['Close'])
+        prev = np.vstack([np.full((1, c.shape[1]), np.nan), c[:-1]])
+        return _last_event(o >= prev * (1 + arg))
+    dates = _dates(df)
+    if kind == 'date':
+        return _last_event(_events_on_dates(dates, {j: [arg] for j in range(dates.shape[1])}))
+    codes = _codes(df)
+    known = db.get_earnings_dates([c for c in codes if c])
+    return _last_event(_events_on_dates(dates, {j: known[c] for j, c in enumerate(codes) if c in known}))
+
+def _prefix_sums(df):
+    """첫 봉 직전 기준 행을 붙인 TP×Vol / Vol 누적합 (프레임에 CumTPV / CumVol 로 한 번만 계산해 둠)"""
+    tpv = df['TPV'] if 'TPV' in df else (df['High'] + df['Low'] + df['Close']) / 3 * df['Volume']
+    if 'CumTPV' not in df:
+        df['CumTPV'] = _like(df, np.nancumsum(_arr(tpv), axis=0))
+        df['CumVol'] = _like(df, np.nancumsum(_arr(df['Volume']), axis=0))
+    cx, cv = _arr(df['CumTPV']), _arr(df['CumVol'])
+    # 잘라낸 프레임이면 누적합이 원래 첫 봉부터이므로 기준 행 = 첫 봉 누적값 - 첫 봉 값
+    base_x = cx[:1] - np.nan_to_num(_arr(tpv.iloc[:1]))
+    base_v = cv[:1] - np.nan_to_num(_arr(df['Volume'].iloc[:1]))
+    return np.vstack([base_x, cx]), np.vstack([base_v, cv])
+
+def anchored_vwap(df, anchor="low:150"):
+    """앵커 VWAP (단일 종목 Series / 패널 DataFrame). 앵커가 없거나 거래량이 0이면 NaN"""
+    a = anchor_index(df, anchor)
+    cx, cv = _prefix_sums(df)
+    cols = np.arange(a.shape[1])[None, :]
+    start = np.maximum(a, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vol = cv[1:] - cv[start, cols]
+        out = np.where((a >= 0) & (vol > 0), (cx[1:] - cx[start, cols]) / vol, np.nan)
+    out[np.isnan(_arr(df['Close']))] = np.nan
+    return _like(df, out)
+
+def vwap_column(df, name):
+    """'AVWAP_low52w' 같은 컬럼을 계산해 df[name] 에 저장하고 반환 (이미 있으면 그대로)"""
+    if name in df: return df[name]
+    if not is_vwap_column(name): raise KeyError(name)
+    df[name] = anchored_vwap(df, name[len(VWAP_PREFIX):])
+    return df[name]
+
+def add_vwap_columns(df, anchors):
+    """앵커 목록의 AVWAP_ 컬럼을 df 에 추가하고 컬럼명 리스트 반환 (차트 / 정밀분석용)"""
+    names = [VWAP_PREFIX + str(a) for a in anchors]
+    for name in names: vwap_column(df, name)
+    return names
+
+# -----------------------------------------------------------------------------
+# 실적 발표일 수집 (earnings 앵커용, 백그라운드)
+# -----------------------------------------------------------------------------
+_earn_executor = ThreadPoolExecutor(max_workers=2)
+_earn_inflight = set()
+_earn_lock = threading.Lock()
+
+def update_earnings_dates(code):
+    """야후 실적 발표일 (지난 발표 + 예정) 저장. 저장한 날짜 수 반환"""
+    try:
+        cov = db.get_price_coverage(code)
+        symbols = [cov['symbol']] if cov and cov.get('symbol') else \
+                  ([f"{code}.KS", f"{code}.KQ"] if str(code).isdigit() else [str(code)])
+        for sym in symbols:
+            ed = yf.Ticker(sym, session=get_yahoo_session()).get_earnings_dates(limit=24)
+            if ed is not None and not ed.empty:
+                idx = ed.index.tz_localize(None) if ed.index.tz is not None else ed.index
+                return db.save_earnings_dates(code, sorted({d.strftime("%Y-%m-%d") for d in idx}))
+        return 0
+    except Exception:
+        return 0
+    finally:
+        with _earn_lock: _earn_inflight.discard(str(code))
+
+def refresh_earnings_async(codes):
+    for code in map(str, codes):
+        with _earn_lock:
+            if code in _earn_inflight: continue
+            _earn_inflight.add(code)
+        _earn_executor.submit(update_earnings_dates, code)
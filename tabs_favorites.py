@@ -5,6 +5,7 @@ from datetime import datetime, date
 from concurrent.futures import ThreadPoolExecutor
 import database as db
 import data_loader as dl
+import strategies as st_algo
 import re
 
 # -----------------------------------------------------------------------------
@@ -40,23 +41,13 @@ def parse_price(price_str):
 @st.cache_data(ttl=3600)
 def search_stock_info(keyword):
     keyword = keyword.strip().upper()
-    markets = ["KOSPI", "KOSDAQ", "S&P500", "NASDAQ"]
     
-    for m in markets:
-        df = dl.get_master_data(m)
-        if df.empty: continue
-        
-        # 1. 코드 정확 일치
-        code_match = df[df['Code'] == keyword]
-        if not code_match.empty:
-            return code_match.iloc[0]['Code'], code_match.iloc[0]['Name']
-        
-        # 2. 이름 포함 확인
-        name_match = df[df['Name'].str.contains(keyword, case=False, na=False)]
-        if not name_match.empty:
-            name_match = name_match.sort_values(by="Name", key=lambda x: x.str.len())
-            return name_match.iloc[0]['Code'], name_match.iloc[0]['Name']
+    # 1. 인덱스 검색 (코드/이름/초성/오타 허용)
+    hits = dl.search_candidates(keyword, k=1)
+    if hits:
+        return hits[0]['code'], hits[0]['name']
 
+    # 2. 마스터에 없는 티커(ETF 등)만 네트워크 조회
     try:
         t = yf.Ticker(keyword)
         info = t.info
@@ -168,6 +159,16 @@ def run():
     st.subheader("💖 관심종목 포트폴리오")
     user = st.session_state["username"]
     
+    # [신규] 신호 알림 받을 전략 (저장 전에는 기본 스캔과 같은 전략)
+    with st.expander("🔔 신호 알림 전략", expanded=False):
+        all_names = [s.name for s in st_algo.ACTIVE_STRATEGIES]
+        saved = db.get_alert_strategies(user)
+        current = [n for n in (saved if saved is not None else [s.name for s in st_algo.DEFAULT_STRATEGIES]) if n in all_names]
+        picked = st.multiselect("새 봉에서 포착되면 알림", all_names, default=current, key="alert_strats")
+        if st.button("알림 전략 저장", key="btn_alert_strats"):
+            db.save_alert_strategies(user, picked)
+            st.success("✅ 저장되었습니다. 다음 새 봉부터 적용됩니다.")
+
     # 1. 종목 추가
     with st.expander("➕ 종목 수동 추가", expanded=False):
         c1, c2, c3 = st.columns([2, 2, 1])
@@ -234,6 +235,18 @@ def run():
         return 0.0
     df["수익률(%)"] = df.apply(calc_return, axis=1)
     
+    # (2-1) 원화 환산 수익률 (해외 주식: 등록일 환율 → 최신 환율 반영, 네트워크 호출 없음)
+    fx_now = st_algo.get_usd_krw()
+    def calc_krw_return(row):
+        try:
+            cp = float(row["현재가_숫자"])
+            bp = float(row["매수가"])
+            if bp > 0 and cp > 0:
+                fx_then = st_algo.get_usd_krw(row["관심등록일"])
+                return ((cp * fx_now) / (bp * fx_then) - 1) * 100
+        except: pass
+        return 0.0
+    
     # (3) 일간수익률 (평균수익률) 계산
     # 등록기간이 0일(오늘)이면 1로 나누어 에러 방지
     df['일간수익률(%)'] = df.apply(lambda x: x['수익률(%)'] / max(1, x['등록기간(일)']), axis=1)
@@ -294,12 +307,13 @@ def run():
     # [해외 주식]
     # -------------------------------------------------------------
     if not df_us.empty:
+        df_us["원화수익률(%)"] = df_us.apply(calc_krw_return, axis=1)
         df_us["현재가"] = df_us["현재가_숫자"].apply(lambda x: format_price(x, False))
         df_us["매수가"] = df_us["매수가"].apply(lambda x: format_price(x, False))
 
         df_us_display = df_us[[
             "관심등록일", "코드", "종목명", "매수가", "전략", "현재가", 
-            "수익률(%)", "등록기간(일)", "일간수익률(%)"
+            "수익률(%)", "원화수익률(%)", "등록기간(일)", "일간수익률(%)"
         ]].copy()
         df_us_display.insert(0, "선택", False)
 
@@ -317,6 +331,7 @@ def run():
                 "현재가": st.column_config.TextColumn("현재가", disabled=True, width="medium"),
                 
                 "수익률(%)": st.column_config.NumberColumn("수익률", format="%.2f%%", disabled=True, width="small"),
+                "원화수익률(%)": st.column_config.NumberColumn("원화수익률", format="%.2f%%", disabled=True, width="small", help="등록일 환율 대비 현재 환율을 반영한 원화 기준 수익률"),
                 
                 # [신규]
                 "등록기간(일)": st.column_config.NumberColumn("기간(일)", format="%d일", disabled=True, width="small"),
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import yfinance as yf
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
+from datetime import datetime, timedelta
 import database as db
 import data_loader as dl
 import strategies as st_algo
@@ -38,7 +39,7 @@ def fetch_current_prices_batch(codes_markets):
 def run():
     st.header("🔬 전략 연구소 (Strategy Lab)")
     
-    tab1, tab2 = st.tabs(["🔍 개별 종목 정밀 분석", "📊 전략 성과(승률) 추적"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🔍 개별 종목 정밀 분석", "📊 전략 성과(승률) 추적", "🧪 파라미터 최적화", "💼 포트폴리오 시뮬레이션"])
 
     with tab1:
         with st.form("strategy_lab_form"):
@@ -66,6 +67,8 @@ def run():
                 
             t_ticker_select_label = col_in1.selectbox("관심종목 선택", display_list)
             t_capital = col_in2.number_input("총 운용금 (원)", value=10000000, step=100000)
+            # [신규] 차트에 함께 그릴 앵커 VWAP 기준일 (비워 두면 전략이 선언한 앵커만)
+            t_anchor = col_in2.date_input("⚓ 앵커 VWAP 기준일 (선택)", value=None)
             
             lab_submitted = st.form_submit_button("🧬 정밀 분석 실행", type="primary", use_container_width=True)
 
@@ -77,7 +80,8 @@ def run():
                 if not real_ticker: real_ticker = target
                 
                 with st.spinner(f"'{real_ticker}' 데이터를 정밀 분석 중입니다..."):
-                    raw_df = st_algo.fetch_data(real_ticker)
+                    raw_df = st_algo.fetch_data(real_ticker, history_days=st_algo.FULL_HISTORY_DAYS)
+                    st_algo.refresh_earnings_async([real_ticker]) # earnings 앵커용 실적 발표일 (백그라운드)
                     if raw_df is not None and not raw_df.empty:
                         # [수정] ui_components.py의 emoji_map 키와 완벽하게 일치시킴
                         strat_mapping = [
@@ -88,8 +92,11 @@ def run():
                         ]
                         master_consensus = {}
                         master_details = {}
+                        # 분석 기준일(마지막 봉) 환율로 사이징
+                        usd_rate = st_algo.get_usd_krw(raw_df.index[-1])
                         for short_name, full_name in strat_mapping:
-                            res = st_algo.analyze_strategy_deep_dive(raw_df, t_capital, st.session_state["usd_rate"], full_name, real_ticker)
+                            res = st_algo.analyze_strategy_deep_dive(raw_df, t_capital, usd_rate, full_name, real_ticker,
+                                                                     [f"date:{t_anchor}"] if t_anchor else [])
                             if res:
                                 master_details[full_name] = res
                                 master_consensus[short_name] = res['signal']
@@ -108,6 +115,8 @@ def run():
             m_pack = st.session_state['lab_master_result']
             st.divider()
             st.subheader(f"📊 {m_pack['ticker']} ({m_pack['name']}) 종합 진단 결과")
+            sig_stats = st_algo.get_signal_cache_stats()
+            st.caption(f"신호 메모: 재사용 {sig_stats['hit']:,}회 / 계산 {sig_stats['miss']:,}회 (절약 {sig_stats['saved_sec'] * 1000:,.0f}ms)")
             
             # 여기서 consensus 딕셔너리가 ui_components에 전달됨
             st.markdown(ui.render_consensus_html(m_pack['consensus']), unsafe_allow_html=True)
@@ -154,7 +163,96 @@ def run():
     with tab2:
         st.subheader("📆 과거 추천 종목 검증 (Back-check)")
         st.info("과거에 포착된 종목들의 성과를 분석하고, 전략별 전역 승률을 갱신합니다.")
-        
+
+        # [신규] 스캔 버튼을 누르지 않은 날도 저장된 주가로 재생하여 scan_history 를 채움
+        with st.expander("⏪ 과거 스캔 재생 (스캔 기록 백필)"):
+            r1, r2, r3 = st.columns(3)
+            rp_start = r1.date_input("시작일", value=datetime.now() - timedelta(days=365))
+            rp_end = r2.date_input("종료일", value=datetime.now())
+            rp_resume = r3.checkbox("이어서 재생", value=True, help="해제하면 완료된 구간도 다시 검사합니다 (중복 행은 무시)")
+            if st.button("⏪ 재생 시작", use_container_width=True):
+                bar = st.progress(0.0, text="재생 준비 중...")
+                res = st_algo.replay_scan_history(rp_start.strftime("%Y-%m-%d"), rp_end.strftime("%Y-%m-%d"), resume=rp_resume,
+                                                  progress_cb=lambda done, total: bar.progress(done / total, text=f"{done}/{total} 종목"))
+                bar.empty()
+                st_algo.refresh_strategy_stats()
+                st.success(f"✅ 포착 {res['hits']:,}건 (신규 {res['inserted']:,}건) · {res['codes']:,}종목 · "
+                           f"{res['elapsed']:.1f}초 ({res['rows_per_sec']:,.0f} rows/s) · 완료 종목 {res['skipped']:,}개 건너뜀")
+
+        # [신규] 전략 신호 테이블: 새 봉만 증분 적재, 차트 마커 / 백테스트 / 재생이 재계산 대신 읽음
+        with st.expander("🗂 전략 신호 테이블 (날짜별 포착 기록)"):
+            if st.button("🗂 새 봉 신호 적재", use_container_width=True):
+                bar = st.progress(0.0, text="적재 준비 중...")
+                res = st_algo.materialize_signals(progress_cb=lambda done, total: bar.progress(done / total, text=f"{done}/{total} 종목"))
+                bar.empty()
+                if res is None: st.info("다른 적재 작업이 진행 중입니다.")
+                else: st.success(f"✅ {res['rows']:,}행 추가 · {res['codes']:,}종목 · 최신 종목 {res['skipped']:,}개 건너뜀 · {res['elapsed']:.1f}초")
+
+            listings = db.get_listing_names()
+            q1, q2, q3, q4 = st.columns(4)
+            sq_strat = q1.selectbox("전략", [s.name for s in st_algo.ACTIVE_STRATEGIES], key="sq_strat")
+            sq_market = q2.selectbox("시장", ["전체"] + sorted({m for _, m in listings.values() if m}), key="sq_market")
+            sq_start = q3.date_input("시작일", value=datetime.now() - timedelta(days=30), key="sq_start")
+            sq_end = q4.date_input("종료일", value=datetime.now(), key="sq_end")
+            sig_df = db.load_signals(sq_strat, market=None if sq_market == "전체" else sq_market,
+                                     start_date=sq_start.strftime("%Y-%m-%d"), end_date=sq_end.strftime("%Y-%m-%d"))
+            if sig_df.empty: st.caption("해당 조건의 신호가 없습니다. (적재 전이면 위 버튼으로 먼저 적재하세요)")
+            else:
+                sig_df.insert(2, 'name', [listings.get(c, (c, None))[0] for c in sig_df['code']])
+                st.dataframe(sig_df.drop(columns='strategy_name').sort_values('date', ascending=False).style.format({'score': '{:.1f}'}),
+                             use_container_width=True, hide_index=True)
+
+        # [신규] 전략 × 시장 × 기간 누적 승률
+        with st.expander("📈 전략별 누적 승률 (시장 · 보유기간별)"):
+            agg = db.get_strategy_stats_breakdown()
+            if agg.empty: st.caption("아직 집계된 결과가 없습니다. 성과 분석 또는 과거 스캔 재생 후 표시됩니다.")
+            else:
+                grp = agg.groupby(['strategy_name', 'market', 'horizon'])[['wins', 'total', 'sum_ret']].sum()
+                grp['승률(%)'] = grp['wins'] / grp['total'] * 100
+                grp['평균수익률(%)'] = grp['sum_ret'] / grp['total']
+                table = grp[['승률(%)', 'total']].unstack('horizon')
+                table.columns = [f"{h}일 {'승률(%)' if m == '승률(%)' else '건수'}" for m, h in table.columns]
+                st.dataframe(table.style.format(precision=1), use_container_width=True)
+
+        # [신규] 이벤트 스터디: 전략 신호 후 1~20 거래일 수익률 경로 (주가 데이터가 바뀌기 전까지 캐시)
+        with st.expander("📉 신호 후 수익률 경로 (이벤트 스터디)"):
+            es_strat = st.selectbox("전략", [s.name for s in st_algo.ACTIVE_STRATEGIES], key="es_strat")
+            # [수정] 버튼을 누를 때만 계산하고 결과는 세션에 보관 (다른 위젯 조작으로 재실행될 때 다시 계산하지 않음)
+            if st.button("📉 수익률 경로 계산", key="es_run", use_container_width=True):
+                with st.spinner("전 종목 신호 수집 중..."):
+                    st.session_state['lab_event_study'] = {'strategy': es_strat, 'res': st_algo.run_event_study(es_strat)}
+
+            if 'lab_event_study' in st.session_state:
+                es_name, es = st.session_state['lab_event_study']['strategy'], st.session_state['lab_event_study']['res']
+                if es is None or es['n'].iloc[0] == 0: st.caption(f"{es_name}: 저장된 주가 이력에서 신호가 없습니다.")
+                else:
+                    st.plotly_chart(ui.draw_event_study(es, title=f"{es_name} · 신호 {int(es['n'].iloc[0]):,}건"), use_container_width=True)
+                    st.dataframe(es.iloc[1:].T.style.format(precision=2), use_container_width=True)
+
+        # [신규] 부트스트랩 신뢰구간: 표본 수가 적은 승률을 과신하지 않도록 구간으로 표시
+        with st.expander("🎲 승률 · 기대값 신뢰구간 (부트스트랩 95%)"):
+            ci_cols = {'n': "신호 수", 'win_rate': "승률(%)", 'win_lo': "승률 하한", 'win_hi': "승률 상한",
+                       'expectancy': "5일 기대값(%)", 'exp_lo': "기대값 하한", 'exp_hi': "기대값 상한"}
+            # [수정] 재표본 계산은 폼 제출 때만 하고 결과는 세션에 보관 (최소 신호 수 필터는 보관된 표에 적용)
+            with st.form("ci_form"):
+                ci_strat = st.selectbox("종목별 보기", [s.name for s in st_algo.ACTIVE_STRATEGIES], key="ci_strat")
+                ci_submitted = st.form_submit_button("🎲 신뢰구간 계산", use_container_width=True)
+            if ci_submitted:
+                with st.spinner("재표본 계산 중..."):
+                    st.session_state['lab_ci'] = {
+                        'all': pd.concat([st_algo.strategy_ci_table(s) for s in st_algo.ACTIVE_STRATEGIES]),
+                        'strategy': ci_strat, 'by_ticker': st_algo.strategy_ci_table(ci_strat, by_ticker=True)}
+
+            if 'lab_ci' in st.session_state:
+                ci = st.session_state['lab_ci']
+                st.dataframe(ci['all'].rename(columns=ci_cols).style.format(precision=1), use_container_width=True)
+                ci_min_n = st.slider("최소 신호 수", 1, 50, 5)
+                ci_tk = ci['by_ticker']
+                ci_tk = ci_tk[ci_tk['n'] >= ci_min_n].sort_values('win_lo', ascending=False)
+                ci_tk.index = [f"{dl.get_stock_name(c)} ({c})" for c in ci_tk.index]
+                st.caption(f"종목별: {ci['strategy']}")
+                st.dataframe(ci_tk.rename(columns=ci_cols).style.format(precision=1), use_container_width=True, height=300)
+
         available_dates = db.get_scan_history_dates()
         
         if not available_dates:
@@ -163,46 +261,199 @@ def run():
             c_sel1, c_sel2 = st.columns([1, 2])
             selected_date = c_sel1.selectbox("과거 날짜 선택", available_dates)
             
+            horizon = c_sel2.radio("승률 기준 보유기간", [f"{h}일" for h in st_algo.BACKCHECK_HORIZONS], index=1, horizontal=True)
+            h_col = f"R{horizon[:-1]}"
+
             if selected_date:
-                history_rows = db.get_history_by_date(selected_date)
-                if history_rows:
-                    if c_sel1.button("🚀 성과 분석 시작", type="primary"):
-                        with st.spinner(f"{selected_date} 데이터 분석 및 전역 통계 갱신 중..."):
-                            target_list = [(r[1], r[4]) for r in history_rows]
-                            current_prices = fetch_current_prices_batch(target_list)
-                            
-                            perf_data = []
-                            stats = {} 
-                            
-                            for row in history_rows:
-                                strat, code, name, entry, mkt = row
-                                curr = current_prices.get(code, 0.0)
-                                
-                                if curr > 0:
-                                    ret = ((curr - entry) / entry) * 100
-                                    is_win = ret > 0 
-                                    win_str = "🔴승" if is_win else "🔵패"
-                                    
-                                    if strat not in stats: stats[strat] = {'win':0, 'total':0}
-                                    stats[strat]['total'] += 1
-                                    if is_win: stats[strat]['win'] += 1
-                                    
-                                    perf_data.append({
-                                        "전략": strat, "종목명": name, "코드": code,
-                                        "포착당시가": entry, "현재가": curr,
-                                        "수익률(%)": ret, "결과": win_str
-                                    })
-                            
-                            if stats:
-                                db.update_strategy_stats(stats)
-                                st.toast("전략별 전역 승률이 업데이트 되었습니다!", icon="📡")
-
-                            st.divider()
-                            st.markdown(f"### 📊 {selected_date} 전략별 성적표")
-                            cols = st.columns(len(stats)) if stats else []
-                            for idx, (s_name, stat) in enumerate(stats.items()):
-                                win_rate = (stat['win'] / stat['total']) * 100
-                                with cols[idx]:
-                                    st.metric(label=s_name, value=f"{win_rate:.0f}%", delta=f"{stat['total']}건")
-
-                            st.dataframe(pd.DataFrame(perf_data), use_container_width=True)
\ No newline at end of file
+                if c_sel1.button("🚀 성과 분석 시작", type="primary"):
+                    with st.spinner(f"{selected_date} 데이터 분석 및 전역 통계 갱신 중..."):
+                        # [수정] 저장된 일봉으로 기간별 수익률 / MAE / MFE 를 한 번에 계산,
+                        # 포착 이후 저장 봉이 없는 최근 종목만 실시간 시세 조회
+                        bc = st_algo.backcheck_history(scan_date=selected_date)
+                        live_rows = bc[bc['NeedsLive']]
+                        current_prices = fetch_current_prices_batch(list(zip(live_rows['code'], live_rows['market'])))
+                        live_px = bc['code'].map(current_prices).where(bc['NeedsLive'])
+                        bc['Live'] = ((live_px / bc['entry_price']) - 1) * 100
+                        bc.loc[live_px.fillna(0) <= 0, 'Live'] = np.nan
+
+                        # 선택 기간 수익률이 있으면 그것으로, 아직 기간이 안 지난 종목은 최신 저장 종가/실시간 시세로 판정
+                        latest = np.where(bc['NeedsLive'], bc['Live'], (bc['LastClose'] / bc['entry_price'] - 1) * 100)
+                        bc['판정수익률'] = bc[h_col].fillna(pd.Series(latest, index=bc.index))
+                        judged = bc.dropna(subset=['판정수익률'])
+
+                        stats = {}
+                        for strat, grp in judged.groupby('strategy_name'):
+                            stats[strat] = {'win': int((grp['판정수익률'] > 0).sum()), 'total': len(grp)}
+
+                        # [수정] 전역 승률은 scan_history 전체의 누적 집계로 증분 갱신 (이 날짜 표본으로 덮어쓰지 않음)
+                        if st_algo.refresh_strategy_stats() > 0:
+                            st.toast("전략별 전역 승률이 업데이트 되었습니다!", icon="📡")
+
+                        st.divider()
+                        st.markdown(f"### 📊 {selected_date} 전략별 성적표 ({horizon} 기준)")
+                        cols = st.columns(len(stats)) if stats else []
+                        for idx, (s_name, stat) in enumerate(stats.items()):
+                            win_rate = (stat['win'] / stat['total']) * 100
+                            with cols[idx]:
+                                st.metric(label=s_name, value=f"{win_rate:.0f}%", delta=f"{stat['total']}건")
+
+                        perf_df = bc.rename(columns={'strategy_name': "전략", 'name': "종목명", 'code': "코드",
+                                                     'entry_price': "포착당시가", 'MAE': "MAE(%)", 'MFE': "MFE(%)",
+                                                     'Bars': "경과봉", 'Live': "실시간(%)"})
+                        perf_df = perf_df.rename(columns={f"R{h}": f"{h}일(%)" for h in st_algo.BACKCHECK_HORIZONS})
+                        perf_df['결과'] = np.where(perf_df['판정수익률'].isna(), "-", np.where(perf_df['판정수익률'] > 0, "🔴승", "🔵패"))
+                        show_cols = ["전략", "종목명", "코드", "포착당시가"] + [f"{h}일(%)" for h in st_algo.BACKCHECK_HORIZONS] + \
+                                    ["MAE(%)", "MFE(%)", "경과봉", "실시간(%)", "결과"]
+                        st.dataframe(perf_df[show_cols].style.format(precision=2), use_container_width=True)
+
+    # [신규] 전략 임계값 파라미터 스윕
+    with tab3:
+        st.subheader("🧪 전략 파라미터 스윕")
+        st.info("저장된 전 종목 이력으로 전략 임계값 조합을 병렬 백테스트하고, 결과를 히트맵으로 비교합니다.")
+
+        with st.form("sweep_form"):
+            c1, c2, c3 = st.columns(3)
+            sw_strat = c1.selectbox("전략", list(st_algo.SWEEP_GRIDS.keys()))
+            sw_mode = c2.radio("탐색 방식", ["그리드", "랜덤"], horizontal=True)
+            sw_n = c3.number_input("랜덤 조합 수", min_value=2, max_value=100, value=10)
+            c4, c5 = st.columns(2)
+            sw_hold = c4.number_input("최대 보유 봉", min_value=1, max_value=120, value=20)
+            sw_fee = c5.number_input("왕복 비용 (%)", min_value=0.0, max_value=2.0, value=0.3, step=0.05)
+            sw_submitted = st.form_submit_button("🚀 스윕 실행", type="primary", use_container_width=True)
+
+        if sw_submitted:
+            grid = st_algo.SWEEP_GRIDS[sw_strat]
+            param_list = st_algo.grid_params(grid) if sw_mode == "그리드" else st_algo.random_params(grid, int(sw_n))
+            with st.spinner(f"{len(param_list)}개 조합 백테스트 중..."):
+                sweep_id, _, elapsed = st_algo.run_sweep(sw_strat, param_list, max_hold=int(sw_hold), fee_pct=sw_fee)
+            if sweep_id:
+                st.session_state['lab_sweep_id'] = sweep_id
+                st.toast(f"스윕 완료 ({elapsed:.1f}초)", icon="✅")
+            else: st.warning("백테스트할 저장 주가 데이터가 없습니다.")
+
+        sweeps = db.get_sweep_ids()
+        if sweeps:
+            labels = {f"{s[0]} | {s[1]} ({s[2]}개 조합)": s[0] for s in sweeps}
+            default_idx = next((i for i, v in enumerate(labels.values()) if v == st.session_state.get('lab_sweep_id')), 0)
+            sel_label = st.selectbox("스윕 결과 선택", list(labels.keys()), index=default_idx)
+            res_df = db.load_sweep_results(labels[sel_label])
+
+            if not res_df.empty:
+                strat_name = res_df['strategy_name'].iloc[0]
+                swept = [k for k in st_algo.SWEEP_GRIDS.get(strat_name, {}) if k in res_df.columns]
+                metrics = ['expectancy', 'win_rate', 'profit_factor', 'max_drawdown', 'trades', 'exposure']
+                if len(swept) >= 2:
+                    h1, h2, h3 = st.columns(3)
+                    metric = h1.selectbox("지표", metrics)
+                    x_param = h2.selectbox("X축", swept, index=0)
+                    y_param = h3.selectbox("Y축", swept, index=1)
+                    if x_param != y_param:
+                        st.plotly_chart(ui.draw_sweep_heatmap(res_df, x_param, y_param, metric, title=strat_name), use_container_width=True)
+                    else: st.warning("X축과 Y축에 서로 다른 파라미터를 선택하세요.")
+                show_cols = swept + metrics
+                st.dataframe(res_df[show_cols].sort_values('expectancy', ascending=False).style.format(precision=2), use_container_width=True, hide_index=True)
+
+        # [신규] 워크포워드 (표본 외) 평가
+        st.divider()
+        st.subheader("🚶 워크포워드 평가 (표본 외 성과)")
+        st.caption("학습 구간에서 고른 파라미터를 바로 다음 검증 구간에 적용한 성과만 집계합니다. 스캐너 승률(표본 내)과 비교해 보세요.")
+
+        with st.form("walkforward_form"):
+            w1, w2, w3 = st.columns(3)
+            wf_strat = w1.selectbox("전략", list(st_algo.SWEEP_GRIDS.keys()), key="wf_strat")
+            wf_train = w2.number_input("학습 구간 (개월)", min_value=3, max_value=36, value=st_algo.WF_TRAIN_MONTHS)
+            wf_test = w3.number_input("검증 구간 (개월)", min_value=1, max_value=12, value=st_algo.WF_TEST_MONTHS)
+            w4, w5 = st.columns(2)
+            wf_hold = w4.number_input("최대 보유 봉", min_value=1, max_value=120, value=20, key="wf_hold")
+            wf_fee = w5.number_input("왕복 비용 (%)", min_value=0.0, max_value=2.0, value=0.3, step=0.05, key="wf_fee")
+            wf_submitted = st.form_submit_button("🚶 워크포워드 실행", type="primary", use_container_width=True)
+
+        if wf_submitted:
+            param_list = st_algo.grid_params(st_algo.SWEEP_GRIDS[wf_strat])
+            with st.spinner(f"{len(param_list)}개 조합 × 구간별 평가 중..."):
+                run_id, _, _, elapsed = st_algo.run_walk_forward(wf_strat, param_list, train_months=int(wf_train),
+                                                                 test_months=int(wf_test), max_hold=int(wf_hold),
+                                                                 fee_pct=wf_fee)
+            if run_id:
+                st.session_state['lab_wf_run_id'] = run_id
+                st.toast(f"워크포워드 완료 ({elapsed:.1f}초)", icon="✅")
+            else: st.warning("학습 + 검증 구간을 만들 만큼 저장된 이력이 없습니다.")
+
+        wf_runs = db.get_walkforward_runs()
+        if wf_runs:
+            wf_labels = {f"{r[0]} | {r[1]} ({r[2]}개 구간)": r[0] for r in wf_runs}
+            default_idx = next((i for i, v in enumerate(wf_labels.values()) if v == st.session_state.get('lab_wf_run_id')), 0)
+            wf_label = st.selectbox("워크포워드 결과 선택", list(wf_labels.keys()), index=default_idx)
+            wf_df = db.load_walkforward_results(wf_labels[wf_label])
+
+            if not wf_df.empty:
+                oos = st_algo.summarize_walk_forward(wf_df)
+                m1, m2, m3 = st.columns(3)
+                m1.metric("표본 외 거래 수", f"{oos['trades']:,}건", delta=f"{oos['windows']}개 구간", delta_color="off")
+                m2.metric("표본 외 승률", f"{oos['win_rate']:.1f}%")
+                m3.metric("표본 외 기대값", f"{oos['expectancy']:.2f}%")
+
+                wf_df['선택 파라미터'] = [", ".join(f"{k}={v}" for k, v in p.items() if k in st_algo.SWEEP_GRIDS.get(wf_df['strategy_name'].iloc[0], {})) for p in wf_df['params']]
+                show_cols = ['window_no', 'train_start', 'test_start', 'test_end', '선택 파라미터'] + db.WALKFORWARD_METRICS
+                st.dataframe(wf_df[show_cols].style.format(precision=2), use_container_width=True, hide_index=True)
+
+        # [신규] 전략 조합 (AND / OR / k-of-n) 평가
+        st.divider()
+        st.subheader("🧩 전략 조합 평가 (앙상블)")
+        st.caption("전략별 진입 신호를 비트로 묶어 모든 AND / OR / k-of-n 조합의 보유기간 수익률을 한 번에 집계합니다. 순위는 뒤 30% 구간(표본 외) 기대값 기준입니다.")
+
+        with st.form("ensemble_form"):
+            e1, e2 = st.columns(2)
+            ens_hold = e1.number_input("보유 기간 (거래일)", min_value=1, max_value=60, value=st_algo.ENSEMBLE_HOLD)
+            ens_min = e2.number_input("검증 구간 최소 신호 수", min_value=1, max_value=1000, value=st_algo.MIN_TEST_SIGNALS)
+            ens_submitted = st.form_submit_button("🧩 조합 평가 실행", type="primary", use_container_width=True)
+
+        if ens_submitted:
+            with st.spinner("전략 신호 수집 및 조합 평가 중..."):
+                st.session_state['lab_ensemble'] = st_algo.evaluate_ensembles(hold=int(ens_hold), min_test_signals=int(ens_min))
+
+        if 'lab_ensemble' in st.session_state:
+            ens_df, ens_meta = st.session_state['lab_ensemble']
+            split = ens_meta['split_date'].strftime('%Y-%m-%d') if ens_meta['split_date'] is not None else "-"
+            st.caption(f"{ens_meta['combinations']}개 조합 · 검증 시작일 {split} · {ens_meta['hold']}일 보유 · {ens_meta['elapsed']:.1f}초")
+            st.dataframe(ens_df[ens_df['eligible']].drop(columns='eligible').style.format(precision=2), use_container_width=True, hide_index=True)
+
+    # [신규] 일별 스캐너 추천을 실제 자본으로 매매했을 때의 포트폴리오 시뮬레이션
+    with tab4:
+        st.subheader("💼 포트폴리오 시뮬레이션")
+        st.info("매일의 전략 신호를 점수순으로 매수하되, 최대 보유 종목 수 · 거래당 위험 · 원화/달러 현금 한도를 적용합니다.")
+
+        strat_names = [s.name for s in st_algo.ACTIVE_STRATEGIES]
+        with st.form("portfolio_form"):
+            p1, p2, p3 = st.columns(3)
+            pf_strats = p1.multiselect("전략", strat_names, default=[s.name for s in st_algo.DEFAULT_STRATEGIES])
+            pf_capital = p2.number_input("초기 자본 (원)", value=st_algo.DEFAULT_CAPITAL, step=10000000)
+            pf_max_pos = p3.number_input("최대 보유 종목 수", min_value=1, max_value=50, value=st_algo.DEFAULT_MAX_POSITIONS)
+            p4, p5, p6 = st.columns(3)
+            pf_risk = p4.number_input("거래당 위험 (%)", min_value=0.1, max_value=10.0, value=st_algo.DEFAULT_RISK_PCT * 100, step=0.1)
+            # [수정] 기본은 자동 (미국 종목 후보가 있으면 50%, 없으면 0%), 직접 지정할 때만 슬라이더 값 사용
+            pf_usd_manual = p5.checkbox("달러 현금 비중 직접 지정", value=False)
+            pf_usd = p5.slider("달러 현금 비중 (%)", 0, 100, 50)
+            pf_fee = p6.number_input("왕복 비용 (%)", min_value=0.0, max_value=2.0, value=0.3, step=0.05, key="pf_fee")
+            pf_submitted = st.form_submit_button("💼 시뮬레이션 실행", type="primary", use_container_width=True)
+
+        if pf_submitted:
+            with st.spinner("전 종목 일별 신호 재생 중..."):
+                res = st_algo.run_portfolio_backtest(pf_strats, capital=pf_capital, max_positions=int(pf_max_pos),
+                                                     risk_pct=pf_risk / 100, fee_pct=pf_fee,
+                                                     usd_ratio=pf_usd / 100 if pf_usd_manual else None)
+            if res: st.session_state['lab_portfolio'] = {'res': res, 'capital': pf_capital}
+            else: st.warning("시뮬레이션할 신호가 없습니다. 저장된 주가 이력을 확인해주세요.")
+
+        if 'lab_portfolio' in st.session_state:
+            res, capital = st.session_state['lab_portfolio']['res'], st.session_state['lab_portfolio']['capital']
+            sm = res['summary']
+            k1, k2, k3, k4, k5 = st.columns(5)
+            k1.metric("총 수익률", f"{sm['total_return']:.1f}%", delta=f"CAGR {sm['cagr']:.1f}%")
+            k2.metric("최대 낙폭", f"{sm['max_drawdown']:.1f}%")
+            k3.metric("거래 수 / 승률", f"{sm['trades']:,}건", delta=f"{sm['win_rate']:.0f}%", delta_color="off")
+            k4.metric("연 회전율", f"{sm['annual_turnover']:.0f}%")
+            k5.metric("평균 보유 종목", f"{sm['avg_positions']:.1f}", delta=f"미체결 신호 {sm['skipped_signals']:,}", delta_color="off")
+            st.caption(f"소요 시간: {res['elapsed']:.1f}초 · 기간 끝 미청산 보유 {sm.get('open_positions', 0)}종목 (마지막 종가로 평가)")
+            st.plotly_chart(ui.draw_equity_curve(res['equity'], capital), use_container_width=True)
+            st.dataframe(res['trades'].sort_values('EntryDate', ascending=False).style.format(precision=2), use_container_width=True, hide_index=True)
\ No newline at end of file
@@ -10,6 +10,8 @@ import data_loader as dl
 import strategies as st_algo
 import ui_components as ui
 
+FUNDAMENTAL_PREFETCH_TOP = 20 # 스캔 완료 후 재무 정보를 미리 받아둘 상위 종목 수
+
 # [공포/탐욕 지수 데이터 가져오기]
 @st.cache_data(ttl=3600)
 def fetch_fear_greed_data():
@@ -54,15 +56,30 @@ def fetch_fear_greed_data():
             
     return results
 
+# [신규] 전략 필터 키 → 전략 이름 (체크한 전략만 종목별로 검사)
+STRATEGY_FILTERS = {
+    'hyper': "🔫하이퍼스나이퍼", 'th_algo': "🧬TH알고리즘", 'turtle': "🐢터틀", 'bnf': "💧BNF",
+    'elite': "⚡엘리트", 'dbb': "🔥DBB", 'squeeze': "🤖AI스퀴즈", 'buffett': "🛡️버핏", 'vwap': "⚓VWAP",
+}
+
 def scan_worker(full_target, filter_opts, status_container):
     workers = 8  
     total = len(full_target)
     s_opts = filter_opts['strategies']
+    # [수정] 체크한 전략만 계산 (전략을 늘려도 종목당 스캔 시간은 선택한 만큼만),
+    # 아무것도 없으면 기본 전략만 (OPT_IN_STRATEGIES 는 체크해야만 검사, 알림 / 포트폴리오 기본값과 같은 목록)
+    chosen = {STRATEGY_FILTERS[k] for k, v in s_opts.items() if v}
+    if chosen: strategies = [s for s in st_algo.ACTIVE_STRATEGIES if s.name in chosen]
+    else: strategies = list(st_algo.DEFAULT_STRATEGIES)
+    # [신규] 전 종목 랭킹: 점수 분포는 시작 시점 데이터 버전으로 한 번만 (스캔 중 새 봉이 저장돼도 재계산 안 함)
+    top = st_algo.TopK(st_algo.RANK_TOP_K)
+    status_container['top'] = top
     
     results = []
     processed_count = 0
     
     try:
+        ranker = st_algo.get_score_ranker(strategies)
         with ThreadPoolExecutor(max_workers=workers) as executor:
             futures = {}
             for _, r in full_target.iterrows():
@@ -73,7 +90,7 @@ def scan_worker(full_target, filter_opts, status_container):
                 if raw_code.isdigit() and len(raw_code) < 6: safe_code = raw_code.zfill(6)
                 else: safe_code = raw_code
                 
-                ft = executor.submit(st_algo.analyze_single_stock, safe_code, r['Name'], r.get('Market', 'Unknown'))
+                ft = executor.submit(st_algo.analyze_single_stock, safe_code, r['Name'], r.get('Market', 'Unknown'), strategies, ranker)
                 futures[ft] = r
 
             for future in as_completed(futures):
@@ -84,16 +101,12 @@ def scan_worker(full_target, filter_opts, status_container):
                     res = future.result(timeout=15)
                     if res:
                         d = res['전략_리스트']
-                        match = False
-                        
-                        if s_opts['hyper'] and any("하이퍼스나이퍼" in s for s in d): match = True
-                        if s_opts['th_algo'] and any("TH알고리즘" in s for s in d): match = True
-                        if s_opts['turtle'] and any("터틀" in s for s in d): match = True
-                        if s_opts['bnf'] and any("BNF" in s for s in d): match = True
+                        match = any(s in chosen for s in d)
                         
                         any_chk = any(s_opts.values())
-                        if not any_chk: results.append(res)
-                        elif match: results.append(res)
+                        if not any_chk or match:
+                            results.append(res)
+                            top.push(res['랭크점수'], res)
                         
                 except TimeoutError: pass
                 except Exception: pass
@@ -104,7 +117,11 @@ def scan_worker(full_target, filter_opts, status_container):
                 
     except Exception as e: print(f"Scan Worker Error: {e}")
         
-    status_container['results'] = results
+    # [수정] 상위 K 개를 순위대로 앞에, 나머지는 도착 순 (전체 정렬 없음)
+    ranked = top.items()
+    for i, res in enumerate(ranked): res['순위'] = i + 1
+    ranked_ids = {id(res) for res in ranked}
+    status_container['results'] = ranked + [res for res in results if id(res) not in ranked_ids]
     status_container['running'] = False # 작업 끝남 표시
 
 def run():
@@ -160,7 +177,7 @@ def run():
             chk_nasdaq = cols[3].checkbox("🇺🇸 NASDAQ", disabled=is_running)
             
             st.divider()
-            st.write("🎯 **전략 필터** (정예 4대 전략)")
+            st.write("🎯 **전략 필터** (정예 4대 전략 + 클래식 5종)")
             sc = st.columns(4)
             
             s_opts = {
@@ -169,6 +186,15 @@ def run():
                 'turtle': sc[2].checkbox(get_label("🐢 터틀", "🐢터틀"), value=False, disabled=is_running),
                 'bnf': sc[3].checkbox(get_label("💧 BNF", "💧BNF"), value=False, disabled=is_running),
             }
+            # [신규] 레거시 전략 이식분 (기본 해제)
+            sc2 = st.columns(5)
+            s_opts.update({
+                'elite': sc2[0].checkbox(get_label("⚡ 엘리트", "⚡엘리트"), value=False, disabled=is_running),
+                'dbb': sc2[1].checkbox(get_label("🔥 DBB", "🔥DBB"), value=False, disabled=is_running),
+                'squeeze': sc2[2].checkbox(get_label("🤖 AI스퀴즈", "🤖AI스퀴즈"), value=False, disabled=is_running),
+                'buffett': sc2[3].checkbox(get_label("🛡️ 버핏", "🛡️버핏"), value=False, disabled=is_running),
+                'vwap': sc2[4].checkbox(get_label("⚓ VWAP", "⚓VWAP"), value=False, disabled=is_running),
+            })
             st.write("")
             
             # [버튼 로직] 실행 중이면 '분석 중...' 비활성 버튼 표시
@@ -193,6 +219,10 @@ def run():
                     for m in markets: full_target = pd.concat([full_target, dl.get_master_data(m)])
                     full_target = full_target.drop_duplicates(subset=['Code']).reset_index(drop=True)
                 
+                if full_target.empty:
+                    st.error("종목 리스트를 불러오지 못했습니다. 잠시 후 다시 시도해주세요.")
+                    st.stop()
+                
                 # 상태 초기화
                 st.session_state['scan_status'] = {
                     'running': True, 'progress': 0, 'total': len(full_target), 
@@ -216,6 +246,13 @@ def run():
             st.progress(prog_val)
             c_stat1, c_stat2 = st.columns([3, 1])
             c_stat1.write(f"**진행률:** {curr} / {total} 종목 완료")
+
+            # [신규] 스캔 중 실시간 상위 종목 (전략별 점수 분포 백분위 기준)
+            top_items = status['top'].items()[:10] if status.get('top') else []
+            if top_items:
+                st.caption(f"🏆 실시간 Top {len(top_items)}")
+                st.dataframe(pd.DataFrame(top_items)[["종목명", "시장", "발견된_전략", "랭크점수"]],
+                             hide_index=True, use_container_width=True)
             
             # [수정된 중단 버튼 로직]
             if c_stat2.button("🛑 스캔 중단", type="primary", use_container_width=True):
@@ -252,6 +289,18 @@ def run():
                             db.save_scan_result(today_str, s_name, str(res['코드']), res['종목명'], float(res['현재가_RAW']), res.get('시장', 'KR'))
                             save_cnt += 1
                     if save_cnt > 0: st.toast(f"💾 {len(results)}개 종목 기록됨.", icon="📈")
+                    
+                    # [신규] 상위 포착 종목 재무 정보 백그라운드 선조회
+                    st_algo.prefetch_fundamentals([str(r['코드']) for r in results[:FUNDAMENTAL_PREFETCH_TOP]])
+                    # [신규] 상위 포착 종목 실적 발표일 (earnings 앵커 VWAP 용) 백그라운드 수집
+                    st_algo.refresh_earnings_async([str(r['코드']) for r in results[:FUNDAMENTAL_PREFETCH_TOP]])
+                    # [신규] 포착 종목은 연구소 분석용 심층 주가 이력을 백그라운드로 보충
+                    st_algo.backfill_history_async([str(r['코드']) for r in results])
+                    # [신규] 새로 쌓인 봉으로 확정된 과거 포착 결과를 전략 통계에 증분 반영
+                    st_algo.refresh_strategy_stats_async()
+                    st_algo.refresh_cross_ranks_async() # [신규] 새 봉이 생긴 날짜의 횡단면 수익률 순위 갱신
+                    st_algo.materialize_signals_async() # [신규] 이번 스캔에서 받은 새 봉의 신호 적재
+                    st_algo.run_favorite_alerts_async() # [신규] 새 봉이 생긴 관심종목 신호 알림
                 
                 if stop_req: 
                     st.warning(f"🛑 스캔이 중단되었습니다. (발굴: {len(results)}개)")
@@ -268,12 +317,15 @@ def run():
     # 5. 결과 테이블 표시
     if st.session_state["scan_data"] is not None and not st.session_state["scan_data"].empty:
         df = st.session_state["scan_data"].copy()
-        visible_cols = ["종목명", "시장", "발견된_전략", "과거승률", "RSI"]
+        visible_cols = ["순위", "종목명", "시장", "발견된_전략", "랭크점수", "과거승률", "승률_CI", "RSI"]
         col_conf = {
+            "순위": st.column_config.NumberColumn("순위", format="%d", width="small"),
+            "랭크점수": st.column_config.NumberColumn("랭크", format="%.1f", width="small", help="포착 전략의 과거 점수 분포 내 백분위 (0~100)"),
             "종목명": st.column_config.TextColumn("종목명", width="medium"),
             "시장": st.column_config.TextColumn("시장", width="small"),
             "발견된_전략": st.column_config.TextColumn("포착된 신호", width="large"),
             "과거승률": st.column_config.TextColumn("과거 백테스트", width="medium"),
+            "승률_CI": st.column_config.TextColumn("95% 신뢰구간", width="medium", help="부트스트랩 재표본 기준 승률 / 5일 기대수익률 구간"),
             "RSI": st.column_config.NumberColumn("RSI", format="%.1f"),
         }
 
@@ -324,8 +376,7 @@ def run():
 
             with col_finance:
                 with st.spinner("재무 정보 가져오는 중..."):
-                    from strategies.common import get_financial_summary
-                    fin_data = get_financial_summary(sel_row['코드'])
+                    fin_data, fin_refreshing = st_algo.get_cached_financial_summary(sel_row['코드'])
                 
                 if fin_data:
                     debt_str = fin_data['부채비율'].replace('%','').replace('-','0')
@@ -366,6 +417,10 @@ def run():
 """, unsafe_allow_html=True)
                 else:
                     st.warning("재무 정보를 불러올 수 없습니다.")
+                
+                c_stats = st_algo.get_fundamentals_cache_stats()
+                refresh_note = " · 🔄 백그라운드 갱신 중" if fin_refreshing else ""
+                st.caption(f"💾 재무 캐시 적중률 {c_stats['hit_rate']:.0f}% ({c_stats['hit'] + c_stats['stale']}/{c_stats['total']}){refresh_note}")
 
             # [수정] 차트를 columns 블록 밖으로 꺼내서 하단에 넓게 표시
             st.divider()
@@ -0,0 +1,51 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies.common import calculate_indicators
+from strategies.library import StrategyRule
+from strategies.rules import validate_definition
+
+# 스캔(check_signal, 꼬리만 평가)과 전 구간 점수(score)가 봉마다 같은 값을 내는지 확인
+RULES = [
+    {"name": "vol_ratio", "entry": [">", "Close", 0],
+     "score": {"div": ["Volume", {"mean": "Volume", "window": 20}]}},
+    {"name": "bonus_roll", "entry": [">", "RSI", 40], "score": 50,
+     "bonus": [{"when": [">", "Close", "MA20"], "add": {"div": [{"max": "High", "window": 30}, "Close"]}}]},
+    {"name": "prank", "entry": ["<", {"prank": "Bandwidth", "window": 120}, 60],
+     "score": {"sub": [100, {"prank": "Volume", "window": 60}]}},
+    {"name": "quantile", "entry": [">", "RSI", {"quantile": "RSI", "q": 0.3, "window": 90}],
+     "score": {"quantile": "Close", "q": 0.9, "window": 40}},
+]
+
+def _frame(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    df = pd.DataFrame({
+        'Open': open_, 'Close': close,
+        'High': np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n)),
+        'Low': np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n)),
+        'Volume': rng.integers(1_000, 100_000, n).astype(float),
+    }, index=pd.bdate_range('2022-01-03', periods=n, name='Date'))
+    return calculate_indicators(df)
+
+@pytest.mark.parametrize("definition", RULES, ids=[d['name'] for d in RULES])
+def test_check_signal_matches_score(definition):
+    strat = StrategyRule(definition)
+    df = _frame()
+    full = strat.score(df.copy()).to_numpy()
+    hits = 0
+    for k in range(strat.min_bars, len(df)):
+        last = strat.check_signal(df.iloc[:k + 1].copy())
+        assert np.isclose(last, full[k], equal_nan=True), (definition['name'], k, last, full[k])
+        hits += full[k] > 0
+    assert hits > 0
+
+def test_backtest_key_rejected():
+    with pytest.raises(ValueError):
+        validate_definition({"name": "x", "entry": [">", "RSI", 50], "backtest": [">", "RSI", 30]})
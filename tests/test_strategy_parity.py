@@ -0,0 +1,22 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies.library import ACTIVE_STRATEGIES
+from test_rule_parity import _frame
+
+# 기본 / 이식 전략: 백테스트 진입 = 점수 > 0, 마지막 봉 판정(check_signal) = 전 구간 점수
+@pytest.mark.parametrize("strat", ACTIVE_STRATEGIES, ids=[s.name for s in ACTIVE_STRATEGIES])
+def test_backtest_matches_score(strat):
+    df = _frame(n=500, seed=11)
+    full = strat.score(df.copy()).to_numpy()
+    entries = strat.backtest(df.copy()).fillna(False).to_numpy(dtype=bool)
+    assert np.array_equal(entries, full > 0)
+    for k in range(len(df) - 150, len(df)):
+        last = strat.check_signal(df.iloc[:k + 1].copy())
+        last = 0 if last != last else last
+        assert (last > 0) == (full[k] > 0), (strat.name, k, last, full[k])
+        if last > 0: assert np.isclose(last, full[k]), (strat.name, k, last, full[k])
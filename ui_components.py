@@ -121,6 +121,10 @@ def draw_strategy_chart(df, code, strategy_name):
         fig.add_trace(go.Scatter(x=dates, y=df['Signal'], line=dict(color='yellow', width=1), name='Signal'), row=3, col=1)
         fig.update_xaxes(range=[start_date, end_date + pd.DateOffset(days=5)], row=3, col=1)
 
+    # [신규] 앵커 VWAP (전략이 선언한 앵커 / 사용자 지정일) 은 차트 종류와 관계없이 가격 차트에 표시
+    for col in [c for c in df.columns if str(c).startswith('AVWAP_')]:
+        fig.add_trace(go.Scatter(x=dates, y=df[col], line=dict(width=1.5, dash='dash'), name=col.replace('AVWAP_', '⚓ ')), row=1, col=1)
+
     buys = df[df['Chart_Signal'] == 1]
     if not buys.empty:
         fig.add_trace(go.Scatter(x=buys.index.strftime('%Y-%m-%d'), y=buys['Low']*0.98, mode='markers', marker=dict(symbol='triangle-up', size=12, color='#39ff14'), name='BUY'), row=1, col=1)
@@ -216,4 +220,48 @@ def draw_fear_greed_chart(sentiments, time_info=None):
     )
     fig.update_yaxes(range=[0, 100], showgrid=False, zeroline=False, showticklabels=False)
     
+    return fig
+
+# [신규] 파라미터 스윕 히트맵
+def draw_sweep_heatmap(df, x, y, metric, title=""):
+    """df: 스윕 결과 (파라미터 컬럼 + 지표 컬럼). x, y 외 파라미터는 평균"""
+    pv = df.pivot_table(index=y, columns=x, values=metric, aggfunc='mean').sort_index()
+    z = pv.to_numpy(dtype=float)
+    fig = go.Figure(go.Heatmap(
+        z=z, x=[str(v) for v in pv.columns], y=[str(v) for v in pv.index],
+        colorscale='RdYlGn', reversescale=(metric == 'max_drawdown'),
+        text=np.round(z, 2), texttemplate="%{text}", colorbar=dict(title=metric)
+    ))
+    fig.update_layout(
+        title=title, height=420, template="plotly_dark",
+        xaxis_title=x, yaxis_title=y, margin=dict(l=10, r=10, t=50, b=10)
+    )
+    fig.update_xaxes(type='category'); fig.update_yaxes(type='category')
+    return fig
+
+
+# [신규] 포트폴리오 자산곡선 + 보유 종목 수
+def draw_equity_curve(equity, capital):
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+    fig.add_trace(go.Scatter(x=equity.index, y=equity['Equity'], name='평가자산', line=dict(color='#00b894', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=equity.index, y=equity['Cash'], name='현금', line=dict(color='#74b9ff', width=1, dash='dot')), row=1, col=1)
+    fig.add_hline(y=capital, line_dash="dash", line_color="gray", row=1, col=1)
+    fig.add_trace(go.Bar(x=equity.index, y=equity['Positions'], name='보유 종목 수', marker_color='#fdcb6e'), row=2, col=1)
+    fig.update_layout(height=480, template="plotly_dark", margin=dict(l=10, r=10, t=30, b=10),
+                      legend=dict(orientation="h", y=1.05))
+    return fig
+
+# [신규] 이벤트 스터디: 신호 후 평균/중앙값 수익률 경로 + 95% 신뢰구간 + 사분위 밴드
+def draw_event_study(es, title=""):
+    x = es.index.tolist()
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=x + x[::-1], y=es['q75'].tolist() + es['q25'].tolist()[::-1], fill='toself',
+                             fillcolor='rgba(116,185,255,0.12)', line=dict(width=0), name='사분위 (25~75%)', hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=x + x[::-1], y=es['ci_high'].tolist() + es['ci_low'].tolist()[::-1], fill='toself',
+                             fillcolor='rgba(0,184,148,0.3)', line=dict(width=0), name='평균 95% CI', hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=x, y=es['mean'], name='평균', line=dict(color='#00b894', width=3)))
+    fig.add_trace(go.Scatter(x=x, y=es['median'], name='중앙값', line=dict(color='#fdcb6e', width=2, dash='dash')))
+    fig.add_hline(y=0, line_color="gray", line_dash="dot")
+    fig.update_layout(title=title, height=400, template="plotly_dark", margin=dict(l=10, r=10, t=50, b=10),
+                      xaxis_title="신호 후 거래일", yaxis_title="수익률 (%)", legend=dict(orientation="h", y=1.08))
     return fig
\ No newline at end of file